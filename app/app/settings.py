@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -49,12 +50,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.ReadYourWritesMiddleware",
 ]
 
 ROOT_URLCONF = "app.urls"
@@ -81,14 +84,79 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "HOST": "localhost",
-        "NAME": "django_rest",
-        "USER": "python",
-        "PASSWORD": "python",
+# Connections are configured from the environment. They are kept open for
+# DB_CONN_MAX_AGE seconds (0 closes them after every request) and, unless
+# DB_CONN_HEALTH_CHECKS=0, checked before a request reuses them after more
+# than DB_CONN_CHECK_IDLE seconds without a query (see core.db). Each
+# server thread holds one persistent connection, so the workers and
+# threads of a process act as its connection pool. Set
+# DB_POOL=pgbouncer when connecting through pgbouncer in transaction
+# pooling mode, which can't keep server-side cursors open across queries.
+DB_POOL = os.environ.get("DB_POOL", "")
+
+DATABASE = {
+    "ENGINE": os.environ.get("DB_ENGINE", "django.db.backends.postgresql"),
+    "HOST": os.environ.get("DB_HOST", "localhost"),
+    "PORT": os.environ.get("DB_PORT", ""),
+    "NAME": os.environ.get("DB_NAME", "django_rest"),
+    "USER": os.environ.get("DB_USER", "python"),
+    "PASSWORD": os.environ.get("DB_PASSWORD", "python"),
+    "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+    "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS") != "0",
+    "DISABLE_SERVER_SIDE_CURSORS": DB_POOL == "pgbouncer",
+}
+
+DATABASES = {"default": DATABASE}
+DATABASE_CHECK_IDLE_SECONDS = int(os.environ.get("DB_CONN_CHECK_IDLE", 30))
+
+# Comma separated host[:port] list of read replicas, reached with the
+# primary's credentials. The recipe endpoints read from them through
+# core.db.ReplicaRouter; tests run them as mirrors of the primary.
+for number, address in enumerate(
+    filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{number}"] = {
+        **DATABASE,
+        "HOST": host,
+        "PORT": port or DATABASE["PORT"],
+        "TEST": {"MIRROR": "default"},
     }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+DATABASE_ROUTERS = ["core.db.ReplicaRouter"]
+
+# How long (seconds) users read from the primary after writing, and the
+# cache keeping track of it; share it between processes, like the recipe
+# cache with RECIPE_CACHE_URL.
+DATABASE_PIN_SECONDS = int(os.environ.get("DB_PIN_SECONDS", 10))
+DATABASE_PIN_CACHE_ALIAS = "recipe"
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Set RECIPE_CACHE_URL (e.g. redis://localhost:6379/1) to share the recipe
+# response cache between processes; this needs the django-redis package.
+RECIPE_CACHE_URL = os.environ.get("RECIPE_CACHE_URL")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "recipe": (
+        {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": RECIPE_CACHE_URL,
+        }
+        if RECIPE_CACHE_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "recipe",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    ),
 }
 
 
@@ -129,9 +197,19 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.2/howto/static-files/
 
 STATIC_URL = "/static/static/"
-MEDIA_URL = "/static/media/"
-
-MEDIA_ROOT = Path.joinpath(BASE_DIR, MEDIA_URL)
+# Uploads are served by recipe.views.RecipeMediaView, which checks who
+# owns them; MEDIA_ROOT itself must not be exposed by the web server.
+MEDIA_URL = "/api/recipe/media/"
+
+MEDIA_ROOT = Path("/static/media/")
+
+# Uploads are stored once per distinct content (core.storage) and hashed
+# while they are received.
+DEFAULT_FILE_STORAGE = "core.storage.ContentAddressedStorage"
+FILE_UPLOAD_HANDLERS = [
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "core.uploads.HashingUploadHandler",
+]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -142,8 +220,114 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # orjson-backed when orjson is installed, DRF's stdlib JSON otherwise.
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
     "COMPONENT_SPLIT_REQUEST": True,
+    "DESCRIPTION": (
+        "Recipe, tag and ingredient endpoints accept and return "
+        "MessagePack (application/msgpack) as well as JSON. Decimals are "
+        "MessagePack extension type 1, holding the number as an ASCII "
+        'string such as "5.50".'
+    ),
+}
+
+# Maximum number of recipes accepted by /api/recipe/recipes/bulk/.
+RECIPE_BULK_MAX_ITEMS = 1000
+
+# Cache alias and lifetime (seconds) of cached recipe API responses.
+RECIPE_CACHE_ALIAS = "recipe"
+RECIPE_CACHE_TIMEOUT = 300
+
+# In-process cache of token -> user lookups used by
+# user.authentication.CachingTokenAuthentication. CACHE_ALIAS optionally
+# names a shared cache backing the local one.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 60,
+    "CACHE_ALIAS": None,
+}
+
+# Signed access tokens (user.tokens). Signing keys map a key id to its
+# secret; an empty mapping signs with SECRET_KEY under the "default" id.
+# Lifetimes are in seconds.
+ACCESS_TOKEN_SIGNING_KEYS = {}
+ACCESS_TOKEN_ACTIVE_KEY = "default"
+ACCESS_TOKEN_LIFETIME = 300
+REFRESH_TOKEN_LIFETIME = 24 * 60 * 60
+# Revoked access tokens are shared between processes through this cache,
+# like the recipe cache with RECIPE_CACHE_URL.
+ACCESS_TOKEN_REVOCATION_CACHE_ALIAS = "recipe"
+
+# Password hashing runs on a bounded pool (core.hashing). WORKERS defaults
+# to the number of CPUs; WAIT is how long (seconds) a job may wait for a
+# queue slot before the request is refused.
+PASSWORD_HASHING = {
+    "WORKERS": None,
+    "QUEUE_PER_WORKER": 4,
+    "WAIT": 5,
+}
+
+# (failures, window in seconds) allowed per email address and per client
+# IP before login attempts are refused without checking the password.
+LOGIN_ATTEMPT_LIMITS = {
+    "EMAIL": (5, 300),
+    "IP": (50, 300),
 }
+
+# Where user.limiter.client_ip finds the client address. Without a HEADER
+# it is REMOTE_ADDR, which behind a reverse proxy is the proxy's. Set
+# HEADER to the META key the proxies fill in (e.g. "HTTP_X_FORWARDED_FOR")
+# and PROXIES to how many of them the request passes through.
+CLIENT_IP = {
+    "HEADER": os.environ.get("CLIENT_IP_HEADER"),
+    "PROXIES": int(os.environ.get("CLIENT_IP_PROXIES", 1)),
+}
+
+# Recipes fetched (and their tags/ingredients prefetched) per chunk when
+# streaming /api/recipe/recipes/export/.
+RECIPE_EXPORT_CHUNK_SIZE = 500
+
+# Serialize recipe list and detail responses from values() rows
+# (recipe.fastpath) instead of with the DRF serializers. Same output.
+RECIPE_FAST_SERIALIZATION = True
+
+# Recipes written per transaction by /api/recipe/recipes/import/.
+RECIPE_IMPORT_BATCH_SIZE = 1000
+
+# Broker for background jobs (core.tasks). Tests swap in
+# core.tasks.ImmediateBroker; production can point BACKEND at any class
+# with an enqueue(name, *args) method.
+TASK_BROKER = {
+    "BACKEND": "core.tasks.ThreadPoolBroker",
+    "OPTIONS": {"max_workers": 2},
+}
+
+# Renditions made from every uploaded recipe image (recipe.images): the
+# longest edge in pixels per label, each written in every format.
+RECIPE_IMAGE_RENDITIONS = {"thumb": 160, "medium": 640, "large": 1280}
+RECIPE_IMAGE_FORMATS = ["webp", "jpeg"]
+RECIPE_IMAGE_QUALITY = 80
+# Uploads with more pixels than this are rejected, not decoded.
+RECIPE_IMAGE_MAX_PIXELS = 40_000_000
+
+# How media responses (core.media) send file bodies: None streams them
+# from Django, "x-accel-redirect" hands them to nginx through an internal
+# location at MEDIA_ACCEL_REDIRECT_PREFIX aliased to MEDIA_ROOT, and
+# "x-sendfile" hands their path to Apache or lighttpd.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_REDIRECT_PREFIX = "/protected-media/"
+
+# Where build_schema writes the precompiled OpenAPI schema served at
+# /api/schema/ (core.schema). With DEBUG on it is generated in memory.
+API_SCHEMA_DIR = BASE_DIR / "schema"
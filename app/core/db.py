@@ -0,0 +1,197 @@
+"""Database connection health checks and read-replica routing.
+
+Connections persist between requests (``CONN_MAX_AGE``), so one the
+server or a pooler has dropped in the meantime would fail the next
+request that uses it. ``check_connections`` runs at the start of every
+request and closes persistent connections that no longer answer, for
+Django to reopen on first use. Checking costs a round trip, so it only
+looks at aliases whose settings have ``CONN_HEALTH_CHECKS`` on, and only
+at connections that have gone ``DATABASE_CHECK_IDLE_SECONDS`` without a
+query; ``track_connection_use`` stamps their last query. Connections in
+steady use, and replicas checked recently, cost nothing.
+
+``ReplicaRouter`` sends reads to the aliases in ``DATABASE_REPLICAS``,
+but only inside ``replica_reads()``, which ``ReplicaReadMixin`` opens
+around safe (GET/HEAD/OPTIONS) requests once they are authenticated.
+Each request picks one replica and sticks to it. After the first write,
+and inside transactions on the primary, reads go to the primary for the
+rest of the request, so a request sees its own writes.
+
+Later requests see them too: after a request writes,
+``core.middleware.ReadYourWritesMiddleware`` pins its user to the primary
+for ``DATABASE_PIN_SECONDS``, long enough for the replicas to catch up.
+The pin is kept twice: as a timestamp per user in a shared cache, checked
+once the request is authenticated, and as a cookie and response header
+(``PIN_COOKIE``/``PIN_HEADER``) the client sends back, which also covers
+requests without a user, such as signing up.
+"""
+
+import contextlib
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+def _stamp_use(execute, sql, params, many, context):
+    context["connection"].last_used = time.monotonic()
+    return execute(sql, params, many, context)
+
+
+def track_connection_use(connection, **kwargs):
+    """Record when ``connection`` last ran a query (``connection_created``)."""
+    connection.last_used = time.monotonic()
+    if _stamp_use not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _stamp_use)
+
+
+def check_connections(**kwargs):
+    """Close idle persistent connections that have stopped working."""
+    now = time.monotonic()
+    for conn in connections.all():
+        if (
+            conn.connection is None
+            or not conn.settings_dict.get("CONN_HEALTH_CHECKS")
+            or conn.settings_dict.get("CONN_MAX_AGE") == 0
+            or conn.in_atomic_block
+            or now - getattr(conn, "last_used", 0)
+            < settings.DATABASE_CHECK_IDLE_SECONDS
+        ):
+            continue
+        conn.last_used = now
+        if not conn.is_usable():
+            conn.close()
+
+
+class _Routing:
+    def __init__(self):
+        self.replicas = False
+        self.pinned = False
+        self.wrote = False
+        self.alias = None
+
+
+_routing = contextvars.ContextVar("db_routing", default=None)
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Route this request's reads; see ``allow_replica_reads``.
+
+    Yields the request's routing state, which nested calls share.
+    """
+    state = _routing.get()
+    if state is not None:
+        yield state
+        return
+    token = _routing.set(_Routing())
+    try:
+        yield _routing.get()
+    finally:
+        _routing.reset(token)
+
+
+def allow_replica_reads():
+    """Let the reads of the current request go to a replica."""
+    state = _routing.get()
+    if state is not None:
+        state.replicas = True
+
+
+def pin_primary():
+    """Send the rest of the current request's reads to the primary."""
+    state = _routing.get()
+    if state is not None:
+        state.pinned = True
+
+
+PIN_COOKIE = "primary_pin"
+PIN_HEADER = "X-Primary-Pin"
+
+
+def _pin_cache():
+    return caches[settings.DATABASE_PIN_CACHE_ALIAS]
+
+
+def _pin_key(user_id):
+    return f"db:pin:{user_id}"
+
+
+def pin_user(user_id):
+    """Pin ``user_id`` to the primary; return when the pin expires."""
+    until = time.time() + settings.DATABASE_PIN_SECONDS
+    if user_id is not None:
+        _pin_cache().set(
+            _pin_key(user_id), until, settings.DATABASE_PIN_SECONDS
+        )
+    return until
+
+
+def user_pinned(user_id):
+    until = _pin_cache().get(_pin_key(user_id))
+    return until is not None and until > time.time()
+
+
+def client_pinned(request):
+    """Whether the request carries a pin from a recent write response."""
+    value = request.headers.get(PIN_HEADER) or request.COOKIES.get(PIN_COOKIE)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return False
+    # Pins from the future beyond one window can only be forged.
+    now = time.time()
+    return now < until <= now + settings.DATABASE_PIN_SECONDS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if (
+            state is None
+            or not state.replicas
+            or state.pinned
+            or not settings.DATABASE_REPLICAS
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        if state.alias is None:
+            state.alias = random.choice(settings.DATABASE_REPLICAS)
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Serve a view's safe requests from a read replica (see module docs)."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # Authenticate against the primary, so fresh tokens work at once.
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and settings.DATABASE_REPLICAS
+            and not user_pinned(request.user.pk)
+        ):
+            allow_replica_reads()
@@ -0,0 +1,93 @@
+"""Run password hashing on a bounded worker pool.
+
+PBKDF2 is CPU bound but releases the GIL, so a pool sized to the number
+of cores hashes in parallel while capping how much CPU a login storm can
+take. It doesn't save threads: sync callers block their request thread
+until the hash is done, after waiting up to ``PASSWORD_HASHING["WAIT"]``
+seconds for a queue slot. Async callers must not block the event loop,
+so they never wait for a slot. Both fail with ``HashingPoolBusy`` when
+the pool is saturated.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class HashingPoolBusy(Exception):
+    pass
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _get_pool():
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            options = settings.PASSWORD_HASHING
+            workers = options["WORKERS"] or os.cpu_count() or 1
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hashing"
+            )
+            _slots = threading.BoundedSemaphore(
+                workers * options["QUEUE_PER_WORKER"]
+            )
+    return _executor, _slots
+
+
+def _submit(wait, fn, args, kwargs):
+    executor, slots = _get_pool()
+    if wait:
+        acquired = slots.acquire(timeout=wait)
+    else:
+        acquired = slots.acquire(blocking=False)
+    if not acquired:
+        raise HashingPoolBusy("Password hashing pool is saturated.")
+    future = executor.submit(fn, *args, **kwargs)
+    future.add_done_callback(lambda f: slots.release())
+    return future
+
+
+def submit(fn, *args, **kwargs):
+    """Schedule ``fn`` on the hashing pool and return its future.
+
+    Blocks for up to ``PASSWORD_HASHING["WAIT"]`` seconds for a slot.
+    """
+    return _submit(settings.PASSWORD_HASHING["WAIT"], fn, args, kwargs)
+
+
+def run(fn, *args, **kwargs):
+    return submit(fn, *args, **kwargs).result()
+
+
+async def arun(fn, *args, **kwargs):
+    # Waiting for a slot would stall every request on the event loop.
+    return await asyncio.wrap_future(_submit(0, fn, args, kwargs))
+
+
+def make_password(raw_password):
+    return run(hashers.make_password, raw_password)
+
+
+def check_password(raw_password, encoded):
+    """Return ``(is_correct, must_update)`` for ``raw_password``."""
+    return run(_check, raw_password, encoded)
+
+
+async def acheck_password(raw_password, encoded):
+    return await arun(_check, raw_password, encoded)
+
+
+def _check(raw_password, encoded):
+    must_update = []
+    is_correct = hashers.check_password(
+        raw_password, encoded, setter=lambda raw: must_update.append(True)
+    )
+    return is_correct, bool(must_update)
@@ -0,0 +1,28 @@
+from core import schema
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema and write it, as JSON and YAML with "
+        "precompressed variants, for /api/schema/ to serve. Run it on "
+        "every deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output-dir",
+            default=None,
+            help="Directory to write to. Defaults to API_SCHEMA_DIR.",
+        )
+
+    def handle(self, *args, **options):
+        directory = options["output_dir"] or settings.API_SCHEMA_DIR
+        compiled = schema.generate()
+        for path in schema.write(compiled, directory):
+            self.stdout.write(f"wrote {path}")
+        if schema.brotli is None:
+            self.stdout.write(
+                "brotli is not installed; skipped the .br variants."
+            )
@@ -0,0 +1,97 @@
+import os
+from datetime import timedelta
+
+from core.models import StoredFile
+from core.storage import (
+    HASHED_NAME_RE,
+    TEMP_PREFIX,
+    ContentAddressedStorage,
+    count_references,
+)
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete content-addressed media files that nothing has referenced "
+        "for longer than the grace period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace",
+            type=int,
+            default=3600,
+            help="Seconds a file must have been unreferenced (default 1h).",
+        )
+        parser.add_argument(
+            "--recount",
+            action="store_true",
+            help="Recompute reference counts from the database first.",
+        )
+        parser.add_argument(
+            "--scan",
+            action="store_true",
+            help="Also remove files on disk that have no StoredFile row.",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError(
+                "DEFAULT_FILE_STORAGE is not content-addressed."
+            )
+
+        cutoff = timezone.now() - timedelta(seconds=options["grace"])
+        if options["recount"]:
+            self._recount(options["dry_run"])
+
+        deleted = 0
+        unreferenced = StoredFile.objects.filter(
+            refcount__lte=0, updated_at__lt=cutoff
+        ).values_list("name", flat=True)
+        for name in unreferenced.iterator():
+            if options["dry_run"] or storage.purge(name, unused_since=cutoff):
+                deleted += 1
+                self.stdout.write(f"deleted {name}")
+        self.stdout.write(f"{deleted} unreferenced files deleted")
+
+        if options["scan"]:
+            self._scan(storage, cutoff.timestamp(), options["dry_run"])
+
+    def _recount(self, dry_run):
+        counts = count_references()
+        fixed = 0
+        for stored in StoredFile.objects.iterator():
+            actual = counts.get(stored.name, 0)
+            if stored.refcount != actual:
+                fixed += 1
+                if not dry_run:
+                    with transaction.atomic():
+                        StoredFile.objects.filter(pk=stored.pk).update(
+                            refcount=actual, updated_at=timezone.now()
+                        )
+        self.stdout.write(f"{fixed} reference counts corrected")
+
+    def _scan(self, storage, cutoff, dry_run):
+        """Remove stray temporary files and hashed files without a row."""
+        removed = 0
+        for root, _, files in os.walk(storage.location):
+            for filename in files:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, storage.location).replace(
+                    os.sep, "/"
+                )
+                stray = filename.startswith(TEMP_PREFIX) or (
+                    HASHED_NAME_RE.search(name)
+                    and not StoredFile.objects.filter(name=name).exists()
+                )
+                if stray and os.path.getmtime(path) < cutoff:
+                    removed += 1
+                    if not dry_run:
+                        os.remove(path)
+        self.stdout.write(f"{removed} stray files removed")
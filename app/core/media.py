@@ -0,0 +1,187 @@
+"""Build responses for stored files without tying up Python workers.
+
+``file_response`` answers conditional requests (``If-None-Match``,
+``If-Modified-Since`` and friends) with 304s, serves single byte ranges
+as 206 Partial Content, and hands the transfer itself to the front-end
+server when ``MEDIA_SENDFILE`` says one is there:
+
+* ``"x-accel-redirect"``: nginx serves the file from an ``internal``
+  location mapped to ``MEDIA_ACCEL_REDIRECT_PREFIX``.
+* ``"x-sendfile"``: Apache (mod_xsendfile) or lighttpd serves the file
+  from its path under ``MEDIA_ROOT``.
+* ``None``: Django streams the file itself. Under WSGI servers with a
+  ``wsgi.file_wrapper`` (gunicorn's sync workers) the body, ranges
+  included, goes out through ``os.sendfile``.
+
+The front-end server handles ranges for offloaded files itself.
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from core.storage import HASHED_NAME_RE
+
+# Bytes per read when the body is not sent with sendfile.
+BLOCK_SIZE = 64 * 1024
+
+# Content-addressed files never change, so caches may keep them for good.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """Read at most ``length`` bytes of ``file`` from its position.
+
+    ``fileno()`` still exposes the whole file: WSGI file wrappers that
+    use sendfile start at the descriptor's offset and stop after
+    ``Content-Length`` bytes.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return the inclusive ``(start, end)`` a Range header asks for.
+
+    Returns None to serve the whole file: without a header, and for
+    multiple or malformed ranges, which RFC 7233 lets servers ignore.
+    Raises ValueError if the range is unsatisfiable.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # A suffix range: the last ``last`` bytes.
+        if int(last) == 0 or size == 0:
+            raise ValueError("Unsatisfiable range.")
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Unsatisfiable range.")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def _etag(name, st):
+    match = HASHED_NAME_RE.search(name)
+    if match:
+        # The name already is the SHA-256 of the content.
+        digest = match.group(0).lstrip("/").split(".")[0].replace("/", "")
+        return f'"{digest}"'
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def file_response(request, name, storage=None):
+    """Return a response serving the stored file ``name``."""
+    storage = storage or default_storage
+    try:
+        path = storage.path(name)
+        st = os.stat(path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("No such file.")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("No such file.")
+
+    etag = _etag(name, st)
+    last_modified = int(st.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL
+            if HASHED_NAME_RE.search(name)
+            else REVALIDATE_CACHE_CONTROL
+        ),
+    }
+    response = HttpResponse()
+    for header, value in headers.items():
+        response[header] = value
+    conditional = get_conditional_response(
+        request, etag, last_modified, response
+    )
+    if conditional is not response:
+        return conditional
+
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    backend = settings.MEDIA_SENDFILE
+    if backend == "x-accel-redirect":
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(name)
+        )
+    elif backend == "x-sendfile":
+        response["X-Sendfile"] = path
+    elif backend is not None:
+        raise ValueError(f"Unknown MEDIA_SENDFILE backend {backend!r}.")
+    if backend is not None:
+        response["Content-Type"] = content_type
+        return response
+
+    try:
+        byte_range = None
+        if _if_range_matches(request, etag, last_modified):
+            byte_range = parse_range(
+                request.META.get("HTTP_RANGE"), st.st_size
+            )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{st.st_size}"
+        return response
+
+    file = open(path, "rb")
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+        response["Content-Length"] = st.st_size
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            FileRange(file, end - start + 1),
+            status=206,
+            content_type=content_type,
+        )
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+    response.block_size = BLOCK_SIZE
+    response["Accept-Ranges"] = "bytes"
+    for header, value in headers.items():
+        response[header] = value
+    return response
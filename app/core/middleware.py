@@ -0,0 +1,180 @@
+"""Response compression and read-your-writes database pinning."""
+
+import asyncio
+import re
+
+from asgiref.sync import sync_to_async
+from core import db
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# It's not worth compressing really short responses.
+MIN_SIZE = 200
+# Fast enough for per-response compression, well ahead of gzip in size.
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_RE = re.compile(
+    r"^(text/|application/(json|x-ndjson|msgpack|javascript|xml|yaml|"
+    r"vnd\.oai\.openapi)|application/[\w.+-]+\+json)"
+)
+
+
+def accepted_encodings(header):
+    """Return the codings in an Accept-Encoding header with q > 0."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        match = re.search(r"\bq=([\d.]+)", params)
+        try:
+            if match and float(match.group(1)) <= 0:
+                continue
+        except ValueError:
+            continue
+        if coding.strip():
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for item in sequence:
+        # Flush every chunk so streamed responses keep streaming.
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+COMPRESSORS = {
+    "br": lambda data: brotli.compress(data, quality=BROTLI_QUALITY),
+    "gzip": compress_string,
+}
+SEQUENCE_COMPRESSORS = {"br": _brotli_sequence, "gzip": compress_sequence}
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress responses with brotli or gzip, as the client accepts.
+
+    Like Django's ``GZipMiddleware``, with brotli preferred when the
+    ``brotli`` package is installed, ``q`` values in Accept-Encoding
+    honoured, and only text-like (and MessagePack) content compressed:
+    images and other media are compressed already, and their range and
+    sendfile responses must go out byte for byte.
+    """
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < MIN_SIZE:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+        if getattr(response, "file_to_stream", None) is not None:
+            # WSGI servers send file_to_stream itself, not the content.
+            return response
+        if not COMPRESSIBLE_RE.match(response.get("Content-Type", "")):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # The compressed length isn't known until it has streamed.
+            response.streaming_content = SEQUENCE_COMPRESSORS[encoding](
+                response.streaming_content
+            )
+            del response["Content-Length"]
+        else:
+            compressed = COMPRESSORS[encoding](response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # A strong ETag names the uncompressed bytes; weaken it so
+        # conditional requests still match (RFC 7232 section 2.1).
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """Pin users to the primary database for a while after they write.
+
+    Reads of a request carrying a pin stay on the primary, and responses
+    to requests that wrote hand out a new pin (see ``core.db``). Put it
+    last, so only the views' own queries count as the request's writes.
+    It runs sync or async like the handler around it, so under ASGI it
+    never moves async views onto Django's single sync thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Let Django await __call__, as MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        with db.replica_reads() as state:
+            if db.client_pinned(request):
+                db.pin_primary()
+            response = self.get_response(request)
+        if state.wrote:
+            self.pin(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+
+        with db.replica_reads() as state:
+            if db.client_pinned(request):
+                db.pin_primary()
+            response = await self.get_response(request)
+        if state.wrote:
+            # request.user may still have to be loaded from the database.
+            await sync_to_async(self.pin)(request, response)
+        return response
+
+    def pin(self, request, response):
+        user = getattr(request, "user", None)
+        until = db.pin_user(
+            user.pk if user is not None and user.is_authenticated else None
+        )
+        response[db.PIN_HEADER] = f"{until:.3f}"
+        response.set_cookie(
+            db.PIN_COOKIE,
+            f"{until:.3f}",
+            max_age=settings.DATABASE_PIN_SECONDS,
+            secure=request.is_secure(),
+            httponly=True,
+            samesite="Lax",
+        )
@@ -0,0 +1,62 @@
+from django.db import migrations
+
+# The search vector only exists on PostgreSQL. It is not a model field:
+# the trigger below keeps it current on every insert and update (bulk
+# inserts included) and recipe.search queries it with raw SQL, so Django
+# never has to load or write it.
+FORWARD_SQL = [
+    "ALTER TABLE core_recipe ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION core_recipe_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')
+            || setweight(
+                to_tsvector('english', coalesce(NEW.description, '')), 'B'
+            );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_recipe_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON core_recipe
+    FOR EACH ROW EXECUTE PROCEDURE core_recipe_search_vector_update()
+    """,
+    """
+    UPDATE core_recipe SET search_vector =
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    """,
+    "CREATE INDEX recipe_search_vector_gin ON core_recipe "
+    "USING gin (search_vector)",
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER core_recipe_search_vector_trigger ON core_recipe",
+    "DROP FUNCTION core_recipe_search_vector_update()",
+    "ALTER TABLE core_recipe DROP COLUMN search_vector",
+]
+
+
+def _run_on_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_refreshtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run_on_postgresql(FORWARD_SQL), _run_on_postgresql(REVERSE_SQL)
+        ),
+    ]
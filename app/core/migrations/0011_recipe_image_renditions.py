@@ -0,0 +1,40 @@
+# Generated by Django 3.2.25 on 2026-10-17 00:39
+
+import core.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_usage_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], editable=False, max_length=10),
+        ),
+        migrations.CreateModel(
+            name='RecipeImageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=20)),
+                ('format', models.CharField(max_length=10)),
+                ('file', models.ImageField(height_field='height', upload_to=core.models.recipe_rendition_file_path, width_field='width')),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='core.recipe')),
+            ],
+            options={
+                'ordering': ['recipe', 'format', 'width'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recipeimagerendition',
+            constraint=models.UniqueConstraint(fields=('recipe', 'label', 'format'), name='unique_recipe_rendition'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 00:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_storedfile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['image', 'user'], name='recipe_image_user'),
+        ),
+        migrations.AddIndex(
+            model_name='recipeimagerendition',
+            index=models.Index(fields=['file'], name='rendition_file'),
+        ),
+    ]
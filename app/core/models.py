@@ -2,6 +2,7 @@ import os
 import uuid
 
 from app import settings
+from core import hashing
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -19,6 +20,13 @@ def recipe_image_file_path(instance, filename):
     return os.path.join("uploads", "recipe", filename)
 
 
+def recipe_rendition_file_path(instance, filename):
+    ext = os.path.splitext(filename)[1]
+    filename = f"{uuid.uuid4()}{ext}"
+
+    return os.path.join("uploads", "recipe", "renditions", filename)
+
+
 class UserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_field):
         if not email:
@@ -49,8 +57,31 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     USERNAME_FIELD = "email"
 
+    def set_password(self, raw_password):
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        is_correct, must_update = hashing.check_password(
+            raw_password, self.password
+        )
+        if is_correct and must_update:
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=["password"])
+        return is_correct
+
 
 class Recipe(models.Model):
+    IMAGE_PENDING = "pending"
+    IMAGE_READY = "ready"
+    IMAGE_FAILED = "failed"
+    IMAGE_STATUS_CHOICES = [
+        (IMAGE_PENDING, "Pending"),
+        (IMAGE_READY, "Ready"),
+        (IMAGE_FAILED, "Failed"),
+    ]
+
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
@@ -62,16 +93,82 @@ class Recipe(models.Model):
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image_status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUS_CHOICES,
+        blank=True,
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-id"], name="recipe_user_id_desc"),
+            # Media access checks look recipes up by image.
+            models.Index(fields=["image", "user"], name="recipe_image_user"),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class RecipeImageRendition(models.Model):
+    """A resized, metadata-free copy of a recipe image."""
+
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="renditions"
+    )
+    source = models.CharField(max_length=255)
+    label = models.CharField(max_length=20)
+    format = models.CharField(max_length=10)
+    file = models.ImageField(
+        upload_to=recipe_rendition_file_path,
+        width_field="width",
+        height_field="height",
+    )
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["recipe", "format", "width"]
+        indexes = [
+            models.Index(fields=["file"], name="rendition_file"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recipe", "label", "format"],
+                name="unique_recipe_rendition",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe} ({self.label} {self.format})"
+
+
 class Tag(models.Model):
     name = models.CharField(max_length=255)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
+    # Number of recipes using this tag, maintained by recipe.usage.
+    usage_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_tag_user_name"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-usage_count", "id"],
+                name="tag_user_usage_desc",
+            ),
+            models.Index(
+                fields=["user", "-name"],
+                condition=models.Q(usage_count__gt=0),
+                name="tag_user_assigned",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -82,6 +179,62 @@ class Ingredient(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
+    # Number of recipes using this ingredient, maintained by recipe.usage.
+    usage_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"], name="unique_ingredient_user_name"
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-usage_count", "id"],
+                name="ingredient_user_usage_desc",
+            ),
+            models.Index(
+                fields=["user", "-name"],
+                condition=models.Q(usage_count__gt=0),
+                name="ingredient_user_assigned",
+            ),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class StoredFile(models.Model):
+    """A file in content-addressed storage and how many fields use it."""
+
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    refcount = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(refcount__lte=0),
+                name="storedfile_unreferenced",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class RefreshToken(models.Model):
+    """A refresh token, stored only as a SHA-256 hash of its value."""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    token_hash = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user} ({self.token_hash[:8]})"
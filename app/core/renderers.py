@@ -0,0 +1,158 @@
+"""Renderers and parsers: orjson-backed JSON and MessagePack.
+
+orjson encodes dicts, lists, strings, numbers, UUIDs and datetimes in C.
+Everything else (Decimals, lazy translation strings, querysets, ...)
+goes through DRF's ``JSONEncoder.default``, the same hook the stock
+renderer uses. Serializers already turn prices into strings, so recipe
+payloads never reach that hook. The output is not always byte-for-byte
+DRF's compact JSON: datetimes keep their microseconds where DRF truncates
+them to milliseconds, and NaN and infinities become null instead of
+raising. Data orjson cannot encode at all, such as integers beyond 64
+bits, is rendered by DRF's renderer instead.
+
+Without orjson, or when indented output is asked for (the browsable
+API), both classes behave exactly like DRF's own.
+
+MessagePack (``application/msgpack``, needs the ``msgpack`` package) is
+offered by the recipe endpoints for clients on slow links. It carries
+the same structure as the JSON, except that Decimals are encoded exactly,
+as extension type ``DECIMAL_EXT_TYPE`` holding the decimal's ASCII string
+(e.g. ``b"5.50"``); serializer fields built on ``exact_decimals`` hand
+them over as Decimals when this renderer is used.
+"""
+
+import decimal
+
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Application-specific MessagePack extension type of exact decimals.
+DECIMAL_EXT_TYPE = 1
+
+_default = JSONEncoder().default
+
+# Escaped like DRF does, so the output stays a strict JavaScript subset.
+_LINE_SEPARATORS = (
+    (b"\xe2\x80\xa8", b"\\u2028"),
+    (b"\xe2\x80\xa9", b"\\u2029"),
+)
+
+
+def _orjson_dumps(data):
+    ret = orjson.dumps(
+        data,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+    )
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in ret:
+            ret = ret.replace(raw, escaped)
+    return ret
+
+
+def dumps(data):
+    """Return ``data`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return _orjson_dumps(data)
+        except orjson.JSONEncodeError:
+            pass
+    return renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            orjson is None
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            return _orjson_dumps(data)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(parsers.JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read()
+            if encoding.lower().replace("-", "") != "utf8":
+                data = data.decode(encoding)
+            # orjson rejects NaN and infinities, like a strict JSONParser.
+            return orjson.loads(data)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+
+
+def exact_decimals(context):
+    """Whether the response for ``context`` can carry Decimals exactly."""
+    request = context.get("request")
+    renderer = getattr(request, "accepted_renderer", None)
+    return getattr(renderer, "exact_decimals", False)
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, decimal.Decimal):
+        return msgpack.ExtType(DECIMAL_EXT_TYPE, str(obj).encode("ascii"))
+    return _default(obj)
+
+
+def _msgpack_ext_hook(code, data):
+    if code == DECIMAL_EXT_TYPE:
+        try:
+            return decimal.Decimal(data.decode("ascii"))
+        except (UnicodeDecodeError, decimal.InvalidOperation):
+            raise ValueError("invalid decimal")
+    raise ValueError(f"unknown extension type {code}")
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+    exact_decimals = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(
+            data, default=_msgpack_default, use_bin_type=True, datetime=False
+        )
+
+
+class MessagePackParser(parsers.BaseParser):
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(
+                stream.read(), ext_hook=_msgpack_ext_hook, raw=False
+            )
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError("MessagePack parse error - %s" % str(exc))
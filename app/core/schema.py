@@ -0,0 +1,144 @@
+"""Precompiled OpenAPI schema.
+
+Generating the drf-spectacular schema introspects every view and
+serializer, which takes far too long to repeat per request. The
+``build_schema`` command renders it once, as JSON and YAML, each also
+compressed with gzip and, when the ``brotli`` package is installed, with
+brotli. ``core.views.schema_view`` serves those bytes as they are.
+
+Without built files, or with ``DEBUG`` on, the schema is generated in
+memory on first use instead. In ``DEBUG`` it is generated again whenever
+the URLconf is reloaded, so the served schema follows code changes.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from django.conf import settings
+from django.urls import get_resolver
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+RENDERERS = {"yaml": OpenApiYamlRenderer, "json": OpenApiJsonRenderer}
+CONTENT_TYPES = {
+    "yaml": "application/vnd.oai.openapi",
+    "json": "application/vnd.oai.openapi+json",
+}
+# File suffix of each precompressed variant, best compression first.
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+class CompiledSchema:
+    """The rendered schema in every format and encoding.
+
+    ``variants[fmt][encoding]`` holds the bytes, with "identity" for the
+    uncompressed rendering; ``etags[fmt]`` is a hash of the latter.
+    """
+
+    def __init__(self, variants):
+        self.variants = variants
+        self.etags = {
+            fmt: hashlib.sha256(data["identity"]).hexdigest()[:32]
+            for fmt, data in variants.items()
+        }
+
+
+def compress(data):
+    variants = {
+        "identity": data,
+        "gzip": gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    return variants
+
+
+def generate():
+    """Generate the schema and return a CompiledSchema of it."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return CompiledSchema(
+        {
+            fmt: compress(renderer().render(schema, renderer_context={}))
+            for fmt, renderer in RENDERERS.items()
+        }
+    )
+
+
+def _write(path, data):
+    # Write beside the target and rename, so readers never see a partial
+    # file.
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def write(compiled, directory):
+    """Write every variant of ``compiled`` to ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for fmt, variants in compiled.variants.items():
+        for encoding, data in variants.items():
+            path = os.path.join(
+                directory, f"schema.{fmt}" + SUFFIXES.get(encoding, "")
+            )
+            _write(path, data)
+            paths.append(path)
+    return paths
+
+
+def load(directory):
+    """Return the CompiledSchema written to ``directory``, or None."""
+    variants = {}
+    for fmt in RENDERERS:
+        variants[fmt] = {}
+        for encoding, suffix in {"identity": "", **SUFFIXES}.items():
+            path = os.path.join(directory, f"schema.{fmt}{suffix}")
+            try:
+                with open(path, "rb") as f:
+                    variants[fmt][encoding] = f.read()
+            except FileNotFoundError:
+                if encoding == "identity":
+                    return None
+    return CompiledSchema(variants)
+
+
+_compiled = None
+_resolver = None
+_lock = threading.Lock()
+
+
+def get_compiled():
+    """Return the schema to serve, loading or generating it once."""
+    global _compiled, _resolver
+    resolver = get_resolver()
+    with _lock:
+        if _compiled is None or (settings.DEBUG and resolver is not _resolver):
+            compiled = None
+            if not settings.DEBUG:
+                compiled = load(settings.API_SCHEMA_DIR)
+                if compiled is None:
+                    logger.warning(
+                        "No schema in %s; run build_schema when deploying.",
+                        settings.API_SCHEMA_DIR,
+                    )
+            _compiled = compiled or generate()
+            _resolver = resolver
+    return _compiled
@@ -0,0 +1,210 @@
+"""Content-addressed file storage with reference counting.
+
+Files are stored under the SHA-256 of their content, so identical uploads
+share one file on disk. Only the directory and extension of the name
+passed to ``save`` are kept: ``uploads/recipe/<uuid>.jpg`` is stored as
+``uploads/recipe/3f/a91c...e0.jpg``. The hash is computed while the
+content streams, chunk by chunk, into a temporary file beside its final
+location; uploads received by ``core.uploads.HashingUploadHandler`` are
+hashed on arrival and simply moved into place.
+
+Each stored file has a ``core.models.StoredFile`` row counting the model
+fields that point at it (see ``track_references``). Referenced files are
+never deleted; the ``gc_media`` command removes files that have been
+unreferenced for longer than a grace period.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+from collections import Counter
+
+from core.models import StoredFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+CHUNK_SIZE = 64 * 1024
+TEMP_PREFIX = ".upload-"
+
+# Matches the file part of a content-addressed name.
+HASHED_NAME_RE = re.compile(r"(^|/)[0-9a-f]{2}/[0-9a-f]{62}(\.\w+)?$")
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content in _save; an existing file
+        # with that name is a duplicate to share, not a clash to avoid.
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        temp_path = None
+        digest = getattr(content, "sha256", None)
+        if digest and hasattr(content, "temporary_file_path"):
+            source = content.temporary_file_path()
+        else:
+            digest, temp_path = self._stream_to_temp(directory, content)
+            source = temp_path
+
+        name = posixpath.join(directory, digest[:2], digest[2:] + ext)
+        full_path = self.path(name)
+        try:
+            with transaction.atomic():
+                # Locking the row serializes this with gc_media deleting
+                # the same file.
+                (
+                    stored,
+                    _,
+                ) = StoredFile.objects.select_for_update().get_or_create(
+                    name=name, defaults={"size": os.path.getsize(source)}
+                )
+                if not os.path.exists(full_path):
+                    self._makedirs(os.path.dirname(full_path))
+                    file_move_safe(source, full_path, allow_overwrite=True)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(full_path, self.file_permissions_mode)
+                StoredFile.objects.filter(pk=stored.pk).update(
+                    updated_at=timezone.now()
+                )
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+        return name
+
+    def _makedirs(self, directory):
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(
+                    directory, self.directory_permissions_mode, exist_ok=True
+                )
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _stream_to_temp(self, directory, content):
+        """Copy ``content`` to a temporary file, returning its hash too."""
+        temp_dir = self.path(directory)
+        self._makedirs(temp_dir)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return digest.hexdigest(), temp_path
+
+    def delete(self, name):
+        """Delete ``name`` unless something still refers to it."""
+        self.purge(name)
+
+    def purge(self, name, unused_since=None):
+        """Delete ``name`` if it is unreferenced and return whether it was.
+
+        With ``unused_since``, files released or re-uploaded after that
+        time are kept as well.
+        """
+        with transaction.atomic():
+            stored = (
+                StoredFile.objects.select_for_update()
+                .filter(name=name)
+                .first()
+            )
+            if stored is not None and (
+                stored.refcount > 0
+                or (unused_since and stored.updated_at >= unused_since)
+            ):
+                return False
+            super().delete(name)
+            if stored is not None:
+                stored.delete()
+        return True
+
+
+def retain(name):
+    StoredFile.objects.filter(name=name).update(refcount=F("refcount") + 1)
+
+
+def release(name):
+    StoredFile.objects.filter(name=name).update(
+        refcount=F("refcount") - 1, updated_at=timezone.now()
+    )
+
+
+# (model, field name) pairs registered with track_references.
+tracked_fields = []
+
+
+def count_references():
+    """Return a Counter of references to each file from tracked fields."""
+    counts = Counter()
+    for model, field_name in tracked_fields:
+        names = model._base_manager.exclude(
+            **{f"{field_name}__in": ["", None]}
+        ).values_list(field_name, flat=True)
+        counts.update(names.iterator())
+    return counts
+
+
+def track_references(model, field_name):
+    """Keep StoredFile reference counts in step with ``model.field_name``.
+
+    Counts change in the same transaction as the row, so a rollback
+    leaves them untouched. Bulk inserts and ``update()`` calls bypass the
+    signals used here and must call ``retain``/``release`` themselves.
+    """
+    attname = model._meta.get_field(field_name).attname
+    key = f"_stored_{attname}"
+
+    def before_save(sender, instance, raw=False, update_fields=None, **kw):
+        if raw or (update_fields is not None and attname not in update_fields):
+            return
+        if instance._state.adding:
+            instance.__dict__[key] = ""
+            return
+        instance.__dict__[key] = (
+            sender._base_manager.using(instance._state.db)
+            .filter(pk=instance.pk)
+            .values_list(attname, flat=True)
+            .first()
+            or ""
+        )
+
+    def after_save(sender, instance, **kwargs):
+        old = instance.__dict__.pop(key, None)
+        if old is None:
+            return
+        new = getattr(instance, field_name).name or ""
+        if new != old:
+            if new:
+                retain(new)
+            if old:
+                release(old)
+
+    def after_delete(sender, instance, **kwargs):
+        name = getattr(instance, field_name).name
+        if name:
+            release(name)
+
+    if (model, field_name) not in tracked_fields:
+        tracked_fields.append((model, field_name))
+    uid = f"track_references:{model._meta.label}.{field_name}"
+    pre_save.connect(before_save, sender=model, weak=False, dispatch_uid=uid)
+    post_save.connect(after_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(
+        after_delete, sender=model, weak=False, dispatch_uid=uid
+    )
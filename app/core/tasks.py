@@ -0,0 +1,81 @@
+"""Hand background jobs to a pluggable broker.
+
+A job is the dotted path of a function plus JSON-friendly positional
+arguments, so a broker is free to run it in this process or to ship it to
+a separate worker. ``TASK_BROKER["BACKEND"]`` names the broker class and
+``TASK_BROKER["OPTIONS"]`` its keyword arguments. A broker only needs an
+``enqueue(name, *args)`` method; a production broker would typically
+forward the job to an external queue whose workers call ``run_task``.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def run_task(name, *args):
+    return import_string(name)(*args)
+
+
+class ImmediateBroker:
+    """Run each job right away in the calling thread. Meant for tests."""
+
+    def __init__(self, **options):
+        pass
+
+    def enqueue(self, name, *args):
+        run_task(name, *args)
+
+
+class ThreadPoolBroker:
+    """Run jobs on a pool of threads inside the web process."""
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tasks"
+        )
+
+    def enqueue(self, name, *args):
+        return self._executor.submit(self._run, name, args)
+
+    @staticmethod
+    def _run(name, args):
+        close_old_connections()
+        try:
+            run_task(name, *args)
+        except Exception:
+            logger.exception("Background task %s failed", name)
+        finally:
+            close_old_connections()
+
+
+_broker = None
+_broker_config = None
+_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker, _broker_config
+    config = settings.TASK_BROKER
+    with _lock:
+        if _broker is None or _broker_config != config:
+            _broker = import_string(config["BACKEND"])(
+                **config.get("OPTIONS", {})
+            )
+            _broker_config = config
+    return _broker
+
+
+def enqueue(name, *args):
+    return get_broker().enqueue(name, *args)
+
+
+def enqueue_on_commit(name, *args):
+    """Enqueue the job once the current transaction commits."""
+    transaction.on_commit(lambda: enqueue(name, *args))
@@ -0,0 +1,260 @@
+import time
+from unittest import mock, skipUnless
+
+from core.db import (
+    PIN_COOKIE,
+    PIN_HEADER,
+    ReplicaRouter,
+    allow_replica_reads,
+    check_connections,
+    client_pinned,
+    pin_user,
+    replica_reads,
+    user_pinned,
+)
+from core.models import Recipe, Tag
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connections
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.cache import invalidate_user
+from rest_framework.test import APIClient
+
+REPLICAS = ["replica_1", "replica_2"]
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_from_primary_by_default(self):
+        self.assertIsNone(self.router.db_for_read(Recipe))
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_sticks_to_one_replica(self):
+        with replica_reads():
+            allow_replica_reads()
+            alias = self.router.db_for_read(Recipe)
+            self.assertIn(alias, REPLICAS)
+            for _ in range(10):
+                self.assertEqual(self.router.db_for_read(Tag), alias)
+
+        self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_pins_to_primary_after_write(self):
+        with replica_reads():
+            allow_replica_reads()
+            self.assertEqual(self.router.db_for_write(Recipe), "default")
+
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+        with replica_reads():
+            allow_replica_reads()
+            self.assertIn(self.router.db_for_read(Recipe), REPLICAS)
+
+    def test_primary_inside_transactions(self):
+        with replica_reads(), mock.patch.object(
+            connections["default"], "in_atomic_block", True
+        ):
+            allow_replica_reads()
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        with replica_reads():
+            allow_replica_reads()
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_migrates_primary_only(self):
+        self.assertFalse(self.router.allow_migrate("replica_1", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+
+@override_settings(DATABASE_CHECK_IDLE_SECONDS=30)
+class CheckConnectionsTests(SimpleTestCase):
+    databases = {"default"}
+
+    def connection(
+        self, usable=True, health_checks=True, open=True, idle=60, age=60
+    ):
+        conn = mock.Mock(in_atomic_block=False)
+        conn.connection = object() if open else None
+        conn.settings_dict = {
+            "CONN_HEALTH_CHECKS": health_checks,
+            "CONN_MAX_AGE": age,
+        }
+        conn.last_used = time.monotonic() - idle
+        conn.is_usable.return_value = usable
+        return conn
+
+    def test_closes_unusable_connections(self):
+        broken = self.connection(usable=False)
+        healthy = self.connection()
+        unchecked = self.connection(usable=False, health_checks=False)
+        closed = self.connection(usable=False, open=False)
+        conns = [broken, healthy, unchecked, closed]
+
+        with mock.patch.object(connections, "all", return_value=conns):
+            check_connections()
+
+        broken.close.assert_called_once_with()
+        for conn in [healthy, unchecked, closed]:
+            conn.close.assert_not_called()
+        unchecked.is_usable.assert_not_called()
+
+    def test_checks_only_idle_persistent_connections(self):
+        recent = self.connection(idle=5)
+        per_request = self.connection(age=0)
+        idle = self.connection()
+
+        with mock.patch.object(
+            connections, "all", return_value=[recent, per_request, idle]
+        ):
+            check_connections()
+            check_connections()
+
+        recent.is_usable.assert_not_called()
+        per_request.is_usable.assert_not_called()
+        # Checking counts as use, so the next request skips it.
+        idle.is_usable.assert_called_once_with()
+
+    def test_queries_mark_connection_used(self):
+        conn = connections["default"]
+        conn.ensure_connection()
+        conn.last_used = 0
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+        self.assertAlmostEqual(conn.last_used, time.monotonic(), delta=1)
+
+
+@override_settings(DATABASE_PIN_SECONDS=10)
+class PinTests(SimpleTestCase):
+    def setUp(self):
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+
+    def test_user_pin(self):
+        self.assertFalse(user_pinned(1))
+
+        until = pin_user(1)
+
+        self.assertAlmostEqual(until, time.time() + 10, delta=1)
+        self.assertTrue(user_pinned(1))
+        self.assertFalse(user_pinned(2))
+        with mock.patch("core.db.time.time", return_value=until + 1):
+            self.assertFalse(user_pinned(1))
+
+    def test_client_pin(self):
+        now = time.time()
+        factory = RequestFactory()
+        cases = [
+            ({}, False),
+            ({"HTTP_X_PRIMARY_PIN": str(now + 5)}, True),
+            ({"HTTP_X_PRIMARY_PIN": str(now - 1)}, False),
+            ({"HTTP_X_PRIMARY_PIN": str(now + 3600)}, False),
+            ({"HTTP_X_PRIMARY_PIN": "soon"}, False),
+            ({"HTTP_COOKIE": f"{PIN_COOKIE}={now + 5}"}, True),
+        ]
+        for headers, expected in cases:
+            with self.subTest(headers=headers):
+                request = factory.get("/", **headers)
+                self.assertEqual(client_pinned(request), expected)
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "no read replicas configured")
+class ReplicaReadTests(TransactionTestCase):
+    """Run with DB_REPLICA_HOSTS set; replicas mirror the test database."""
+
+    databases = "__all__"
+
+    def setUp(self):
+        caches[settings.RECIPE_CACHE_ALIAS].clear()
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="replica@example.com", password="replicapass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def replica_queries(self, method, url, data=None, **extra):
+        # Cached responses would skip the database altogether.
+        invalidate_user(self.user.pk)
+        alias = settings.DATABASE_REPLICAS[0]
+        with mock.patch(
+            "core.db.random.choice", return_value=alias
+        ), CaptureQueriesContext(connections[alias]) as queries:
+            res = getattr(self.client, method)(
+                url, data, format="json", **extra
+            )
+        return res, len(queries)
+
+    def test_reads_go_to_replica(self):
+        for url in [
+            reverse("recipe:recipe-list"),
+            reverse("recipe:tag-list"),
+            reverse("recipe:ingredient-list"),
+        ]:
+            with self.subTest(url=url):
+                res, count = self.replica_queries("get", url)
+
+                self.assertEqual(res.status_code, 200)
+                self.assertGreater(count, 0)
+
+    def test_writes_go_to_primary(self):
+        payload = {"title": "Dal", "time_minutes": 30, "price": "4.50"}
+
+        res, count = self.replica_queries(
+            "post", reverse("recipe:recipe-list"), payload
+        )
+
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(count, 0)
+
+    def test_reads_own_writes(self):
+        url = reverse("recipe:recipe-list")
+        payload = {"title": "Dal", "time_minutes": 30, "price": "4.50"}
+
+        res, _ = self.replica_queries("post", url, payload)
+
+        self.assertIn(PIN_HEADER, res)
+        self.assertIn(PIN_COOKIE, res.cookies)
+        self.client.cookies.clear()
+        res, count = self.replica_queries("get", url)
+        self.assertEqual(count, 0)
+        self.assertEqual(res.data["results"][0]["title"], "Dal")
+
+        # Without the per-user pin, the client's pin still holds.
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+        _, count = self.replica_queries(
+            "get", url, HTTP_X_PRIMARY_PIN=str(time.time() + 5)
+        )
+        self.assertEqual(count, 0)
+
+        _, count = self.replica_queries("get", url)
+        self.assertGreater(count, 0)
+
+    def test_user_updates_pin(self):
+        res, _ = self.replica_queries(
+            "patch", reverse("user:me"), {"name": "Renamed"}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn(PIN_HEADER, res)
+        self.assertTrue(user_pinned(self.user.pk))
+
+    def test_reads_do_not_pin(self):
+        res, _ = self.replica_queries("get", reverse("recipe:tag-list"))
+
+        self.assertNotIn(PIN_HEADER, res)
+        self.assertFalse(user_pinned(self.user.pk))
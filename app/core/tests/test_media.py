@@ -0,0 +1,180 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+from core.media import FileRange, file_response, parse_range
+from core.storage import ContentAddressedStorage
+from django.core.files.base import ContentFile
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+DATA = bytes(range(256)) * 40
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            None: None,
+            "bytes=0-99": (0, 99),
+            "bytes=100-": (100, 999),
+            "bytes=-100": (900, 999),
+            "bytes=-5000": (0, 999),
+            "bytes=900-5000": (900, 999),
+            "bytes=0-0,5-9": None,
+            "bytes=9-5": None,
+            "bytes=-": None,
+            "items=0-9": None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+
+    def test_unsatisfiable(self):
+        for header, size in [("bytes=1000-", 1000), ("bytes=-0", 1000)]:
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    parse_range(header, size)
+
+    def test_file_range_stops_at_length(self):
+        source = io.BytesIO(DATA)
+        source.seek(10)
+        part = FileRange(source, 25)
+
+        self.assertEqual(part.read(20), DATA[10:30])
+        self.assertEqual(part.read(), DATA[30:35])
+        self.assertEqual(part.read(), b"")
+
+
+class FileResponseTests(SimpleTestCase):
+    databases = {"default"}
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        self.storage = ContentAddressedStorage(location=self.media_root)
+        self.name = self.storage.save("u/a.jpg", ContentFile(DATA))
+        self.factory = RequestFactory()
+
+    def get(self, name=None, **headers):
+        request = self.factory.get("/media/", **headers)
+        return file_response(request, name or self.name, self.storage)
+
+    def body(self, response):
+        content = b"".join(response.streaming_content)
+        response.close()
+        return content
+
+    def test_full_file(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), DATA)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], str(len(DATA)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(
+            response["ETag"], f'"{hashlib.sha256(DATA).hexdigest()}"'
+        )
+        self.assertEqual(
+            response["Cache-Control"], "private, max-age=31536000, immutable"
+        )
+
+    def test_not_modified(self):
+        etag = self.get()["ETag"]
+        last_modified = self.get()["Last-Modified"]
+
+        for headers in [
+            {"HTTP_IF_NONE_MATCH": etag},
+            {"HTTP_IF_MODIFIED_SINCE": last_modified},
+        ]:
+            with self.subTest(headers=headers):
+                response = self.get(**headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response["ETag"], etag)
+                self.assertFalse(response.has_header("Content-Length"))
+
+    def test_range(self):
+        response = self.get(HTTP_RANGE="bytes=100-299")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), DATA[100:300])
+        self.assertEqual(response["Content-Length"], "200")
+        self.assertEqual(
+            response["Content-Range"], f"bytes 100-299/{len(DATA)}"
+        )
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE="bytes=-10")
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.body(response), DATA[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE=f"bytes={len(DATA)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(DATA)}")
+
+    def test_if_range(self):
+        etag = self.get()["ETag"]
+        last_modified = self.get()["Last-Modified"]
+
+        for if_range, status in [
+            (etag, 206),
+            (last_modified, 206),
+            ('"stale"', 200),
+            (http_date(0), 200),
+        ]:
+            with self.subTest(if_range=if_range):
+                response = self.get(
+                    HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=if_range
+                )
+                self.assertEqual(response.status_code, status)
+                response.close()
+
+    def test_unhashed_file_revalidated(self):
+        with open(os.path.join(self.media_root, "legacy.png"), "wb") as f:
+            f.write(b"png")
+
+        response = self.get("legacy.png")
+
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(self.body(response), b"png")
+
+    def test_missing_or_outside_root(self):
+        for name in ["u/missing.jpg", "../etc/passwd", "u"]:
+            with self.subTest(name=name):
+                with self.assertRaises(Http404):
+                    self.get(name)
+
+    @override_settings(MEDIA_SENDFILE="x-accel-redirect")
+    def test_accel_redirect(self):
+        response = self.get(HTTP_RANGE="bytes=0-9")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(
+            response["X-Accel-Redirect"], f"/protected-media/{self.name}"
+        )
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertTrue(response.has_header("ETag"))
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_x_sendfile(self):
+        response = self.get()
+
+        self.assertEqual(response["X-Sendfile"], self.storage.path(self.name))
+        self.assertEqual(response.content, b"")
+
+    @override_settings(MEDIA_SENDFILE="x-sendfile")
+    def test_offload_still_answers_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.has_header("X-Sendfile"))
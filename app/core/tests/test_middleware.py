@@ -0,0 +1,170 @@
+import asyncio
+import gzip
+import time
+from unittest import skipIf
+
+from core import db, middleware
+from core.middleware import (
+    CompressionMiddleware,
+    ReadYourWritesMiddleware,
+    accepted_encodings,
+)
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+BODY = b'{"results":[' + b'{"title":"Dal"},' * 100 + b"{}]}"
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def process(self, response, accept_encoding="gzip, deflate, br"):
+        request = RequestFactory().get(
+            "/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        return CompressionMiddleware(lambda r: response)(request)
+
+    def json_response(self, body=BODY):
+        response = HttpResponse(body, content_type="application/json")
+        response["ETag"] = '"abc"'
+        return response
+
+    def test_gzip(self):
+        response = self.process(self.json_response(), "gzip, deflate")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(
+            response["Content-Length"], str(len(response.content))
+        )
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    @skipIf(middleware.brotli is None, "brotli is not installed")
+    def test_brotli_preferred(self):
+        response = self.process(self.json_response())
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(middleware.brotli.decompress(response.content), BODY)
+
+    def test_q_values(self):
+        cases = {
+            "gzip;q=0": None,
+            "gzip;q=0.5, br;q=0": "gzip",
+            "*": "gzip" if middleware.brotli is None else "br",
+            "identity": None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                response = self.process(self.json_response(), header)
+                self.assertEqual(response.get("Content-Encoding"), expected)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(
+            accepted_encodings("GZip;q=1.0, br;q=0, deflate;q=0.000, *"),
+            {"gzip", "*"},
+        )
+
+    def test_skips_small_and_binary_responses(self):
+        small = self.process(self.json_response(b"{}"))
+        image = self.process(HttpResponse(BODY, content_type="image/png"))
+
+        self.assertFalse(small.has_header("Content-Encoding"))
+        self.assertFalse(image.has_header("Content-Encoding"))
+        self.assertEqual(image.content, BODY)
+
+    def test_skips_file_responses(self):
+        response = FileResponse(
+            open(__file__, "rb"), content_type="application/json"
+        )
+
+        response = self.process(response)
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        response.close()
+
+    def test_skips_already_encoded(self):
+        response = self.json_response()
+        response["Content-Encoding"] = "br"
+
+        self.assertEqual(self.process(response).content, BODY)
+
+    def test_streaming(self):
+        response = StreamingHttpResponse(
+            iter([BODY, BODY]), content_type="application/x-ndjson"
+        )
+
+        response = self.process(response, "gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)), BODY * 2
+        )
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReadYourWritesMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        caches[settings.DATABASE_PIN_CACHE_ALIAS].clear()
+        self.router = db.ReplicaRouter()
+
+    def process(self, view, user=None, **headers):
+        request = RequestFactory().get("/", **headers)
+        request.user = user or AnonymousUser()
+        return ReadYourWritesMiddleware(view)(request)
+
+    def test_write_pins_user(self):
+        user = type("User", (), {"pk": 7, "is_authenticated": True})()
+
+        def view(request):
+            self.router.db_for_write(None)
+            return HttpResponse()
+
+        response = self.process(view, user)
+
+        self.assertTrue(db.user_pinned(7))
+        until = float(response[db.PIN_HEADER])
+        self.assertEqual(response.cookies[db.PIN_COOKIE].value, f"{until:.3f}")
+        self.assertEqual(
+            response.cookies[db.PIN_COOKIE]["max-age"],
+            settings.DATABASE_PIN_SECONDS,
+        )
+
+    def test_anonymous_write_pins_client(self):
+        def view(request):
+            self.router.db_for_write(None)
+            return HttpResponse()
+
+        response = self.process(view)
+
+        self.assertIn(db.PIN_HEADER, response)
+        self.assertFalse(db.user_pinned(None))
+
+    def test_client_pin_keeps_reads_on_primary(self):
+        reads = []
+
+        def view(request):
+            db.allow_replica_reads()
+            reads.append(self.router.db_for_read(None))
+            return HttpResponse()
+
+        response = self.process(view)
+        self.process(view, HTTP_X_PRIMARY_PIN=str(time.time() + 5))
+
+        self.assertEqual(reads, ["replica_1", None])
+        self.assertNotIn(db.PIN_HEADER, response)
+
+    async def test_async_write_pins_client(self):
+        async def view(request):
+            self.router.db_for_write(None)
+            return HttpResponse()
+
+        middleware = ReadYourWritesMiddleware(view)
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        response = await middleware(request)
+
+        self.assertIn(db.PIN_HEADER, response)
@@ -0,0 +1,186 @@
+import io
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import skipIf
+from unittest.mock import patch
+
+from core import renderers
+from core.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    MessagePackParser,
+    MessagePackRenderer,
+)
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+PAYLOAD = {
+    "results": ReturnList(
+        [
+            ReturnDict(
+                [
+                    ("id", 1),
+                    ("title", "Crème brûlée   line  sep"),
+                    ("price", "5.50"),
+                    ("tags", [OrderedDict([("id", 2), ("name", "Sweet")])]),
+                    ("link", ""),
+                    ("image", None),
+                ],
+                serializer=None,
+            )
+        ],
+        serializer=None,
+    ),
+    "next": None,
+    "count": 10**15,
+    "ratio": 0.1,
+    "ok": True,
+    "detail": ErrorDetail("Not found.", code="not_found"),
+    "lazy": gettext_lazy("Invalid token."),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "decimal": Decimal("5.25"),
+    3: "int key",
+}
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class FastJSONRendererTests(SimpleTestCase):
+    def test_matches_drf_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_line_separators_escaped(self):
+        output = FastJSONRenderer().render({"text": "a b c"})
+
+        self.assertEqual(output, b'{"text":"a\\u2028b\\u2029c"}')
+
+    def test_datetimes(self):
+        output = FastJSONRenderer().render(
+            {"at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)}
+        )
+
+        self.assertEqual(output, b'{"at":"2024-05-01T12:30:00Z"}')
+
+    def test_indented_output_uses_drf(self):
+        data = {"a": [1, 2]}
+
+        output = FastJSONRenderer().render(data, "application/json; indent=4")
+
+        self.assertEqual(
+            output, JSONRenderer().render(data, "application/json; indent=4")
+        )
+
+    def test_none(self):
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_big_integers_use_drf(self):
+        data = {"big": 2**64, "small": -(2**70)}
+
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+        self.assertEqual(renderers.dumps(data), JSONRenderer().render(data))
+
+
+class FallbackTests(SimpleTestCase):
+    def test_renders_without_orjson(self):
+        with patch.object(renderers, "orjson", None):
+            output = FastJSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(output, JSONRenderer().render(PAYLOAD))
+
+    def test_parses_without_orjson(self):
+        with patch.object(renderers, "orjson", None):
+            data = FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2.5]}'))
+
+        self.assertEqual(data, {"a": [1, 2.5]})
+
+
+@skipIf(renderers.orjson is None, "orjson is not installed")
+class FastJSONParserTests(SimpleTestCase):
+    def parse(self, body, encoding="utf-8"):
+        return FastJSONParser().parse(
+            io.BytesIO(body), parser_context={"encoding": encoding}
+        )
+
+    def test_matches_drf_parser(self):
+        body = JSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(
+            self.parse(body), JSONParser().parse(io.BytesIO(body))
+        )
+
+    def test_other_charset(self):
+        body = '{"title": "Crème"}'.encode("latin-1")
+
+        self.assertEqual(self.parse(body, "latin-1"), {"title": "Crème"})
+
+    def test_invalid_json(self):
+        for body in [b"{", b'{"a": NaN}', b"\xff"]:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(body)
+
+
+@skipIf(renderers.msgpack is None, "msgpack is not installed")
+class MessagePackTests(SimpleTestCase):
+    def parse(self, body):
+        return MessagePackParser().parse(io.BytesIO(body))
+
+    def test_round_trip(self):
+        data = {
+            "id": 1,
+            "title": "Crème brûlée",
+            "price": Decimal("5.50"),
+            "tags": [OrderedDict([("id", 2), ("name", "Sweet")])],
+            "image": None,
+        }
+
+        output = MessagePackRenderer().render(data)
+
+        self.assertEqual(self.parse(output), data)
+        self.assertEqual(str(self.parse(output)["price"]), "5.50")
+
+    def test_decimal_extension_type(self):
+        output = MessagePackRenderer().render([Decimal("-0.10")])
+
+        self.assertEqual(
+            renderers.msgpack.unpackb(output),
+            [renderers.msgpack.ExtType(renderers.DECIMAL_EXT_TYPE, b"-0.10")],
+        )
+
+    def test_other_types_as_in_json(self):
+        data = {
+            "detail": ErrorDetail("Not found.", code="not_found"),
+            "lazy": gettext_lazy("Invalid token."),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "at": datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        }
+
+        output = MessagePackRenderer().render(data)
+
+        self.assertEqual(
+            self.parse(output),
+            FastJSONParser().parse(io.BytesIO(JSONRenderer().render(data))),
+        )
+
+    def test_invalid_input(self):
+        msgpack = renderers.msgpack
+        for body in [
+            b"",
+            b"\xc1",
+            msgpack.packb(1) + b"\x01",
+            msgpack.packb(msgpack.ExtType(renderers.DECIMAL_EXT_TYPE, b"x")),
+            msgpack.packb(msgpack.ExtType(9, b"")),
+        ]:
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError):
+                    self.parse(body)
@@ -0,0 +1,128 @@
+import gzip
+import json
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from core import schema
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import clear_url_caches, reverse
+
+SCHEMA_URL = reverse("api-schema")
+
+
+class SchemaTestCase(SimpleTestCase):
+    def setUp(self):
+        self.schema_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.schema_dir, True)
+        settings_override = override_settings(
+            API_SCHEMA_DIR=self.schema_dir, DEBUG=False
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = patch.object(schema, "_compiled", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class BuildSchemaTests(SchemaTestCase):
+    def test_writes_every_variant(self):
+        call_command("build_schema", stdout=StringIO())
+
+        compiled = schema.load(self.schema_dir)
+        json_schema = compiled.variants["json"]
+        self.assertIn(
+            "/api/recipe/recipes/",
+            json.loads(json_schema["identity"])["paths"],
+        )
+        self.assertEqual(
+            gzip.decompress(json_schema["gzip"]), json_schema["identity"]
+        )
+        self.assertTrue(
+            compiled.variants["yaml"]["identity"].startswith(b"openapi:")
+        )
+
+    def test_load_without_files(self):
+        self.assertIsNone(schema.load(self.schema_dir))
+
+
+class SchemaViewTests(SchemaTestCase):
+    def setUp(self):
+        super().setUp()
+        call_command("build_schema", stdout=StringIO())
+
+    def test_serves_built_files_without_generating(self):
+        with patch.object(schema, "generate") as generate:
+            res = self.client.get(SCHEMA_URL)
+
+        generate.assert_not_called()
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res["Content-Type"], "application/vnd.oai.openapi")
+        self.assertTrue(res.content.startswith(b"openapi:"))
+        self.assertIn("Accept-Encoding", res["Vary"])
+
+    def test_json_format(self):
+        for params, headers in [
+            ({"format": "json"}, {}),
+            ({}, {"HTTP_ACCEPT": "application/json"}),
+        ]:
+            with self.subTest(params=params, headers=headers):
+                res = self.client.get(SCHEMA_URL, params, **headers)
+
+                self.assertEqual(
+                    res["Content-Type"], "application/vnd.oai.openapi+json"
+                )
+                self.assertIn("paths", json.loads(res.content))
+
+    def test_gzip_variant(self):
+        plain = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertNotEqual(res["ETag"], plain["ETag"])
+
+    def test_refused_encodings_not_served(self):
+        for header, expected in [
+            ("br;q=0, gzip", "gzip"),
+            ("gzip;q=0", None),
+            ("identity, gzip;q=0.0", None),
+            ("*", "gzip" if schema.brotli is None else "br"),
+        ]:
+            with self.subTest(header=header):
+                res = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING=header)
+
+                self.assertEqual(res.get("Content-Encoding"), expected)
+
+    def test_not_modified(self):
+        etag = self.client.get(SCHEMA_URL)["ETag"]
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b"")
+
+    def test_post_not_allowed(self):
+        res = self.client.post(SCHEMA_URL)
+
+        self.assertEqual(res.status_code, 405)
+
+
+class SchemaGenerationTests(SchemaTestCase):
+    def test_generated_once_without_built_files(self):
+        with self.assertLogs("core.schema", "WARNING"):
+            first = schema.get_compiled()
+
+        self.assertIs(schema.get_compiled(), first)
+
+    @override_settings(DEBUG=True)
+    def test_debug_regenerates_when_urlconf_reloads(self):
+        first = schema.get_compiled()
+        self.assertIs(schema.get_compiled(), first)
+
+        clear_url_caches()
+
+        self.assertIsNot(schema.get_compiled(), first)
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from core.models import Recipe, StoredFile
+from core.storage import ContentAddressedStorage
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+def jpeg_bytes(color="red"):
+    from PIL import Image
+
+    out = tempfile.SpooledTemporaryFile()
+    Image.new("RGB", (20, 20), color).save(out, format="JPEG")
+    out.seek(0)
+    return out.read()
+
+
+class StorageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            TASK_BROKER={"BACKEND": "core.tasks.ImmediateBroker"},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = ContentAddressedStorage()
+
+
+class ContentAddressedStorageTests(StorageTestCase):
+    def test_name_is_content_hash(self):
+        data = b"x" * 200_000
+
+        name = self.storage.save("uploads/recipe/abc.JPG", ContentFile(data))
+
+        digest = hashlib.sha256(data).hexdigest()
+        self.assertEqual(name, f"uploads/recipe/{digest[:2]}/{digest[2:]}.jpg")
+        self.assertLessEqual(len(name), 100)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(StoredFile.objects.get(name=name).size, len(data))
+
+    def test_duplicates_share_one_file(self):
+        first = self.storage.save("uploads/a.jpg", ContentFile(b"same"))
+        second = self.storage.save("uploads/b.jpg", ContentFile(b"same"))
+        other = self.storage.save("uploads/c.jpg", ContentFile(b"other"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(StoredFile.objects.count(), 2)
+        leftovers = [
+            name
+            for _, _, files in os.walk(self.media_root)
+            for name in files
+            if name.startswith(".upload-")
+        ]
+        self.assertEqual(leftovers, [])
+
+    def test_prehashed_upload_moved_into_place(self):
+        upload = TemporaryUploadedFile("big.jpg", "image/jpeg", 5, None)
+        upload.write(b"hello")
+        upload.flush()
+        upload.sha256 = hashlib.sha256(b"hello").hexdigest()
+        temp_path = upload.temporary_file_path()
+
+        name = self.storage.save("uploads/big.jpg", upload)
+        upload.close()
+
+        self.assertFalse(os.path.exists(temp_path))
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b"hello")
+
+    def test_referenced_file_not_deleted(self):
+        name = self.storage.save("uploads/a.jpg", ContentFile(b"data"))
+        StoredFile.objects.filter(name=name).update(refcount=1)
+
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+
+        StoredFile.objects.filter(name=name).update(refcount=0)
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+
+class ReferenceCountTests(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            email="storage@example.com", password="storagepass"
+        )
+
+    def create_recipe(self, **params):
+        return Recipe.objects.create(
+            user=self.user,
+            title="Upma",
+            time_minutes=10,
+            price=Decimal("1.00"),
+            **params,
+        )
+
+    def refcount(self, name):
+        return StoredFile.objects.get(name=name).refcount
+
+    def test_counts_follow_image_fields(self):
+        r1 = self.create_recipe()
+        r2 = self.create_recipe()
+        r1.image.save("a.jpg", ContentFile(jpeg_bytes()))
+        r2.image.save("b.jpg", ContentFile(jpeg_bytes()))
+        shared = r1.image.name
+        self.assertEqual(r2.image.name, shared)
+        self.assertEqual(self.refcount(shared), 2)
+
+        r1.image.save("c.jpg", ContentFile(jpeg_bytes("blue")))
+        self.assertEqual(self.refcount(shared), 1)
+        self.assertEqual(self.refcount(r1.image.name), 1)
+
+        r2.delete()
+        self.assertEqual(self.refcount(shared), 0)
+
+    def test_upload_dedupes_and_renditions_counted(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        recipes = [self.create_recipe(), self.create_recipe()]
+        data = jpeg_bytes()
+
+        with override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=0):
+            for recipe in recipes:
+                with self.captureOnCommitCallbacks(execute=True):
+                    client.post(
+                        reverse(
+                            "recipe:recipe-upload-image", args=[recipe.id]
+                        ),
+                        {"image": SimpleUploadedFile("p.jpg", data)},
+                        format="multipart",
+                    )
+
+        names = {r.image.name for r in Recipe.objects.filter(user=self.user)}
+        self.assertEqual(len(names), 1)
+        self.assertEqual(self.refcount(names.pop()), 2)
+        # Only the upload itself, replaced by its re-encoding, is left
+        # unreferenced for gc_media.
+        unreferenced = StoredFile.objects.filter(refcount=0)
+        self.assertEqual(unreferenced.count(), 1)
+        self.assertEqual(
+            unreferenced.get().size, len(data), unreferenced.get().name
+        )
+        self.assertFalse(StoredFile.objects.filter(refcount__lt=0).exists())
+
+
+class GarbageCollectionTests(StorageTestCase):
+    def gc(self, *args):
+        out = StringIO()
+        call_command("gc_media", *args, stdout=out)
+        return out.getvalue()
+
+    def test_deletes_only_old_unreferenced_files(self):
+        old = default_storage.save("u/old.jpg", ContentFile(b"old"))
+        fresh = default_storage.save("u/fresh.jpg", ContentFile(b"fresh"))
+        used = default_storage.save("u/used.jpg", ContentFile(b"used"))
+        StoredFile.objects.filter(name=used).update(refcount=1)
+        StoredFile.objects.exclude(name=fresh).update(
+            updated_at=timezone.now() - timedelta(hours=2)
+        )
+
+        output = self.gc()
+
+        self.assertIn("1 unreferenced files deleted", output)
+        self.assertFalse(default_storage.exists(old))
+        self.assertTrue(default_storage.exists(fresh))
+        self.assertTrue(default_storage.exists(used))
+
+    def test_recount(self):
+        user = get_user_model().objects.create_user(
+            email="gc@example.com", password="gcpass"
+        )
+        recipe = Recipe.objects.create(
+            user=user, title="Poha", time_minutes=5, price=Decimal("1.00")
+        )
+        recipe.image.save("a.jpg", ContentFile(jpeg_bytes()))
+        StoredFile.objects.update(refcount=0)
+
+        output = self.gc("--recount", "--grace=0")
+
+        self.assertIn("1 reference counts corrected", output)
+        self.assertEqual(
+            StoredFile.objects.get(name=recipe.image.name).refcount, 1
+        )
+        self.assertTrue(default_storage.exists(recipe.image.name))
+
+    def test_scan_removes_stray_files(self):
+        name = default_storage.save("u/a.jpg", ContentFile(b"a"))
+        StoredFile.objects.all().delete()
+        temp = os.path.join(self.media_root, "u", ".upload-abc")
+        with open(temp, "wb") as f:
+            f.write(b"partial")
+        past = timezone.now().timestamp() - 7200
+        for path in (temp, default_storage.path(name)):
+            os.utime(path, (past, past))
+
+        output = self.gc("--scan")
+
+        self.assertIn("2 stray files removed", output)
+        self.assertFalse(os.path.exists(temp))
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase, override_settings
+
+from core import tasks
+
+calls = []
+
+
+def record(*args):
+    calls.append(args)
+
+
+def explode():
+    raise RuntimeError("boom")
+
+
+class TaskBrokerTests(SimpleTestCase):
+    def setUp(self):
+        calls.clear()
+
+    @override_settings(TASK_BROKER={"BACKEND": "core.tasks.ImmediateBroker"})
+    def test_immediate_broker_runs_inline(self):
+        tasks.enqueue("core.tests.test_tasks.record", 1, "a")
+
+        self.assertEqual(calls, [(1, "a")])
+
+    @override_settings(
+        TASK_BROKER={
+            "BACKEND": "core.tasks.ThreadPoolBroker",
+            "OPTIONS": {"max_workers": 1},
+        }
+    )
+    def test_thread_pool_broker(self):
+        self.assertIsInstance(tasks.get_broker(), tasks.ThreadPoolBroker)
+
+        tasks.enqueue("core.tests.test_tasks.record", 2).result(timeout=5)
+        with self.assertLogs("core.tasks", "ERROR"):
+            tasks.enqueue("core.tests.test_tasks.explode").result(timeout=5)
+
+        self.assertEqual(calls, [(2,)])
+
+    def test_broker_follows_settings(self):
+        with self.settings(
+            TASK_BROKER={"BACKEND": "core.tasks.ImmediateBroker"}
+        ):
+            self.assertIsInstance(tasks.get_broker(), tasks.ImmediateBroker)
+        self.assertIsInstance(tasks.get_broker(), tasks.ThreadPoolBroker)
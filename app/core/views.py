@@ -1,3 +1,49 @@
-from django.shortcuts import render
+from core import schema
+from core.middleware import accepted_encodings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_safe
 
-# Create your views here.
+
+def _negotiate_format(request):
+    fmt = request.GET.get("format")
+    if fmt in schema.RENDERERS:
+        return fmt
+    accept = request.headers.get("Accept", "")
+    return "json" if "json" in accept else "yaml"
+
+
+@require_safe
+def schema_view(request):
+    """Serve the precompiled OpenAPI schema (see core.schema)."""
+    compiled = schema.get_compiled()
+    fmt = _negotiate_format(request)
+    variants = compiled.variants[fmt]
+    accepted = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+    encoding = next(
+        (
+            encoding
+            for encoding in schema.SUFFIXES
+            if encoding in variants
+            and (encoding in accepted or "*" in accepted)
+        ),
+        "identity",
+    )
+
+    etag = compiled.etags[fmt]
+    if encoding != "identity":
+        etag += f"-{encoding}"
+    response = HttpResponse(content_type=schema.CONTENT_TYPES[fmt])
+    response["ETag"] = f'"{etag}"'
+    response["Cache-Control"] = "public, no-cache"
+    patch_vary_headers(response, ["Accept", "Accept-Encoding"])
+    conditional = get_conditional_response(
+        request, f'"{etag}"', None, response
+    )
+    if conditional is not response:
+        return conditional
+
+    response.content = variants[encoding]
+    if encoding != "identity":
+        response["Content-Encoding"] = encoding
+    return response
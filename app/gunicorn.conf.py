@@ -0,0 +1,21 @@
+"""Gunicorn settings for serving the ASGI application with uvicorn workers.
+
+    gunicorn app.asgi:application -c gunicorn.conf.py
+
+The sync WSGI entry point (app.wsgi:application) keeps working with the
+default sync worker class if the async path needs to be bypassed.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(
+    os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = os.environ.get(
+    "GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker"
+)
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
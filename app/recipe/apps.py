@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class RecipeConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "recipe"
+
+    def ready(self):
+        from recipe import signals  # noqa: F401
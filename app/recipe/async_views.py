@@ -0,0 +1,53 @@
+"""Async entry points for the read-only recipe endpoints.
+
+Django 3.2 has no async ORM, so each request runs the existing viewset
+on a worker thread (``thread_sensitive=False``) while the event loop
+keeps serving other connections. Authentication, caching, pagination and
+serialization therefore behave exactly like the sync endpoints, which
+stay available as the fallback.
+"""
+
+from asgiref.sync import sync_to_async
+from core.db import check_connections
+from django.db import close_old_connections
+from django.http import JsonResponse
+
+from recipe.views import IngredientViewSet, RecipeViewSet, TagViewSet
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def _run_view(view, request, kwargs):
+    # Worker threads don't get Django's request_started/finished signals,
+    # so clean up their database connections here.
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def async_read_view(viewset, actions):
+    view = viewset.as_view(actions)
+    run = sync_to_async(_run_view, thread_sensitive=False)
+
+    async def async_view(request, **kwargs):
+        if request.method not in SAFE_METHODS:
+            return JsonResponse(
+                {"detail": f'Method "{request.method}" not allowed.'},
+                status=405,
+            )
+        return await run(view, request, kwargs)
+
+    async_view.csrf_exempt = True
+    return async_view
+
+
+recipe_list = async_read_view(RecipeViewSet, {"get": "list"})
+recipe_detail = async_read_view(RecipeViewSet, {"get": "retrieve"})
+tag_list = async_read_view(TagViewSet, {"get": "list"})
+ingredient_list = async_read_view(IngredientViewSet, {"get": "list"})
@@ -0,0 +1,148 @@
+from core.models import Ingredient, Recipe, Tag
+from django.db import connections, router, transaction
+
+from recipe.cache import invalidate_user
+from recipe.usage import defer_usage_counts, linked_ids, refresh_usage_counts
+
+
+def get_or_create_by_name(model, user, names, known=None):
+    """Return ``{name: obj}`` for a user, creating missing rows in bulk.
+
+    Existing rows are resolved with a single query and the missing ones
+    are inserted with one ``bulk_create`` and read back, so the cost does
+    not depend on how many names are passed. ``known`` is an optional
+    ``{name: obj}`` map that is consulted first and updated in place, so
+    long-running imports only look up each name once.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+
+    known = {} if known is None else known
+    found = {name: known[name] for name in names if name in known}
+    lookup = [name for name in names if name not in found]
+    if lookup:
+        found.update(
+            (obj.name, obj)
+            for obj in model.objects.filter(user=user, name__in=lookup)
+        )
+    missing = [name for name in names if name not in found]
+    if missing:
+        # The (user, name) unique constraint makes concurrent writers
+        # race safely: conflicting rows are skipped and then re-read.
+        model.objects.bulk_create(
+            [model(user=user, name=name) for name in missing],
+            ignore_conflicts=True,
+        )
+        found.update(
+            (obj.name, obj)
+            for obj in model.objects.filter(user=user, name__in=missing)
+        )
+        invalidate_user(user.pk)
+
+    known.update(found)
+    return found
+
+
+def _insert_all(model, objs):
+    """Insert ``objs`` and make sure every one of them has a primary key."""
+    connection = connections[router.db_for_write(model)]
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+
+    for obj in objs:
+        obj.save(force_insert=True)
+    return objs
+
+
+def bulk_create_recipes(user, items, known=None):
+    """Create recipes with their nested tags and ingredients in bulk.
+
+    ``items`` are validated ``RecipeSerializer`` payloads. Tag and
+    ingredient names are deduplicated across the whole batch, so the
+    number of queries does not grow with the number of recipes. Bulk
+    inserts send no model signals, so the response cache and the usage
+    counts are updated here explicitly. ``known`` optionally maps each
+    model to a ``{name: obj}`` cache shared between calls.
+    """
+    known = {} if known is None else known
+    tags = get_or_create_by_name(
+        Tag,
+        user,
+        [tag["name"] for item in items for tag in item.get("tags", [])],
+        known.setdefault(Tag, {}),
+    )
+    ingredients = get_or_create_by_name(
+        Ingredient,
+        user,
+        [
+            ingredient["name"]
+            for item in items
+            for ingredient in item.get("ingredients", [])
+        ],
+        known.setdefault(Ingredient, {}),
+    )
+
+    recipes = _insert_all(
+        Recipe,
+        [
+            Recipe(
+                user=user,
+                **{
+                    k: v
+                    for k, v in item.items()
+                    if k not in ("tags", "ingredients", "user")
+                },
+            )
+            for item in items
+        ],
+    )
+
+    tag_links = set()
+    ingredient_links = set()
+    for recipe, item in zip(recipes, items):
+        for tag in item.get("tags", []):
+            tag_links.add((recipe.id, tags[tag["name"]].id))
+        for ingredient in item.get("ingredients", []):
+            ingredient_links.add(
+                (recipe.id, ingredients[ingredient["name"]].id)
+            )
+
+    Recipe.tags.through.objects.bulk_create(
+        [
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id, tag_id in tag_links
+        ]
+    )
+    Recipe.ingredients.through.objects.bulk_create(
+        [
+            Recipe.ingredients.through(
+                recipe_id=recipe_id, ingredient_id=ingredient_id
+            )
+            for recipe_id, ingredient_id in ingredient_links
+        ]
+    )
+    refresh_usage_counts(Tag, {tag_id for _, tag_id in tag_links})
+    refresh_usage_counts(
+        Ingredient, {ingredient_id for _, ingredient_id in ingredient_links}
+    )
+    invalidate_user(user.pk)
+
+    return recipes
+
+
+def delete_recipes(queryset):
+    """Delete the recipes in ``queryset`` and return their ids.
+
+    The tags and ingredients linked to all of them are collected with one
+    query per model and their usage counts refreshed once at the end,
+    rather than by the delete signals for every recipe.
+    """
+    with transaction.atomic():
+        ids = set(queryset.values_list("id", flat=True))
+        usage = linked_ids(ids)
+        with defer_usage_counts():
+            Recipe.objects.filter(id__in=ids).delete()
+        for model, linked in usage.items():
+            refresh_usage_counts(model, linked)
+    return ids
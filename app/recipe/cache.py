@@ -0,0 +1,128 @@
+"""Per-user response cache for the recipe API.
+
+Every user has a generation counter in the cache. Cached responses are
+keyed on it, so bumping the counter after a write makes all of that
+user's cached lists and details unreachable at once.
+"""
+
+import hashlib
+import secrets
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+# Query parameters holding comma separated lists, order-insensitive.
+LIST_PARAMS = ("tags", "ingredients", "fields", "expand")
+
+# Query parameter values that mean the same as leaving them out.
+DEFAULT_PARAMS = {("assigned_only", "0"), ("match", "any")}
+
+
+def _cache():
+    return caches[settings.RECIPE_CACHE_ALIAS]
+
+
+def _generation_key(user_id):
+    return f"recipe:gen:{user_id}"
+
+
+def get_generation(user_id):
+    cache = _cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from a random value so an evicted counter can't fall back
+        # onto a generation that still has responses cached under it.
+        cache.add(key, secrets.randbits(48), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump(user_id):
+    cache = _cache()
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        cache.add(_generation_key(user_id), secrets.randbits(48), None)
+
+
+def invalidate_user(user_id):
+    """Drop every cached response belonging to ``user_id``.
+
+    The counter is bumped right away and again once the surrounding
+    transaction commits, so a read racing the write can't leave stale
+    data cached.
+    """
+    _bump(user_id)
+    transaction.on_commit(lambda: _bump(user_id))
+
+
+def normalize_query_params(query_params):
+    """Return a canonical, order-independent encoding of ``query_params``."""
+    items = []
+    for name, values in query_params.lists():
+        for value in values:
+            if name in LIST_PARAMS:
+                value = ",".join(sorted(v for v in value.split(",") if v))
+            elif (name, value) in DEFAULT_PARAMS:
+                continue
+            if value:
+                items.append((name, value))
+    return urlencode(sorted(items))
+
+
+class CachedResponseMixin:
+    """Cache list and retrieve responses per user, with ETag support."""
+
+    cached_actions = ("list", "retrieve")
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_response_cache_key(self, request):
+        user_id = request.user.pk
+        parts = [
+            type(self).__name__,
+            self.action,
+            str(self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)),
+            request.get_host(),
+            request.accepted_renderer.format,
+            normalize_query_params(request.query_params),
+        ]
+        digest = hashlib.sha1("|".join(parts).encode()).hexdigest()
+        return f"recipe:resp:{user_id}:{get_generation(user_id)}:{digest}"
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if self.action not in self.cached_actions:
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+
+        if etag in request.headers.get("If-None-Match", ""):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache = _cache()
+            data = cache.get(key)
+            if data is not None:
+                response = Response(data)
+            else:
+                response = handler(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, settings.RECIPE_CACHE_TIMEOUT)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Accept", "Authorization"])
+        return response
@@ -0,0 +1,53 @@
+"""Stream a user's recipes as a JSON array or as NDJSON."""
+
+from core.renderers import dumps
+from django.db.models import prefetch_related_objects
+
+from recipe.fieldsets import prefetches
+
+PREFETCH = prefetches(None)
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def iter_chunks(queryset, chunk_size, prefetch=PREFETCH):
+    """Yield lists of recipes with the ``prefetch`` relations prefetched.
+
+    Rows come from ``queryset.iterator()`` (a server-side cursor where the
+    backend supports one), so only one chunk is held in memory at a time.
+    """
+    chunk = []
+    for recipe in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(recipe)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, *prefetch)
+            yield chunk
+            chunk = []
+    if chunk:
+        prefetch_related_objects(chunk, *prefetch)
+        yield chunk
+
+
+def iter_rows(
+    queryset, serializer_class, context, chunk_size, prefetch=PREFETCH
+):
+    for chunk in iter_chunks(queryset, chunk_size, prefetch):
+        yield from serializer_class(chunk, many=True, context=context).data
+
+
+def stream_json(rows):
+    yield b"["
+    for i, row in enumerate(rows):
+        yield (b"," if i else b"") + dumps(row)
+    yield b"]\n"
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield dumps(row) + b"\n"
+
+
+STREAMERS = {"json": stream_json, "ndjson": stream_ndjson}
@@ -0,0 +1,174 @@
+"""Read-only recipe serialization without per-instance serializers.
+
+Serializing a page of recipes with ``RecipeSerializer`` builds model
+instances and then, per recipe, nested serializer output for every tag
+and ingredient. For list and retrieve responses ``FastReadMixin`` reads
+plain rows with ``values()``/``values_list()`` instead, groups the
+related rows by recipe, and builds the response dicts directly.
+
+The output is the same as the serializers', down to the rendered bytes.
+Fields whose representation takes more than copying the column (prices,
+file URLs) go through the serializer's own, bound field objects, and
+``fields=``/``expand=`` are honoured through the serializer's field set.
+``RECIPE_FAST_SERIALIZATION = False`` switches back to the serializers.
+"""
+
+from collections import defaultdict
+
+from core.models import Recipe, RecipeImageRendition
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+
+from recipe.fieldsets import RELATIONS
+
+RENDITION_COLUMNS = ("label", "format", "width", "height", "file")
+
+
+def _grouped(rows):
+    groups = defaultdict(list)
+    for recipe_id, item in rows:
+        groups[recipe_id].append(item)
+    return groups
+
+
+def _attrs(relation, ids, fields):
+    """Return ``{recipe_id: [item, ...]}`` for tags or ingredients."""
+    field = Recipe._meta.get_field(relation)
+    source = field.m2m_field_name()
+    target = field.m2m_reverse_field_name()
+    columns = [
+        f"{target}_id" if name == "id" else f"{target}__{name}"
+        for name in fields
+    ]
+    rows = (
+        field.remote_field.through.objects.filter(**{f"{source}_id__in": ids})
+        .order_by(f"{target}_id")
+        .values_list(f"{source}_id", *columns)
+    )
+    return _grouped(
+        (row[0], dict(zip(fields, row[1:]))) for row in rows.iterator()
+    )
+
+
+def _renditions(ids, child):
+    url = _file_url(child.fields["url"], RecipeImageRendition, "file")
+    names = list(child.fields)
+    rows = (
+        RecipeImageRendition.objects.filter(recipe_id__in=ids)
+        .order_by("recipe", "format", "width")
+        .values_list("recipe_id", *RENDITION_COLUMNS)
+    )
+    groups = defaultdict(list)
+    for recipe_id, *values in rows.iterator():
+        item = dict(zip(RENDITION_COLUMNS, values))
+        item["url"] = url(item.pop("file"))
+        groups[recipe_id].append({name: item[name] for name in names})
+    return groups
+
+
+def _file_url(serializer_field, model, field_name):
+    """Return a function rendering a stored file name like the field."""
+    model_field = model._meta.get_field(field_name)
+
+    def to_representation(name):
+        if not name:
+            return None
+        return serializer_field.to_representation(
+            model_field.attr_class(None, model_field, name)
+        )
+
+    return to_representation
+
+
+def values(queryset, serializer):
+    """Return ``queryset`` as rows of the columns ``serializer`` needs.
+
+    Ordering columns are included too, for cursor pagination.
+    """
+    columns = ["id"]
+    columns += [name for name in serializer.fields if name not in RELATIONS]
+    columns += [name.lstrip("-") for name in queryset.query.order_by]
+    return queryset.prefetch_related(None).values(*dict.fromkeys(columns))
+
+
+def serialize(rows, serializer):
+    """Return the representation ``serializer`` would give ``rows``."""
+    fields = serializer.fields
+    converters = {}
+    if "price" in fields:
+        converters["price"] = fields["price"].to_representation
+    if "image" in fields:
+        converters["image"] = _file_url(fields["image"], Recipe, "image")
+
+    ids = [row["id"] for row in rows]
+    related = {}
+    for relation in ("tags", "ingredients"):
+        if relation in fields and ids:
+            related[relation] = _attrs(
+                relation, ids, list(fields[relation].child.fields)
+            )
+    if "renditions" in fields and ids:
+        related["renditions"] = _renditions(ids, fields["renditions"].child)
+
+    data = []
+    for row in rows:
+        item = {}
+        for name in fields:
+            if name in related:
+                item[name] = related[name].get(row["id"], [])
+            elif name in RELATIONS:
+                item[name] = []
+            elif name in converters:
+                item[name] = converters[name](row[name])
+            else:
+                item[name] = row[name]
+        data.append(item)
+    return data
+
+
+class FastReadMixin:
+    """Serve list and retrieve through ``serialize`` (see module docs)."""
+
+    def _checks_objects(self):
+        """Whether any permission class looks at the object itself."""
+        return any(
+            type(permission).has_object_permission
+            is not BasePermission.has_object_permission
+            for permission in self.get_permissions()
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not settings.RECIPE_FAST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        serializer = self.get_serializer()
+        queryset = values(
+            self.filter_queryset(self.get_queryset()), serializer
+        )
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(serialize(list(queryset), serializer))
+        return self.get_paginated_response(serialize(page, serializer))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.RECIPE_FAST_SERIALIZATION:
+            return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_serializer()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = queryset.filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+            rows = list(values(queryset, serializer)[:1])
+        except (TypeError, ValueError, ValidationError):
+            rows = []
+        if not rows:
+            raise Http404("No Recipe matches the given query.")
+        if self._checks_objects():
+            # Object permissions judge model instances, which rows are not.
+            self.check_object_permissions(request, get_object_or_404(queryset))
+        return Response(serialize(rows, serializer)[0])
@@ -0,0 +1,74 @@
+"""Sparse fieldsets for the recipe endpoints.
+
+``fields=`` names the top-level fields to return and ``expand=`` the
+nested relations (tags, ingredients, renditions) to return with them.
+Without either parameter every field is returned. With only ``expand``,
+all plain fields are returned along with just the listed relations; with
+``fields``, only the named fields and expanded relations are.
+
+The views push the selection into the query too: ``project`` defers the
+columns nobody asked for and ``prefetches`` drops the prefetch queries
+of relations nobody asked for.
+"""
+
+from core.models import Ingredient, Tag
+from django.db.models import Prefetch
+from rest_framework.exceptions import ValidationError
+
+# Nested relations, prefetched only when they are returned.
+RELATIONS = ("tags", "ingredients", "renditions")
+
+# Tags and ingredients are listed by ID, so responses are deterministic
+# (and match recipe.fastpath).
+ORDERED_BY_ID = {"tags": Tag, "ingredients": Ingredient}
+
+
+def _split(value):
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def requested_fields(query_params, available):
+    """Return the fields to serialize, or None to serialize all of them.
+
+    ``available`` is the list of fields the endpoint's serializer has.
+    """
+    fields = _split(query_params.get("fields"))
+    expand = _split(query_params.get("expand"))
+    if fields is None and expand is None:
+        return None
+
+    errors = {}
+    if fields is not None and not fields <= set(available):
+        unknown = ", ".join(sorted(fields - set(available)))
+        errors["fields"] = f"Unknown fields: {unknown}."
+    expandable = {name for name in available if name in RELATIONS}
+    if expand is not None and not expand <= expandable:
+        unknown = ", ".join(sorted(expand - expandable))
+        errors["expand"] = f"Unknown relations: {unknown}."
+    if errors:
+        raise ValidationError(errors)
+
+    if fields is None:
+        fields = {name for name in available if name not in RELATIONS}
+    return fields | (expand or set())
+
+
+def prefetches(fields, relations=RELATIONS):
+    """Return prefetch lookups for the ``relations`` ``fields`` needs."""
+    return [
+        (
+            Prefetch(name, queryset=ORDERED_BY_ID[name].objects.order_by("id"))
+            if name in ORDERED_BY_ID
+            else name
+        )
+        for name in relations
+        if fields is None or name in fields
+    ]
+
+
+def project(queryset, fields):
+    """Defer the columns of ``queryset`` that ``fields`` doesn't need."""
+    columns = [name for name in sorted(fields) if name not in RELATIONS]
+    return queryset.only("id", *columns)
@@ -0,0 +1,37 @@
+"""Filter recipes by linked tags or ingredients without joining them in.
+
+Both modes are semi-joins against the many-to-many through table, so the
+recipe rows are never multiplied and no DISTINCT is needed. The subquery
+reads only the through rows of the requested tags or ingredients via the
+index on their foreign key, so its cost follows the number of matching
+links rather than the size of the user's whole join table.
+"""
+
+from django.db.models import Count
+
+MATCH_MODES = ("any", "all")
+
+
+def filter_by_related(queryset, field, ids, match="any"):
+    """Keep recipes linked to any (or all) of ``ids`` through ``field``.
+
+    Match-all groups the through rows by recipe and keeps the recipes
+    holding one row per requested id.
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return queryset
+
+    descriptor = getattr(queryset.model, field)
+    through = descriptor.through
+    target = descriptor.field.m2m_reverse_name()
+    source = descriptor.field.m2m_column_name()
+
+    links = through.objects.filter(**{f"{target}__in": ids})
+    if match == "all" and len(ids) > 1:
+        links = (
+            links.values(source)
+            .annotate(matched=Count(target))
+            .filter(matched=len(ids))
+        )
+    return queryset.filter(pk__in=links.values(source))
@@ -0,0 +1,162 @@
+"""Make resized renditions of uploaded recipe images in the background.
+
+``upload_image`` only stores the upload and marks the recipe's image as
+pending; ``make_renditions`` then runs on the task broker (``core.tasks``).
+It decodes the upload, applies its EXIF orientation, and writes every
+size in ``RECIPE_IMAGE_RENDITIONS`` in every format of
+``RECIPE_IMAGE_FORMATS``. It also re-encodes the upload at full size and
+puts that in its place as the recipe's image. Neither carries EXIF (GPS
+positions, camera serials, ...) or other metadata apart from the colour
+profile. The upload itself is never served: media requests for images
+still pending or failed are refused.
+"""
+
+import io
+import logging
+import os
+
+from core.models import Recipe, RecipeImageRendition
+from core.storage import retain
+from core.tasks import enqueue_on_commit
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+SAVE_OPTIONS = {
+    "webp": {"method": 4},
+    "jpeg": {"optimize": True, "progressive": True},
+}
+
+# Re-encoded originals keep the upload's format if it is one of these and
+# become PNGs otherwise.
+ORIGINAL_FORMATS = {"JPEG": "jpeg", "WEBP": "webp", "PNG": "png"}
+ORIGINAL_EXTENSIONS = {**EXTENSIONS, "png": ".png"}
+ORIGINAL_QUALITY = 95
+
+
+def enqueue_renditions(recipe):
+    """Schedule renditions of ``recipe``'s current image after commit."""
+    enqueue_on_commit(
+        "recipe.images.make_renditions", recipe.pk, recipe.image.name
+    )
+
+
+def _flatten(image, fmt):
+    """Return ``image`` in a mode ``fmt`` can store."""
+    has_alpha = image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+    if not has_alpha:
+        return image.convert("RGB")
+    image = image.convert("RGBA")
+    if fmt == "webp":
+        return image
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _encode(image, fmt, quality, icc_profile):
+    out = io.BytesIO()
+    if fmt == "png":
+        options = {"optimize": True}
+        image = _flatten(image, "webp")
+    else:
+        options = dict(SAVE_OPTIONS[fmt], quality=quality)
+        image = _flatten(image, fmt)
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    image.save(out, fmt.upper(), **options)
+    return out.getvalue()
+
+
+def render(fileobj):
+    """Return the re-encoded original and the renditions of ``fileobj``.
+
+    The original is ``(extension, data)``, the renditions a list of
+    ``(label, format, data)``.
+    """
+    with Image.open(fileobj) as image:
+        if image.width * image.height > settings.RECIPE_IMAGE_MAX_PIXELS:
+            raise ValueError("Image has too many pixels.")
+        icc_profile = image.info.get("icc_profile")
+        original_format = ORIGINAL_FORMATS.get(image.format, "png")
+        image = ImageOps.exif_transpose(image)
+        original = (
+            ORIGINAL_EXTENSIONS[original_format],
+            _encode(image, original_format, ORIGINAL_QUALITY, icc_profile),
+        )
+        renditions = []
+        for label, edge in settings.RECIPE_IMAGE_RENDITIONS.items():
+            resized = image.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            for fmt in settings.RECIPE_IMAGE_FORMATS:
+                data = _encode(
+                    resized, fmt, settings.RECIPE_IMAGE_QUALITY, icc_profile
+                )
+                renditions.append((label, fmt, data))
+    return original, renditions
+
+
+def _set_status(recipe_id, source, status):
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is not None and recipe.image.name == source:
+        recipe.image_status = status
+        recipe.save(update_fields=["image_status"])
+
+
+def make_renditions(recipe_id, source):
+    """Render the image ``source`` of a recipe and swap in its renditions.
+
+    Does nothing if the recipe is gone or its image has been replaced
+    since the job was queued; the newer upload has a job of its own.
+    """
+    recipe = Recipe.objects.filter(pk=recipe_id).first()
+    if recipe is None or recipe.image.name != source:
+        return
+
+    stem = os.path.splitext(os.path.basename(source))[0]
+    renditions = []
+    try:
+        with recipe.image.open("rb") as fileobj:
+            (ext, data), rendered = render(fileobj)
+        field = Recipe._meta.get_field("image")
+        original = field.storage.save(
+            field.generate_filename(recipe, stem + ext), ContentFile(data)
+        )
+        for label, fmt, data in rendered:
+            rendition = RecipeImageRendition(
+                recipe=recipe, source=original, label=label, format=fmt
+            )
+            rendition.file.save(
+                f"{stem}-{label}{EXTENSIONS[fmt]}",
+                ContentFile(data),
+                save=False,
+            )
+            renditions.append(rendition)
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        logger.warning("Cannot make renditions of %s: %s", source, exc)
+        _set_status(recipe_id, source, Recipe.IMAGE_FAILED)
+        return
+
+    # Files written for a job that turns out stale are never referenced,
+    # so gc_media cleans them up; the same goes for replaced renditions and
+    # for the upload, once the re-encoded original has taken its place.
+    with transaction.atomic():
+        recipe = (
+            Recipe.objects.select_for_update().filter(pk=recipe_id).first()
+        )
+        if recipe is None or recipe.image.name != source:
+            return
+        RecipeImageRendition.objects.filter(recipe=recipe).delete()
+        RecipeImageRendition.objects.bulk_create(renditions)
+        for rendition in renditions:
+            retain(rendition.file.name)
+        recipe.image.name = original
+        recipe.image_status = Recipe.IMAGE_READY
+        recipe.save(update_fields=["image", "image_status"])
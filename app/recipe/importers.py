@@ -0,0 +1,151 @@
+"""Streaming import of recipes from NDJSON or CSV files.
+
+Rows are parsed one at a time, validated with ``RecipeDetailSerializer`` and
+written in batches, each in its own transaction, so memory stays bounded
+by the batch size however large the file is. Tag and ingredient names
+are resolved through a per-import ``{name: obj}`` map, so each distinct
+name is looked up or created once.
+
+CSV files have a header row with ``title``, ``time_minutes`` and
+``price`` columns, optional ``link`` and ``description`` columns, and
+``tags``/``ingredients`` columns holding ``;``-separated names.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from recipe.bulk import bulk_create_recipes
+from recipe.serializers import RecipeDetailSerializer
+
+FORMATS = ("ndjson", "csv")
+NAME_SEPARATOR = ";"
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def guess_format(filename):
+    for fmt in FORMATS:
+        if filename.lower().endswith(f".{fmt}"):
+            return fmt
+    if filename.lower().endswith((".jsonl", ".json")):
+        return "ndjson"
+    raise ImportFormatError(f"Cannot tell the format of {filename!r}.")
+
+
+def _names(value):
+    return [
+        {"name": name.strip()}
+        for name in (value or "").split(NAME_SEPARATOR)
+        if name.strip()
+    ]
+
+
+def iter_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield exc
+
+
+def iter_csv(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    for row in csv.DictReader(text):
+        row = {k: v for k, v in row.items() if k is not None}
+        row["tags"] = _names(row.get("tags"))
+        row["ingredients"] = _names(row.get("ingredients"))
+        yield row
+
+
+READERS = {"ndjson": iter_ndjson, "csv": iter_csv}
+
+
+@dataclass
+class ImportResult:
+    offset: int = 0
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def next_offset(self):
+        """Row offset to pass back in to resume after this import."""
+        return self.offset + self.processed
+
+    def as_dict(self):
+        return {
+            "offset": self.offset,
+            "processed": self.processed,
+            "created": self.created,
+            "failed": self.failed,
+            "next_offset": self.next_offset,
+            "errors": self.errors,
+        }
+
+
+class RecipeImporter:
+    def __init__(self, user, batch_size=1000, max_errors=100, progress=None):
+        self.user = user
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.progress = progress
+        self._known = {}
+
+    def run(self, rows, offset=0):
+        """Import ``rows``, skipping the first ``offset`` of them.
+
+        Rows are only counted as processed once their batch has been
+        committed, so ``result.next_offset`` is always safe to resume
+        from after a crash or an interrupted upload.
+        """
+        result = ImportResult(offset=offset)
+        batch = []
+        pending = 0
+        for index, row in enumerate(rows):
+            if index < offset:
+                continue
+            pending += 1
+            data = self._validate(index, row, result)
+            if data is not None:
+                batch.append(data)
+            if pending >= self.batch_size:
+                self._flush(batch, pending, result)
+                batch, pending = [], 0
+        if pending:
+            self._flush(batch, pending, result)
+        return result
+
+    def _validate(self, index, row, result):
+        if isinstance(row, Exception):
+            errors = {"non_field_errors": [str(row)]}
+        else:
+            serializer = RecipeDetailSerializer(data=row)
+            if serializer.is_valid():
+                return serializer.validated_data
+            errors = serializer.errors
+        result.failed += 1
+        if len(result.errors) < self.max_errors:
+            result.errors.append({"row": index, "errors": errors})
+        return None
+
+    def _flush(self, batch, pending, result):
+        try:
+            with transaction.atomic():
+                bulk_create_recipes(self.user, batch, self._known)
+        except Exception:
+            # Names created inside the rolled back batch no longer exist.
+            self._known.clear()
+            raise
+        result.created += len(batch)
+        result.processed += pending
+        if self.progress is not None:
+            self.progress(result)
@@ -0,0 +1,127 @@
+import random
+import statistics
+import time
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipe.bulk import get_or_create_by_name
+from recipe.cache import invalidate_user
+from recipe.filters import filter_by_related
+from recipe.usage import refresh_usage_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a user with tagged recipes and compare the old DISTINCT join "
+        "tag filter with the match=any and match=all semi-joins."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to query as.")
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=200_000,
+            help="Seed the user up to this many recipes first.",
+        )
+        parser.add_argument("--tags", type=int, default=200)
+        parser.add_argument("--tags-per-recipe", type=int, default=5)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+
+        tags = list(
+            get_or_create_by_name(
+                Tag,
+                user,
+                [f"Bench tag {i}" for i in range(options["tags"])],
+            ).values()
+        )
+        self._seed(user, tags, options)
+
+        base = Recipe.objects.filter(user=user).order_by("-id")
+        # A common tag together with a rarer one, the typical match-all case.
+        tag_ids = [tags[0].id, tags[len(tags) // 2].id]
+        cases = {
+            "join + distinct": base.filter(tags__id__in=tag_ids).distinct(),
+            "match=any": filter_by_related(base, "tags", tag_ids, "any"),
+            "match=all": filter_by_related(base, "tags", tag_ids, "all"),
+        }
+        for name, queryset in cases.items():
+            self._time(name, queryset, options["repeat"])
+
+        if connection.vendor == "postgresql":
+            self.stdout.write(cases["match=all"][:25].explain(analyze=True))
+
+    def _seed(self, user, tags, options):
+        total = options["recipes"]
+        existing = Recipe.objects.filter(user=user).count()
+        rng = random.Random(existing)
+        through = Recipe.tags.through
+        # Skewed tag popularity, so some tags are on most recipes.
+        weights = [1 / (i + 1) for i in range(len(tags))]
+        start = time.perf_counter()
+        for offset in range(existing, total, options["batch_size"]):
+            count = min(options["batch_size"], total - offset)
+            with transaction.atomic():
+                Recipe.objects.bulk_create(
+                    [
+                        Recipe(
+                            user=user,
+                            title=f"Bench recipe {offset + i}",
+                            time_minutes=10,
+                            price="5.00",
+                        )
+                        for i in range(count)
+                    ]
+                )
+                recipe_ids = (
+                    Recipe.objects.filter(user=user)
+                    .order_by("-id")
+                    .values_list("id", flat=True)[:count]
+                )
+                links = []
+                for recipe_id in recipe_ids:
+                    chosen = {
+                        tag.id
+                        for tag in rng.choices(
+                            tags, weights, k=options["tags_per_recipe"]
+                        )
+                    }
+                    links.extend(
+                        through(recipe_id=recipe_id, tag_id=tag_id)
+                        for tag_id in chosen
+                    )
+                through.objects.bulk_create(links)
+            self.stdout.write(f"seeded {offset + count}/{total}")
+        if existing < total:
+            refresh_usage_counts(Tag, [tag.id for tag in tags])
+            invalidate_user(user.pk)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE core_recipe, core_recipe_tags")
+            self.stdout.write(
+                f"seeding took {time.perf_counter() - start:.1f}s"
+            )
+
+    def _time(self, name, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = list(queryset[:25])
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{name}: {queryset.count()} matches, first page of "
+            f"{len(page)}, median {statistics.median(timings) * 1000:.2f} "
+            f"ms, p99 {p99 * 1000:.2f} ms"
+        )
@@ -0,0 +1,142 @@
+import gzip
+import io
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from core import middleware, renderers
+from core.renderers import (
+    FastJSONParser,
+    FastJSONRenderer,
+    MessagePackParser,
+    MessagePackRenderer,
+)
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+def recipe_page(size, rng):
+    """Return a list payload shaped like the recipe list endpoint's."""
+    return {
+        "next": "http://testserver/api/recipe/recipes/?cursor=cD0xMjM%3D",
+        "previous": None,
+        "results": [
+            {
+                "id": i,
+                "title": f"Bench recipe {i} — crème brûlée",
+                "time_minutes": rng.randint(5, 120),
+                "price": f"{rng.uniform(1, 99):.2f}",
+                "link": "https://example.com/recipe",
+                "image": None,
+                "tags": [
+                    {"id": t, "name": f"Bench tag {t}"}
+                    for t in sorted(rng.sample(range(50), 4))
+                ],
+                "ingredients": [
+                    {"id": n, "name": f"Bench ingredient {n}"}
+                    for n in sorted(rng.sample(range(200), 8))
+                ],
+            }
+            for i in range(size)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare DRF's JSON renderer and parser with core.renderers, "
+        "MessagePack, and the response compression encodings, on recipe "
+        "list payloads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="1,25,100,1000",
+            help="Comma-separated numbers of recipes per payload.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        for size in [int(n) for n in options["sizes"].split(",")]:
+            data = recipe_page(size, rng)
+            self.stdout.write(f"{size} recipes:")
+            outputs = [
+                self._time("render drf", options, JSONRenderer().render, data),
+                self._time(
+                    "render fast", options, FastJSONRenderer().render, data
+                ),
+            ]
+            if outputs[0] != outputs[1]:
+                raise CommandError("Rendered outputs differ.")
+            body = outputs[0]
+            parsed = [
+                self._time(
+                    "parse drf",
+                    options,
+                    lambda: JSONParser().parse(io.BytesIO(body)),
+                ),
+                self._time(
+                    "parse fast",
+                    options,
+                    lambda: FastJSONParser().parse(io.BytesIO(body)),
+                ),
+            ]
+            if parsed[0] != parsed[1]:
+                raise CommandError("Parsed outputs differ.")
+            self._compression(body, options)
+            self._msgpack(data, body, options)
+
+    def _compression(self, body, options):
+        compressors = {"gzip": lambda: gzip.compress(body, compresslevel=6)}
+        if middleware.brotli is not None:
+            compressors["br"] = lambda: middleware.COMPRESSORS["br"](body)
+        else:
+            self.stdout.write("  (brotli is not installed)")
+        for name, func in compressors.items():
+            output = self._time(name, options, func)
+            self.stdout.write(
+                f"    {len(body)} -> {len(output)} bytes "
+                f"({len(output) / len(body):.0%})"
+            )
+
+    def _msgpack(self, data, body, options):
+        if renderers.msgpack is None:
+            self.stdout.write("  (msgpack is not installed)")
+            return
+        # MessagePack responses carry prices as exact Decimals.
+        data = {
+            **data,
+            "results": [
+                {**item, "price": Decimal(item["price"])}
+                for item in data["results"]
+            ],
+        }
+        packed = self._time(
+            "render msgpack", options, MessagePackRenderer().render, data
+        )
+        parsed = self._time(
+            "parse msgpack",
+            options,
+            lambda: MessagePackParser().parse(io.BytesIO(packed)),
+        )
+        if parsed != data:
+            raise CommandError("MessagePack round trip differs.")
+        self.stdout.write(
+            f"    {len(body)} bytes JSON, {len(packed)} bytes MessagePack "
+            f"({len(packed) / len(body):.0%}), "
+            f"{len(gzip.compress(packed))} gzipped"
+        )
+
+    def _time(self, name, options, func, *args):
+        timings = []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            output = func(*args)
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        self.stdout.write(f"  {name}: median {median * 1e6:,.0f} µs")
+        return output
@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+
+from core.models import Recipe
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from recipe.cache import invalidate_user
+from recipe.search import search_recipes
+
+WORDS = (
+    "chicken beef tofu paneer lentil chickpea salmon prawn mushroom "
+    "spinach potato tomato onion garlic ginger chilli lemon coconut "
+    "rice noodle pasta bread curry soup salad stew roast grilled baked "
+    "fried spicy sweet smoky creamy crispy quick easy weeknight festive"
+).split()
+
+DEFAULT_QUERIES = [
+    "chicken curry",
+    "spicy tofu",
+    "lemon",
+    "creamy mushroom pasta",
+    "quick weeknight noodle",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a user with a large number of recipes and time ranked "
+        "full-text searches against them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to search as.")
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=1_000_000,
+            help="Seed the user up to this many recipes first.",
+        )
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--query",
+            action="append",
+            dest="queries",
+            help="Search to time; may be given several times.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+
+        self._seed(user, options["recipes"], options["batch_size"])
+        queryset = Recipe.objects.filter(user=user)
+        for text in options["queries"] or DEFAULT_QUERIES:
+            self._time(queryset, user, text, options["repeat"])
+
+    def _seed(self, user, total, batch_size):
+        existing = Recipe.objects.filter(user=user).count()
+        rng = random.Random(existing)
+        start = time.perf_counter()
+        for offset in range(existing, total, batch_size):
+            count = min(batch_size, total - offset)
+            with transaction.atomic():
+                Recipe.objects.bulk_create(
+                    [
+                        Recipe(
+                            user=user,
+                            title=" ".join(rng.sample(WORDS, 3)).title(),
+                            description=" ".join(rng.choices(WORDS, k=20)),
+                            time_minutes=rng.randint(5, 120),
+                            price=f"{rng.randint(100, 9999) / 100:.2f}",
+                        )
+                        for _ in range(count)
+                    ]
+                )
+            self.stdout.write(f"seeded {offset + count}/{total}")
+        if existing < total:
+            invalidate_user(user.pk)
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE core_recipe")
+            self.stdout.write(
+                f"seeding took {time.perf_counter() - start:.1f}s"
+            )
+
+    def _time(self, queryset, user, text, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = list(search_recipes(queryset, user, text)[:25])
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{text!r}: first page of {len(page)}, "
+            f"median {statistics.median(timings) * 1000:.1f} ms, "
+            f"p99 {p99 * 1000:.1f} ms"
+        )
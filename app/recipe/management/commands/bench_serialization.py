@@ -0,0 +1,148 @@
+import random
+import statistics
+import time
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from recipe import fastpath
+from recipe.bulk import get_or_create_by_name
+from recipe.cache import invalidate_user
+from recipe.fieldsets import prefetches
+from recipe.serializers import RecipeSerializer
+from recipe.usage import refresh_usage_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a user with recipes and compare rendering them to JSON "
+        "through RecipeSerializer and through recipe.fastpath."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the user to query as.")
+        parser.add_argument(
+            "--recipes",
+            type=int,
+            default=10_000,
+            help="Seed the user up to this many recipes first.",
+        )
+        parser.add_argument("--tags-per-recipe", type=int, default=4)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+        self._seed(user, options)
+
+        request = APIRequestFactory().get("/api/recipe/recipes/")
+        request.user = user
+        context = {"request": request, "fields": None}
+        queryset = Recipe.objects.filter(user=user).order_by("-id")[
+            : options["recipes"]
+        ]
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            recipes = queryset.prefetch_related(
+                *prefetches(None, ("tags", "ingredients"))
+            )
+            data = RecipeSerializer(recipes, many=True, context=context).data
+            return renderer.render(data)
+
+        def fast_path():
+            serializer = RecipeSerializer(context=context)
+            rows = list(fastpath.values(queryset, serializer))
+            return renderer.render(fastpath.serialize(rows, serializer))
+
+        outputs = {}
+        for name, func in [
+            ("serializers", serializer_path),
+            ("fast path", fast_path),
+        ]:
+            outputs[name] = self._time(name, func, options["repeat"])
+        if outputs["serializers"] != outputs["fast path"]:
+            raise CommandError("Fast path output differs from serializers.")
+        self.stdout.write("outputs are byte-identical")
+
+    def _seed(self, user, options):
+        total = options["recipes"]
+        existing = Recipe.objects.filter(user=user).count()
+        if existing >= total:
+            return
+        rng = random.Random(existing)
+        tags = list(
+            get_or_create_by_name(
+                Tag, user, [f"Bench tag {i}" for i in range(50)]
+            ).values()
+        )
+        ingredients = list(
+            get_or_create_by_name(
+                Ingredient, user, [f"Bench ingredient {i}" for i in range(200)]
+            ).values()
+        )
+        for offset in range(existing, total, options["batch_size"]):
+            count = min(options["batch_size"], total - offset)
+            with transaction.atomic():
+                Recipe.objects.bulk_create(
+                    [
+                        Recipe(
+                            user=user,
+                            title=f"Bench recipe {offset + i}",
+                            time_minutes=rng.randint(5, 120),
+                            price=f"{rng.uniform(1, 99):.2f}",
+                            link="https://example.com/recipe",
+                        )
+                        for i in range(count)
+                    ]
+                )
+                recipe_ids = (
+                    Recipe.objects.filter(user=user)
+                    .order_by("-id")
+                    .values_list("id", flat=True)[:count]
+                )
+                tag_links = []
+                ingredient_links = []
+                for recipe_id in recipe_ids:
+                    tag_links.extend(
+                        Recipe.tags.through(recipe_id=recipe_id, tag_id=t.id)
+                        for t in rng.sample(tags, options["tags_per_recipe"])
+                    )
+                    ingredient_links.extend(
+                        Recipe.ingredients.through(
+                            recipe_id=recipe_id, ingredient_id=i.id
+                        )
+                        for i in rng.sample(
+                            ingredients, options["ingredients_per_recipe"]
+                        )
+                    )
+                Recipe.tags.through.objects.bulk_create(tag_links)
+                Recipe.ingredients.through.objects.bulk_create(
+                    ingredient_links
+                )
+            self.stdout.write(f"seeded {offset + count}/{total}")
+        refresh_usage_counts(Tag, [tag.id for tag in tags])
+        refresh_usage_counts(Ingredient, [i.id for i in ingredients])
+        invalidate_user(user.pk)
+
+    def _time(self, name, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        rows = output.count(b'"title"')
+        self.stdout.write(
+            f"{name}: {rows} recipes, {len(output)} bytes, median "
+            f"{median * 1000:.1f} ms, {rows / median:,.0f} rows/s"
+        )
+        return output
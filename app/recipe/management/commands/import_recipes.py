@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from recipe.importers import (
+    FORMATS,
+    READERS,
+    ImportFormatError,
+    RecipeImporter,
+    guess_format,
+)
+
+
+class Command(BaseCommand):
+    help = "Import recipes for a user from a large NDJSON or CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="Email of the owning user.")
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--offset",
+            type=int,
+            default=0,
+            help="Number of data rows to skip, to resume an import.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}.")
+        try:
+            fmt = options["format"] or guess_format(options["path"])
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        def progress(result):
+            self.stdout.write(
+                f"rows {result.next_offset}: {result.created} created, "
+                f"{result.failed} failed"
+            )
+
+        importer = RecipeImporter(
+            user, batch_size=options["batch_size"], progress=progress
+        )
+        with open(options["path"], "rb") as stream:
+            result = importer.run(READERS[fmt](stream), options["offset"])
+
+        for error in result.errors:
+            self.stderr.write(f"row {error['row']}: {error['errors']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.created} recipes, {result.failed} failed. "
+                f"Resume with --offset {result.next_offset}."
+            )
+        )
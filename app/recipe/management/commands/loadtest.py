@@ -0,0 +1,99 @@
+import http.client
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent GET requests at one or more running servers and "
+        "report throughput and latency, e.g. to compare the WSGI and ASGI "
+        "stacks from docker-compose at the same worker count."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls",
+            nargs="+",
+            help="Full URLs, e.g. http://localhost:8001/api/recipe/recipes/",
+        )
+        parser.add_argument("--token", help="Token for Authorization.")
+        parser.add_argument(
+            "--scheme",
+            default="Token",
+            help="Authorization scheme (Token or Bearer).",
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        headers = {}
+        if options["token"]:
+            headers["Authorization"] = (
+                f"{options['scheme']} {options['token']}"
+            )
+        for url in options["urls"]:
+            self._run(url, headers, options)
+
+    def _run(self, url, headers, options):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise CommandError(f"Unsupported URL: {url}")
+        connection_class = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+
+        remaining = [options["requests"]]
+        lock = threading.Lock()
+        latencies = []
+        errors = [0]
+
+        def worker():
+            conn = connection_class(parts.netloc, timeout=30)
+            while True:
+                with lock:
+                    if remaining[0] <= 0:
+                        break
+                    remaining[0] -= 1
+                start = time.perf_counter()
+                try:
+                    conn.request("GET", path, headers=headers)
+                    res = conn.getresponse()
+                    res.read()
+                    ok = res.status < 400
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = connection_class(parts.netloc, timeout=30)
+                    ok = False
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if not ok:
+                        errors[0] += 1
+            conn.close()
+
+        threads = [
+            threading.Thread(target=worker)
+            for _ in range(options["concurrency"])
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        total = time.perf_counter() - start
+
+        latencies.sort()
+        p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f"{url}\n"
+            f"  {len(latencies) / total:8.1f} req/s, "
+            f"median {statistics.median(latencies) * 1000:.1f} ms, "
+            f"p99 {p99 * 1000:.1f} ms, {errors[0]} errors"
+        )
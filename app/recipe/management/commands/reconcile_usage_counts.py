@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from recipe.cache import invalidate_user
+from recipe.usage import FIELDS, refresh_usage_counts, usage_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute tag and ingredient usage counts that no longer match "
+        "their recipes. Safe to run periodically, e.g. from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows checked per query.",
+        )
+
+    def handle(self, *args, **options):
+        for model in FIELDS:
+            fixed = self._reconcile(model, options["batch_size"])
+            self.stdout.write(
+                f"{model._meta.verbose_name_plural}: {fixed} corrected"
+            )
+
+    def _reconcile(self, model, batch_size):
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(
+                model.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return fixed
+            last_id = ids[-1]
+            stale = dict(
+                model.objects.filter(pk__in=ids)
+                .annotate(actual=usage_counts(model))
+                .exclude(usage_count=F("actual"))
+                .values_list("pk", "user_id")
+            )
+            fixed += refresh_usage_counts(model, stale)
+            # update() sends no signals, so drop the owners' cached lists.
+            for user_id in set(stale.values()):
+                invalidate_user(user_id)
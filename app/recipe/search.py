@@ -0,0 +1,175 @@
+"""Full-text search over recipe titles and descriptions.
+
+On PostgreSQL every recipe has a ``search_vector`` tsvector column, kept
+up to date by a trigger and covered by a GIN index (core migration 0009).
+Titles are weighted above descriptions and matches are ranked with
+``ts_rank``. Other backends, i.e. SQLite in tests and local runs, fall
+back to an in-process inverted index per user that is rebuilt whenever
+that user's cache generation changes, so it is never stale after a write.
+"""
+
+import heapq
+import re
+from collections import defaultdict
+
+from core.models import Recipe
+from django.db import connections
+from django.db.models import BooleanField, Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+from recipe.cache import get_generation
+from user.cache import TTLCache
+
+# Must match the configuration used by the trigger in core migration 0009.
+SEARCH_CONFIG = "english"
+
+# Same relative weights ts_rank gives to the A (title) and B (description)
+# labels by default.
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to "
+    "with".split()
+)
+
+# The fallback passes matching ids to the database as query parameters,
+# so it only returns this many of the best matches.
+MAX_FALLBACK_RESULTS = 1000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def search_recipes(queryset, user, text):
+    """Filter ``queryset`` to recipes matching ``text`` and rank them.
+
+    The result is annotated with ``rank`` and ordered by ``-rank, -id``.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        return _search_postgresql(queryset, text)
+    return _search_fallback(queryset, user, text)
+
+
+def _search_postgresql(queryset, text):
+    vector = f"{Recipe._meta.db_table}.search_vector"
+    tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+    params = (SEARCH_CONFIG, text)
+    # ts_rank returns a real; cast it so the value round-trips exactly
+    # through pagination cursors.
+    return (
+        queryset.filter(
+            RawSQL(f"{vector} @@ {tsquery}", params, BooleanField())
+        )
+        .annotate(
+            rank=RawSQL(
+                f"ts_rank({vector}, {tsquery})::double precision",
+                params,
+                FloatField(),
+            )
+        )
+        .order_by("-rank", "-id")
+    )
+
+
+def _search_fallback(queryset, user, text):
+    scores = get_user_index(user, queryset.db).search(text)
+    if len(scores) > MAX_FALLBACK_RESULTS:
+        scores = dict(
+            heapq.nlargest(
+                MAX_FALLBACK_RESULTS,
+                scores.items(),
+                key=lambda item: (item[1], item[0]),
+            )
+        )
+    if not scores:
+        return queryset.none().annotate(rank=Value(0.0, FloatField()))
+    return (
+        queryset.filter(id__in=scores)
+        .annotate(
+            rank=Case(
+                *[
+                    When(id=doc_id, then=Value(score))
+                    for doc_id, score in scores.items()
+                ],
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-rank", "-id")
+    )
+
+
+def _stem(word):
+    """Strip common English plural endings."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("oes", "ses", "xes", "ches")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [
+        _stem(word)
+        for word in _TOKEN_RE.findall((text or "").lower())
+        if word not in STOP_WORDS
+    ]
+
+
+class InvertedIndex:
+    """Map terms to the recipes containing them, with weighted counts.
+
+    Every term of the query must match, as with plain words in
+    ``websearch_to_tsquery``; the search operators PostgreSQL understands
+    (quotes, ``or``, ``-``) are treated as ordinary words.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+
+    def add(self, doc_id, title, description):
+        for terms, weight in (
+            (tokenize(title), TITLE_WEIGHT),
+            (tokenize(description), DESCRIPTION_WEIGHT),
+        ):
+            for term in terms:
+                postings = self._postings[term]
+                postings[doc_id] = postings.get(doc_id, 0.0) + weight
+
+    def search(self, text):
+        """Return ``{doc_id: score}`` for documents matching every term."""
+        terms = list(dict.fromkeys(tokenize(text)))
+        if not terms:
+            return {}
+        postings = [self._postings.get(term, {}) for term in terms]
+        postings.sort(key=len)
+        matches = set(postings[0]).intersection(*postings[1:])
+        return {doc_id: sum(p[doc_id] for p in postings) for doc_id in matches}
+
+
+_indexes = TTLCache(maxsize=256, ttl=300)
+
+
+def get_user_index(user, using="default"):
+    """Return the fallback index of ``user``'s recipes.
+
+    The index is built once per cache generation of the user.
+    """
+    key = (using, user.pk)
+    generation = get_generation(user.pk)
+    cached = _indexes.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+
+    index = InvertedIndex()
+    rows = (
+        Recipe.objects.using(using)
+        .filter(user=user)
+        .values_list("id", "title", "description")
+    )
+    for doc_id, title, description in rows.iterator():
+        index.add(doc_id, title, description)
+    _indexes.set(key, (generation, index))
+    return index
@@ -1,22 +1,70 @@
+import decimal
+
 from core import models
+from core.renderers import exact_decimals
+from django.db import models as django_models
+from django.db import transaction
 from rest_framework import serializers
 
+from recipe.bulk import bulk_create_recipes, get_or_create_by_name
+
 
 class IngredientSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Ingredient
-        fields = ["id", "name"]
-        read_only_fields = ["id"]
+        fields = ["id", "name", "usage_count"]
+        read_only_fields = ["id", "usage_count"]
 
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Tag
-        fields = ["id", "name"]
-        read_only_fields = ["id"]
+        fields = ["id", "name", "usage_count"]
+        read_only_fields = ["id", "usage_count"]
+
+
+class RecipeListSerializer(serializers.ListSerializer):
+    """Write many recipes with bulk inserts instead of one at a time."""
+
+    @transaction.atomic
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return bulk_create_recipes(user, validated_data)
+
+
+class SparseFieldsMixin:
+    """Serialize only the fields in ``context["fields"]``, if it is set.
+
+    The view fills it in from ``fields=``/``expand=`` (recipe.fieldsets).
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        wanted = self.context.get("fields")
+        if wanted is None:
+            return fields
+        return {name: fields[name] for name in fields if name in wanted}
+
+
+class ExactDecimalField(serializers.DecimalField):
+    """A DecimalField returning Decimals to renderers that keep them exact.
+
+    JSON gets the usual string; MessagePack gets the Decimal itself.
+    """
 
+    def to_representation(self, value):
+        data = super().to_representation(value)
+        if isinstance(data, str) and exact_decimals(self.context):
+            return decimal.Decimal(data)
+        return data
+
+
+class RecipeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        django_models.DecimalField: ExactDecimalField,
+    }
 
-class RecipeSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
 
@@ -32,25 +80,36 @@ class RecipeSerializer(serializers.ModelSerializer):
             "ingredients",
         ]
         read_only_fields = ["id"]
+        extra_kwargs = {
+            "price": {
+                "help_text": (
+                    "A decimal string in JSON; an exact decimal (extension "
+                    "type 1) in MessagePack."
+                )
+            }
+        }
+        list_serializer_class = RecipeListSerializer
 
-    def _get_or_create_tags(self, tags, recipe):
+    def _get_or_create_tags(self, tags, recipe, replace=False):
         """Handle getting or creating tags as needed."""
-        auth_user = self.context["request"].user
-        for tag in tags:
-            tag_obj, created = models.Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
-            )
-            recipe.tags.add(tag_obj)
+        self._assign_by_name(models.Tag, recipe.tags, tags, replace)
 
-    def _get_or_create_ingredients(self, ingredients, recipe):
+    def _get_or_create_ingredients(self, ingredients, recipe, replace=False):
+        self._assign_by_name(
+            models.Ingredient, recipe.ingredients, ingredients, replace
+        )
+
+    def _assign_by_name(self, model, manager, items, replace):
         auth_user = self.context["request"].user
-        for ingredient in ingredients:
-            ingredient_obj, created = models.Ingredient.objects.get_or_create(
-                user=auth_user, **ingredient
-            )
-            recipe.ingredients.add(ingredient_obj)
+        objs = get_or_create_by_name(
+            model, auth_user, [item["name"] for item in items]
+        ).values()
+        if replace:
+            manager.set(objs)
+        else:
+            manager.add(*objs)
 
+    @transaction.atomic
     def create(self, validated_data):
         tags = validated_data.pop("tags", [])
         ingredients = validated_data.pop("ingredients", [])
@@ -59,29 +118,49 @@ class RecipeSerializer(serializers.ModelSerializer):
         self._get_or_create_ingredients(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         tags = validated_data.pop("tags", None)
         ingredients = validated_data.pop("ingredients", None)
         if tags is not None:
-            instance.tags.clear()
-            self._get_or_create_tags(tags, instance)
+            self._get_or_create_tags(tags, instance, replace=True)
         if ingredients is not None:
-            instance.ingredients.clear()
-            self._get_or_create_ingredients(ingredients, instance)
+            self._get_or_create_ingredients(
+                ingredients, instance, replace=True
+            )
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
         return instance
 
 
+class RecipeImageRenditionSerializer(serializers.ModelSerializer):
+    url = serializers.ImageField(source="file", read_only=True)
+
+    class Meta:
+        model = models.RecipeImageRendition
+        fields = ["label", "format", "width", "height", "url"]
+        read_only_fields = fields
+
+
 class RecipeDetailSerializer(RecipeSerializer):
+    renditions = RecipeImageRenditionSerializer(many=True, read_only=True)
+
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ["description", "image"]
+        fields = RecipeSerializer.Meta.fields + [
+            "description",
+            "image",
+            "image_status",
+            "renditions",
+        ]
+        # Images are uploaded through upload_image, which strips them and
+        # makes their renditions.
+        read_only_fields = RecipeSerializer.Meta.read_only_fields + ["image"]
 
 
 class RecipeImageSerializer(serializers.ModelSerializer):
     class Meta:
         model = models.Recipe
-        fields = ["id", "image"]
-        read_only_fields = ["id"]
+        fields = ["id", "image", "image_status"]
+        read_only_fields = ["id", "image_status"]
         extra_kwargs = {"image": {"required": "True"}}
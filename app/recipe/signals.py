@@ -0,0 +1,77 @@
+from core.models import Ingredient, Recipe, RecipeImageRendition, Tag
+from core.storage import track_references
+from django.conf import settings
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
+from django.dispatch import receiver
+
+from recipe.cache import invalidate_user
+from recipe.usage import (
+    FIELDS,
+    linked_ids,
+    refresh_usage_counts,
+    usage_deferred,
+)
+
+track_references(Recipe, "image")
+track_references(RecipeImageRendition, "file")
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_on_write(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_on_link_change(sender, instance, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_new_user(sender, instance, created, **kwargs):
+    # Database ids can be reused (e.g. SQLite after a rollback), so a new
+    # user must never inherit responses cached for an older one.
+    if created:
+        invalidate_user(instance.pk)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def update_usage_on_link_change(
+    sender, instance, action, reverse, model, pk_set, **kwargs
+):
+    if reverse:
+        # tag.recipe_set.add(...) and friends: only this tag changes.
+        if action.startswith("post_"):
+            refresh_usage_counts(type(instance), [instance.pk])
+    elif action == "pre_clear":
+        manager = getattr(instance, FIELDS[model])
+        instance._cleared_usage = set(manager.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_usage_counts(model, instance.__dict__.pop("_cleared_usage"))
+    elif action in ("post_add", "post_remove"):
+        refresh_usage_counts(model, pk_set)
+
+
+@receiver(pre_delete, sender=Recipe)
+def collect_usage_on_delete(sender, instance, **kwargs):
+    # The links are gone by post_delete, so remember them now.
+    if not usage_deferred():
+        instance._deleted_usage = linked_ids([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def update_usage_on_delete(sender, instance, **kwargs):
+    for model, ids in instance.__dict__.pop("_deleted_usage", {}).items():
+        refresh_usage_counts(model, ids)
@@ -0,0 +1,92 @@
+import asyncio
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from recipe.views import TagViewSet
+from rest_framework.test import APIClient
+
+ASYNC_RECIPES_URL = reverse("recipe:async-recipe-list")
+RECIPES_URL = reverse("recipe:recipe-list")
+ASYNC_TAGS_URL = reverse("recipe:async-tag-list")
+
+
+def async_detail_url(recipe_id):
+    return reverse("recipe:async-recipe-detail", args=[recipe_id])
+
+
+class AsyncReadViewTests(TransactionTestCase):
+    """Async endpoints run the viewsets on worker threads, so the data
+    they read has to be committed."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="asyncreader@example.com", password="asyncpass"
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Dosa",
+            time_minutes=20,
+            price=Decimal("3.00"),
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Tiffin"))
+
+    def test_list_matches_sync_endpoint(self):
+        res = self.client.get(ASYNC_RECIPES_URL)
+        sync_res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"], sync_res.json()["results"])
+
+    def test_retrieve(self):
+        res = self.client.get(async_detail_url(self.recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["title"], "Dosa")
+
+    def test_tag_list(self):
+        res = self.client.get(ASYNC_TAGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()["results"][0]["name"], "Tiffin")
+
+    def test_auth_required(self):
+        res = APIClient().get(ASYNC_RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_not_allowed(self):
+        res = self.client.post(ASYNC_RECIPES_URL, {"title": "New"})
+
+        self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(Recipe.objects.count(), 1)
+
+
+class AsyncConcurrencyTests(SimpleTestCase):
+    def slow_dispatch(self, request, *args, **kwargs):
+        time.sleep(0.5)
+        return HttpResponse()
+
+    async def test_requests_run_concurrently(self):
+        # Every middleware must run async, or Django serializes requests
+        # on its one sync thread before they reach the async view.
+        client = AsyncClient()
+        with patch.object(TagViewSet, "dispatch", self.slow_dispatch):
+            start = time.monotonic()
+            responses = await asyncio.gather(
+                *(client.get(ASYNC_TAGS_URL) for _ in range(4))
+            )
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([res.status_code for res in responses], [200] * 4)
+        self.assertLess(elapsed, 1.5)
@@ -0,0 +1,222 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+BULK_URL = reverse("recipe:recipe-bulk")
+
+
+def create_user(email="bulkuser@example.com", password="bulkpass"):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+def recipe_payload(i, **params):
+    payload = {
+        "title": f"Recipe {i}",
+        "time_minutes": 10,
+        "price": "4.50",
+        "tags": [{"name": "Dinner"}, {"name": f"Tag {i % 3}"}],
+        "ingredients": [{"name": "Salt"}],
+    }
+    payload.update(params)
+    return payload
+
+
+class BulkRecipeApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create(self):
+        payload = [recipe_payload(i) for i in range(5)]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data["results"]), 5)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(Ingredient.objects.filter(user=self.user).count(), 1)
+        first = res.data["results"][0]
+        self.assertEqual(first["status"], 201)
+        recipe = Recipe.objects.get(id=first["data"]["id"])
+        self.assertEqual(recipe.price, Decimal("4.50"))
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Dinner", "Tag 0"],
+        )
+
+    def test_bulk_create_reuses_existing_tags(self):
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+
+        res = self.client.post(
+            BULK_URL, [recipe_payload(0), recipe_payload(1)], format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            Tag.objects.filter(user=self.user, name="Dinner").count(), 1
+        )
+        self.assertEqual(tag.recipe_set.count(), 2)
+
+    def test_bulk_create_atomic_rejects_whole_batch(self):
+        payload = {
+            "items": [recipe_payload(0), recipe_payload(1, title="")],
+            "mode": "atomic",
+        }
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["results"][0]["index"], 1)
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bulk_create_partial(self):
+        payload = {
+            "items": [recipe_payload(0), recipe_payload(1, title="")],
+            "mode": "partial",
+        }
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_207_MULTI_STATUS)
+        results = res.data["results"]
+        self.assertEqual(results[0]["status"], 201)
+        self.assertEqual(results[1]["status"], 400)
+        self.assertIn("title", results[1]["errors"])
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limit(self):
+        payload = [recipe_payload(i) for i in range(3)]
+
+        res = self.client.post(BULK_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    @skipUnless(
+        connection.features.can_return_rows_from_bulk_insert,
+        "Backend cannot return ids from bulk inserts.",
+    )
+    def test_bulk_create_query_count_constant(self):
+        def count_queries(n):
+            payload = [recipe_payload(i) for i in range(n)]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.post(BULK_URL, payload, format="json")
+            self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(20))
+
+    def test_bulk_delete(self):
+        other_user = create_user(email="other@example.com")
+        mine = Recipe.objects.create(
+            user=self.user, title="Mine", time_minutes=5, price="1.00"
+        )
+        theirs = Recipe.objects.create(
+            user=other_user, title="Theirs", time_minutes=5, price="1.00"
+        )
+
+        res = self.client.delete(
+            BULK_URL, {"ids": [mine.id, theirs.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [{"id": mine.id, "status": 204}, {"id": theirs.id, "status": 404}],
+        )
+        self.assertFalse(Recipe.objects.filter(id=mine.id).exists())
+        self.assertTrue(Recipe.objects.filter(id=theirs.id).exists())
+
+    def test_bulk_delete_list_body(self):
+        recipe = Recipe.objects.create(
+            user=self.user, title="Mine", time_minutes=5, price="1.00"
+        )
+
+        res = self.client.delete(BULK_URL, [recipe.id], format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"], [{"id": recipe.id, "status": 204}]
+        )
+        self.assertFalse(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_bulk_delete_query_count_constant(self):
+        def count_queries(n):
+            res = self.client.post(
+                BULK_URL,
+                [recipe_payload(i) for i in range(n)],
+                format="json",
+            )
+            ids = [item["data"]["id"] for item in res.data["results"]]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.delete(BULK_URL, ids, format="json")
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(20))
+
+    def test_bulk_delete_refreshes_usage(self):
+        self.client.post(
+            BULK_URL, [recipe_payload(i) for i in range(4)], format="json"
+        )
+        keep = Recipe.objects.filter(user=self.user).order_by("id").first()
+        ids = list(
+            Recipe.objects.filter(user=self.user)
+            .exclude(id=keep.id)
+            .values_list("id", flat=True)
+        )
+
+        self.client.delete(BULK_URL, {"ids": ids}, format="json")
+
+        usage = dict(
+            Tag.objects.filter(user=self.user).values_list(
+                "name", "usage_count"
+            )
+        )
+        self.assertEqual(
+            usage, {"Dinner": 1, "Tag 0": 1, "Tag 1": 0, "Tag 2": 0}
+        )
+        salt = Ingredient.objects.get(user=self.user, name="Salt")
+        self.assertEqual(salt.usage_count, 1)
+
+    def test_bulk_delete_rejects_malformed_ids(self):
+        recipes = [
+            Recipe.objects.create(
+                user=self.user, title=f"R{i}", time_minutes=5, price="1.00"
+            )
+            for i in range(3)
+        ]
+        digits = "".join(str(recipe.id) for recipe in recipes)
+        for body in [
+            {"ids": digits},
+            {"ids": 5},
+            {"ids": [1, "x"]},
+            {"ids": [True]},
+            {"ids": [[1]]},
+            {},
+            digits,
+            5,
+        ]:
+            with self.subTest(body=body):
+                res = self.client.delete(BULK_URL, body, format="json")
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 3)
+
+    def test_bulk_create_rejects_scalar_body(self):
+        for body in ["5", 5, None]:
+            with self.subTest(body=body):
+                res = self.client.post(BULK_URL, body, format="json")
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAG_URL = reverse("recipe:tag-list")
+
+
+def detail_url(recipe_id):
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_user(email="cacheuser@example.com", password="cachepass"):
+    return get_user_model().objects.create_user(email=email, password=password)
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 5,
+        "price": Decimal("5.50"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        create_recipe(user=self.user)
+        first = self.client.get(RECIPES_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(RECIPES_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_query_param_order_shares_entry(self):
+        t1 = Tag.objects.create(user=self.user, name="Lunch")
+        t2 = Tag.objects.create(user=self.user, name="Dinner")
+        self.client.get(RECIPES_URL, {"tags": f"{t1.id},{t2.id}"})
+
+        with self.assertNumQueries(0):
+            res = self.client.get(RECIPES_URL, {"tags": f"{t2.id},{t1.id}"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_write_invalidates(self):
+        recipe = create_recipe(user=self.user, title="Before")
+        first = self.client.get(detail_url(recipe.id))
+
+        self.client.patch(detail_url(recipe.id), {"title": "After"})
+        res = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(res.data["title"], "After")
+        self.assertNotEqual(first["ETag"], res["ETag"])
+
+    def test_tag_change_invalidates_recipe_list(self):
+        recipe = create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name="Lunch")
+        recipe.tags.add(tag)
+        self.client.get(RECIPES_URL)
+
+        tag.name = "Brunch"
+        tag.save()
+        res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.data["results"][0]["tags"][0]["name"], "Brunch")
+
+    def test_cache_is_per_user(self):
+        other_user = create_user(email="othercache@example.com")
+        create_recipe(user=other_user)
+        self.client.get(RECIPES_URL)
+
+        client = APIClient()
+        client.force_authenticate(other_user)
+        res = client.get(RECIPES_URL)
+
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(len(self.client.get(RECIPES_URL).data["results"]), 0)
+
+    def test_if_none_match_returns_304(self):
+        create_recipe(user=self.user)
+        first = self.client.get(TAG_URL)
+
+        res = self.client.get(TAG_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b"")
+
+    def test_stale_etag_returns_200(self):
+        first = self.client.get(TAG_URL)
+        Tag.objects.create(user=self.user, name="Vegan")
+
+        res = self.client.get(TAG_URL, HTTP_IF_NONE_MATCH=first["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
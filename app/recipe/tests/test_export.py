@@ -0,0 +1,106 @@
+import json
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import RecipeDetailSerializer
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 5,
+        "price": Decimal("5.50"),
+        "description": "Sample description",
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class RecipeExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="exporter@example.com", password="exportpass"
+        )
+        self.client.force_authenticate(self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        ingredient = Ingredient.objects.create(user=self.user, name="Rice")
+        self.recipes = []
+        for i in range(5):
+            recipe = create_recipe(user=self.user, title=f"Recipe {i}")
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+            self.recipes.append(recipe)
+
+    def expected(self):
+        request = APIRequestFactory().get(EXPORT_URL)
+        recipes = Recipe.objects.filter(user=self.user).order_by("-id")
+        return json.loads(
+            json.dumps(
+                RecipeDetailSerializer(
+                    recipes, many=True, context={"request": request}
+                ).data
+            )
+        )
+
+    def test_export_json(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res["Content-Type"], "application/json")
+        body = b"".join(res.streaming_content)
+        self.assertEqual(json.loads(body), self.expected())
+
+    def test_export_ignores_msgpack_accept(self):
+        res = self.client.get(EXPORT_URL, HTTP_ACCEPT="application/msgpack")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/json")
+        body = json.loads(b"".join(res.streaming_content))
+        self.assertEqual(body[0]["price"], "5.50")
+        self.assertEqual(body, self.expected())
+
+    def test_export_ndjson(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "ndjson"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.expected())
+
+    def test_export_bad_format(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "xml"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RECIPE_EXPORT_CHUNK_SIZE=2)
+    def test_export_queries_per_chunk(self):
+        res = self.client.get(EXPORT_URL, {"export_format": "ndjson"})
+
+        # One recipe query, then tags, ingredients and image renditions
+        # for each of 3 chunks.
+        with self.assertNumQueries(10):
+            lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual(len(lines), 5)
+
+    def test_export_limited_to_user(self):
+        other_user = get_user_model().objects.create_user(
+            email="other@example.com", password="otherpass"
+        )
+        create_recipe(user=other_user, title="Not mine")
+
+        res = self.client.get(EXPORT_URL)
+
+        titles = [
+            r["title"] for r in json.loads(b"".join(res.streaming_content))
+        ]
+        self.assertNotIn("Not mine", titles)
+        self.assertEqual(len(titles), 5)
@@ -0,0 +1,155 @@
+import tempfile
+from decimal import Decimal
+from unittest.mock import patch
+
+from core.models import Ingredient, Recipe, RecipeImageRendition, Tag
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from recipe.serializers import RecipeSerializer
+from recipe.views import RecipeViewSet
+from rest_framework.permissions import BasePermission, IsAuthenticated
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class OddRecipesOnly(BasePermission):
+    def has_object_permission(self, request, view, obj):
+        return isinstance(obj, Recipe) and obj.id % 2 == 1
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class FastPathParityTests(TestCase):
+    """Fast-path responses must match the serializers byte for byte."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="fast@example.com", password="fastpass"
+        )
+        self.client.force_authenticate(self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ["Vegan", "Quick", "Dinner"]
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ["Salt", "Rice"]
+        ]
+        self.recipes = []
+        for i in range(7):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f"Curry {i}",
+                time_minutes=10 + i,
+                price=Decimal("5") + Decimal(i) / 3,
+                description=f"Spicy curry number {i} — épic",
+                link="" if i % 2 else f"http://example.com/{i}",
+            )
+            first_tag = i % 3
+            recipe.tags.add(*tags[first_tag:])
+            if i % 2:
+                recipe.ingredients.add(*reversed(ingredients))
+            self.recipes.append(recipe)
+        recipe = self.recipes[0]
+        recipe.image.save("curry.jpg", ContentFile(b"jpeg"))
+        for label, width in [("thumb", 160), ("large", 1280)]:
+            rendition = RecipeImageRendition(
+                recipe=recipe,
+                source=recipe.image.name,
+                label=label,
+                format="webp",
+                width=width,
+                height=width,
+            )
+            rendition.file.name = f"uploads/{label}.webp"
+            rendition.save()
+
+    def assertSameBytes(self, url, params=None):
+        responses = []
+        for fast in (True, False):
+            caches[settings.RECIPE_CACHE_ALIAS].clear()
+            with self.settings(RECIPE_FAST_SERIALIZATION=fast):
+                res = self.client.get(url, params or {})
+            responses.append((res.status_code, res.content))
+        self.assertEqual(responses[0], responses[1])
+        return responses[0]
+
+    def test_list(self):
+        for params in [
+            {},
+            {"page_size": 3},
+            {"tags": str(Tag.objects.get(name="Dinner").id)},
+            {"search": "curry"},
+            {"fields": "id,price", "expand": "ingredients"},
+            {"expand": ""},
+        ]:
+            with self.subTest(params=params):
+                status_code, _ = self.assertSameBytes(RECIPES_URL, params)
+                self.assertEqual(status_code, 200)
+
+    def test_second_page(self):
+        res = self.client.get(RECIPES_URL, {"page_size": 3})
+        next_url = res.data["next"]
+
+        status_code, content = self.assertSameBytes(next_url)
+
+        self.assertEqual(status_code, 200)
+        self.assertIn(b"Curry 3", content)
+
+    def test_detail(self):
+        for recipe in self.recipes[:2]:
+            for params in [{}, {"fields": "image,renditions,title"}]:
+                with self.subTest(recipe=recipe.id, params=params):
+                    status_code, _ = self.assertSameBytes(
+                        detail_url(recipe.id), params
+                    )
+                    self.assertEqual(status_code, 200)
+
+    def test_detail_not_found(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="otherpass"
+        )
+        recipe = Recipe.objects.create(
+            user=other, title="Hidden", time_minutes=1, price=Decimal("1")
+        )
+
+        for url in [detail_url(recipe.id), "/api/recipe/recipes/abc/"]:
+            with self.subTest(url=url):
+                status_code, _ = self.assertSameBytes(url)
+                self.assertEqual(status_code, 404)
+
+    def test_serializers_bypassed(self):
+        with patch.object(
+            RecipeSerializer, "to_representation", side_effect=AssertionError
+        ):
+            list_res = self.client.get(RECIPES_URL)
+            detail_res = self.client.get(detail_url(self.recipes[0].id))
+
+        self.assertEqual(list_res.status_code, 200)
+        self.assertEqual(detail_res.status_code, 200)
+
+    def test_list_queries(self):
+        # Recipes, then their tags and their ingredients.
+        with self.assertNumQueries(3):
+            self.client.get(RECIPES_URL)
+
+    def test_detail_checks_object_permissions(self):
+        permissions = [IsAuthenticated, OddRecipesOnly]
+        with patch.object(RecipeViewSet, "permission_classes", permissions):
+            for recipe in self.recipes[:2]:
+                with self.subTest(recipe=recipe.id):
+                    status_code, _ = self.assertSameBytes(
+                        detail_url(recipe.id)
+                    )
+                    self.assertEqual(
+                        status_code, 200 if recipe.id % 2 else 403
+                    )
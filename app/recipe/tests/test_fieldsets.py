@@ -0,0 +1,121 @@
+import json
+from decimal import Decimal
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+def detail_url(recipe_id):
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="sparse@example.com", password="sparsepass"
+        )
+        self.client.force_authenticate(self.user)
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        ingredient = Ingredient.objects.create(user=self.user, name="Oats")
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f"Porridge {i}",
+                time_minutes=10,
+                price=Decimal("2.50"),
+                description="Long description " * 100,
+            )
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+        self.recipe = recipe
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        return res, [q["sql"] for q in queries.captured_queries]
+
+    def test_fields_trims_list_and_query(self):
+        res, sql = self.get(RECIPES_URL, {"fields": "title,id"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for row in res.data["results"]:
+            self.assertEqual(set(row), {"id", "title"})
+        # Only the recipe query itself: no tag or ingredient prefetches.
+        self.assertEqual(len(sql), 1)
+        self.assertNotIn('"price"', sql[0])
+        self.assertNotIn('"description"', sql[0])
+
+    def test_expand_selects_relations(self):
+        res, sql = self.get(RECIPES_URL, {"expand": "tags"})
+
+        row = res.data["results"][0]
+        self.assertEqual(
+            set(row), {"id", "title", "price", "time_minutes", "link", "tags"}
+        )
+        self.assertEqual(row["tags"][0]["name"], "Breakfast")
+        self.assertEqual(len(sql), 2)
+
+    def test_fields_with_expand(self):
+        res, _ = self.get(
+            detail_url(self.recipe.id),
+            {"fields": "id,description", "expand": "ingredients"},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(res.data), {"id", "description", "ingredients"})
+        self.assertEqual(res.data["description"], self.recipe.description)
+
+    def test_detail_without_params_unchanged(self):
+        res, _ = self.get(detail_url(self.recipe.id), {})
+
+        self.assertIn("renditions", res.data)
+        self.assertIn("description", res.data)
+
+    def test_empty_expand_drops_relations(self):
+        res, sql = self.get(detail_url(self.recipe.id), {"expand": ""})
+
+        self.assertNotIn("tags", res.data)
+        self.assertNotIn("renditions", res.data)
+        self.assertIn("image_status", res.data)
+        self.assertEqual(len(sql), 1)
+
+    def test_unknown_fields_rejected(self):
+        for params in [
+            {"fields": "id,secret"},
+            {"expand": "title"},
+            # Detail-only fields are not on the list serializer.
+            {"fields": "description"},
+        ]:
+            with self.subTest(params=params):
+                res, _ = self.get(RECIPES_URL, params)
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_field_order_shares_cache_entry(self):
+        self.get(RECIPES_URL, {"fields": "id,title"})
+
+        res, sql = self.get(RECIPES_URL, {"fields": "title,id"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(sql, [])
+
+    def test_export_fields(self):
+        res = self.client.get(
+            EXPORT_URL, {"export_format": "ndjson", "fields": "id,title"}
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            lines = b"".join(res.streaming_content).splitlines()
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            [set(json.loads(line)) for line in lines], [{"id", "title"}] * 3
+        )
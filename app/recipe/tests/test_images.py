@@ -0,0 +1,222 @@
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+
+from core.models import Recipe, RecipeImageRendition
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from recipe.images import make_renditions
+from rest_framework import status
+from rest_framework.test import APIClient
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+ORIENTATION = 0x0112
+GPS_INFO = 0x8825
+
+
+def image_bytes(
+    size=(3000, 2000), fmt="JPEG", mode="RGB", color="red", exif=None
+):
+    out = io.BytesIO()
+    image = Image.new(mode, size, color)
+    kwargs = {"exif": exif} if exif is not None else {}
+    image.save(out, format=fmt, **kwargs)
+    return out.getvalue()
+
+
+def upload_url(recipe_id):
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    TASK_BROKER={"BACKEND": "core.tasks.ImmediateBroker"},
+    RECIPE_IMAGE_RENDITIONS={"thumb": 160, "large": 1280},
+    RECIPE_IMAGE_FORMATS=["webp", "jpeg"],
+)
+class RecipeImagePipelineTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="photos@example.com", password="photopass"
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Masala dosa",
+            time_minutes=30,
+            price=Decimal("4.00"),
+        )
+
+    def upload(self, data, name="photo.jpg"):
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                upload_url(self.recipe.id),
+                {"image": SimpleUploadedFile(name, data)},
+                format="multipart",
+            )
+        self.recipe.refresh_from_db()
+        return res
+
+    def test_upload_returns_before_processing(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            res = self.client.post(
+                upload_url(self.recipe.id),
+                {"image": SimpleUploadedFile("photo.jpg", image_bytes())},
+                format="multipart",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["image_status"], Recipe.IMAGE_PENDING)
+        self.assertFalse(RecipeImageRendition.objects.exists())
+
+    def test_renditions_created(self):
+        res = self.upload(image_bytes())
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_READY)
+        sizes = {
+            (r.label, r.format): (r.width, r.height)
+            for r in self.recipe.renditions.all()
+        }
+        self.assertEqual(
+            sizes,
+            {
+                ("thumb", "webp"): (160, 107),
+                ("thumb", "jpeg"): (160, 107),
+                ("large", "webp"): (1280, 853),
+                ("large", "jpeg"): (1280, 853),
+            },
+        )
+        rendition = self.recipe.renditions.get(label="thumb", format="webp")
+        with Image.open(rendition.file.path) as image:
+            self.assertEqual(image.format, "WEBP")
+
+    def test_small_images_not_upscaled(self):
+        self.upload(image_bytes(size=(200, 100)))
+
+        large = self.recipe.renditions.get(label="large", format="jpeg")
+        self.assertEqual((large.width, large.height), (200, 100))
+
+    def test_metadata_stripped_and_orientation_applied(self):
+        exif = Image.Exif()
+        exif[ORIENTATION] = 6
+        exif[GPS_INFO] = {1: "N", 2: (12.0, 58.0, 0.0)}
+
+        self.upload(image_bytes(size=(400, 200), exif=exif))
+
+        paths = [r.file.path for r in self.recipe.renditions.all()]
+        for path in paths + [self.recipe.image.path]:
+            with Image.open(path) as image:
+                self.assertEqual(image.height, image.width * 2)
+                self.assertEqual(len(image.getexif()), 0)
+
+    def test_original_replaced(self):
+        upload = image_bytes(size=(400, 200))
+        res = self.upload(upload)
+        uploaded = res.data["image"].rsplit("/", 1)[-1]
+
+        self.assertNotIn(uploaded, self.recipe.image.name)
+        self.assertTrue(self.recipe.image.name.endswith(".jpg"))
+        with Image.open(self.recipe.image.path) as image:
+            self.assertEqual((image.format, image.size), ("JPEG", (400, 200)))
+        self.assertTrue(
+            all(
+                r.source == self.recipe.image.name
+                for r in self.recipe.renditions.all()
+            )
+        )
+
+    def test_other_formats_become_png(self):
+        self.upload(image_bytes(size=(40, 20), fmt="GIF", mode="P"), "a.gif")
+
+        with Image.open(self.recipe.image.path) as image:
+            self.assertEqual((image.format, image.size), ("PNG", (40, 20)))
+
+    def test_image_not_writable_through_detail(self):
+        self.upload(image_bytes(size=(400, 200)))
+        name = self.recipe.image.name
+
+        res = self.client.patch(
+            reverse("recipe:recipe-detail", args=[self.recipe.id]),
+            {
+                "title": "Renamed",
+                "image": SimpleUploadedFile("new.jpg", image_bytes()),
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.title, "Renamed")
+        self.assertEqual(self.recipe.image.name, name)
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_READY)
+
+    def test_transparent_png(self):
+        self.upload(
+            image_bytes(
+                size=(300, 300), fmt="PNG", mode="RGBA", color=(0, 0, 0, 0)
+            ),
+            name="logo.png",
+        )
+
+        webp = self.recipe.renditions.get(label="thumb", format="webp")
+        with Image.open(webp.file.path) as image:
+            self.assertEqual(image.mode, "RGBA")
+        jpeg = self.recipe.renditions.get(label="thumb", format="jpeg")
+        with Image.open(jpeg.file.path) as image:
+            self.assertEqual(image.mode, "RGB")
+
+    def test_new_upload_replaces_renditions(self):
+        self.upload(image_bytes(size=(400, 200)))
+        first = set(self.recipe.renditions.values_list("file", flat=True))
+
+        self.upload(image_bytes(size=(200, 400)))
+
+        renditions = self.recipe.renditions.all()
+        self.assertEqual(len(renditions), 4)
+        self.assertTrue(first.isdisjoint(r.file.name for r in renditions))
+        self.assertTrue(
+            all(r.source == self.recipe.image.name for r in renditions)
+        )
+
+    def test_stale_job_ignored(self):
+        self.upload(image_bytes())
+        count = RecipeImageRendition.objects.count()
+
+        make_renditions(self.recipe.id, "uploads/recipe/replaced.jpg")
+
+        self.assertEqual(RecipeImageRendition.objects.count(), count)
+
+    @override_settings(RECIPE_IMAGE_MAX_PIXELS=1000)
+    def test_oversized_image_marked_failed(self):
+        with self.assertLogs("recipe.images", "WARNING"):
+            self.upload(image_bytes(size=(100, 100)))
+
+        self.assertEqual(self.recipe.image_status, Recipe.IMAGE_FAILED)
+        self.assertFalse(self.recipe.renditions.exists())
+
+    def test_detail_exposes_renditions(self):
+        self.upload(image_bytes())
+
+        res = self.client.get(
+            reverse("recipe:recipe-detail", args=[self.recipe.id])
+        )
+
+        self.assertEqual(res.data["image_status"], Recipe.IMAGE_READY)
+        self.assertEqual(len(res.data["renditions"]), 4)
+        rendition = res.data["renditions"][0]
+        self.assertEqual(
+            set(rendition), {"label", "format", "width", "height", "url"}
+        )
+        self.assertTrue(rendition["url"].startswith("http://testserver/"))
@@ -0,0 +1,154 @@
+import json
+import tempfile
+from io import StringIO
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from recipe.importers import RecipeImporter, iter_ndjson
+from rest_framework import status
+from rest_framework.test import APIClient
+
+IMPORT_URL = reverse("recipe:recipe-import")
+
+
+def ndjson_rows(count, **params):
+    rows = []
+    for i in range(count):
+        row = {
+            "title": f"Recipe {i}",
+            "time_minutes": 10,
+            "price": "3.25",
+            "tags": [{"name": "Dinner"}, {"name": f"Tag {i % 2}"}],
+            "ingredients": [{"name": "Salt"}],
+        }
+        row.update(params)
+        rows.append(json.dumps(row))
+    return ("\n".join(rows) + "\n").encode()
+
+
+CSV_DATA = (
+    "title,time_minutes,price,description,tags,ingredients\n"
+    "Idly,20,1.50,Steamed,Breakfast;South Indian,Rice;Urad dal\n"
+    "Dosa,25,2.00,,Breakfast,Rice\n"
+).encode()
+
+
+class RecipeImportApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="importer@example.com", password="importpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, content, **data):
+        upload = SimpleUploadedFile(name, content)
+        return self.client.post(
+            IMPORT_URL, {"file": upload, **data}, format="multipart"
+        )
+
+    def test_import_ndjson(self):
+        res = self.upload("recipes.ndjson", ndjson_rows(5))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 5)
+        self.assertEqual(res.data["next_offset"], 5)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 5)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 3)
+        recipe = Recipe.objects.get(title="Recipe 1")
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Dinner", "Tag 1"],
+        )
+
+    def test_import_csv(self):
+        res = self.upload("recipes.csv", CSV_DATA)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        idly = Recipe.objects.get(user=self.user, title="Idly")
+        self.assertEqual(idly.description, "Steamed")
+        self.assertEqual(
+            sorted(idly.ingredients.values_list("name", flat=True)),
+            ["Rice", "Urad dal"],
+        )
+
+    def test_import_resumes_from_offset(self):
+        res = self.upload("recipes.ndjson", ndjson_rows(5), offset=3)
+
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["next_offset"], 5)
+        titles = set(Recipe.objects.values_list("title", flat=True))
+        self.assertEqual(titles, {"Recipe 3", "Recipe 4"})
+
+    def test_invalid_rows_reported(self):
+        content = ndjson_rows(2) + b"not json\n" + ndjson_rows(1, title="")
+
+        res = self.upload("recipes.ndjson", content)
+
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["failed"], 2)
+        self.assertEqual([e["row"] for e in res.data["errors"]], [2, 3])
+
+    def test_unknown_format_rejected(self):
+        res = self.upload("recipes.xml", b"<recipes/>")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeImporterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="batcher@example.com", password="batchpass"
+        )
+
+    def test_progress_reported_per_batch(self):
+        reports = []
+        importer = RecipeImporter(
+            self.user,
+            batch_size=2,
+            progress=lambda result: reports.append(result.next_offset),
+        )
+
+        result = importer.run(iter_ndjson(ndjson_rows(5).splitlines()))
+
+        self.assertEqual(reports, [2, 4, 5])
+        self.assertEqual(result.created, 5)
+
+    def test_names_resolved_once_per_import(self):
+        importer = RecipeImporter(self.user, batch_size=2)
+        importer.run(iter_ndjson(ndjson_rows(2).splitlines()))
+
+        self.assertEqual(
+            set(importer._known[Tag]), {"Dinner", "Tag 0", "Tag 1"}
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            importer.run(iter_ndjson(ndjson_rows(2).splitlines()))
+        lookups = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT")
+        ]
+        self.assertEqual(lookups, [])
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson") as f:
+            f.write(ndjson_rows(3))
+            f.flush()
+            out = StringIO()
+            call_command(
+                "import_recipes",
+                self.user.email,
+                f.name,
+                "--batch-size=2",
+                stdout=out,
+            )
+
+        self.assertIn("Imported 3 recipes", out.getvalue())
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 3)
@@ -42,7 +42,7 @@ class PrivateIngredientsApiTests(TestCase):
         ingredients = Ingredient.objects.all().order_by("-name")
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         serializer = IngredientSerializer(ingredients, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         other_user = create_user(
@@ -53,8 +53,8 @@ class PrivateIngredientsApiTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], ig2.name)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], ig2.name)
 
     def test_update_ingredients(self):
         ingredient = Ingredient.objects.create(user=self.user, name="Grapes")
@@ -84,6 +84,7 @@ class PrivateIngredientsApiTests(TestCase):
             user=self.user, title="Carrot Halwa", price="15", time_minutes=5
         )
         recipe.ingredients.add(ing1)
+        ing1.refresh_from_db()
 
         params = {"assigned_only": 1}
 
@@ -91,8 +92,8 @@ class PrivateIngredientsApiTests(TestCase):
 
         s1 = IngredientSerializer(ing1)
         s2 = IngredientSerializer(ing2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertNotIn(s2.data, res.data["results"])
 
     def test_filtered_ingredients_unique(self):
         ing = Ingredient.objects.create(user=self.user, name="Carrots")
@@ -107,4 +108,4 @@ class PrivateIngredientsApiTests(TestCase):
         r2.ingredients.add(ing)
         params = {"assigned_only": 1}
         res = self.client.get(INGREDIENTS_URL, params)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
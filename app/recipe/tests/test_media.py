@@ -0,0 +1,132 @@
+import io
+import shutil
+import tempfile
+from decimal import Decimal
+
+from core.models import Recipe, RecipeImageRendition
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+def image_bytes():
+    out = io.BytesIO()
+    Image.new("RGB", (20, 20), "red").save(out, format="JPEG")
+    return out.getvalue()
+
+
+def media_url(name):
+    return reverse("recipe:recipe-media", args=[name])
+
+
+class RecipeMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(
+            email="media@example.com", password="mediapass"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.recipe = self.create_recipe(self.user)
+        self.recipe.image.save("a.jpg", ContentFile(image_bytes()))
+
+    def create_recipe(self, user):
+        return Recipe.objects.create(
+            user=user, title="Idli", time_minutes=20, price=Decimal("2.00")
+        )
+
+    def fetch(self, name, client=None, **headers):
+        response = (client or self.client).get(media_url(name), **headers)
+        if response.streaming:
+            response.body = b"".join(response.streaming_content)
+            response.close()
+        return response
+
+    def test_owner_gets_image(self):
+        response = self.fetch(self.recipe.image.name)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.body, image_bytes())
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+
+    def test_unprocessed_image_not_served(self):
+        for image_status in (Recipe.IMAGE_PENDING, Recipe.IMAGE_FAILED):
+            with self.subTest(image_status=image_status):
+                self.recipe.image_status = image_status
+                self.recipe.save(update_fields=["image_status"])
+
+                response = self.fetch(self.recipe.image.name)
+
+                self.assertEqual(response.status_code, 404)
+
+    def test_image_url_points_at_view(self):
+        self.assertEqual(
+            self.recipe.image.url, media_url(self.recipe.image.name)
+        )
+
+    def test_owner_gets_rendition(self):
+        rendition = RecipeImageRendition(
+            recipe=self.recipe, source=self.recipe.image.name, label="thumb"
+        )
+        rendition.file.save("t.jpg", ContentFile(image_bytes()), save=True)
+
+        response = self.fetch(rendition.file.name)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_user_cannot_get_image(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="otherpass"
+        )
+        client = APIClient()
+        client.force_authenticate(other)
+
+        response = self.fetch(self.recipe.image.name, client)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_shared_file_served_to_each_owner(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="otherpass"
+        )
+        recipe = self.create_recipe(other)
+        recipe.image.save("b.jpg", ContentFile(image_bytes()))
+        self.assertEqual(recipe.image.name, self.recipe.image.name)
+        client = APIClient()
+        client.force_authenticate(other)
+
+        response = self.fetch(recipe.image.name, client)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_auth_required(self):
+        response = self.fetch(self.recipe.image.name, APIClient())
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_image_accept_header(self):
+        response = self.fetch("uploads/missing.jpg", HTTP_ACCEPT="image/webp")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_not_modified(self):
+        etag = self.fetch(self.recipe.image.name)["ETag"]
+
+        response = self.fetch(self.recipe.image.name, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_range(self):
+        response = self.fetch(self.recipe.image.name, HTTP_RANGE="bytes=0-3")
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response.body, image_bytes()[:4])
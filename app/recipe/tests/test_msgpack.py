@@ -0,0 +1,103 @@
+from decimal import Decimal
+from unittest import skipIf
+
+from core import renderers
+from core.models import Recipe, Tag
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+MSGPACK = "application/msgpack"
+
+
+def detail_url(recipe_id):
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def unpack(res):
+    return renderers.msgpack.unpackb(
+        res.content, ext_hook=renderers._msgpack_ext_hook
+    )
+
+
+@skipIf(renderers.msgpack is None, "msgpack is not installed")
+class MessagePackApiTests(TestCase):
+    def setUp(self):
+        caches[settings.RECIPE_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="packed@example.com", password="packpass"
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Dal", time_minutes=30, price=Decimal("4.5")
+        )
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+
+    def test_list_matches_json(self):
+        for fast in (True, False):
+            with self.subTest(fast=fast), self.settings(
+                RECIPE_FAST_SERIALIZATION=fast
+            ):
+                caches[settings.RECIPE_CACHE_ALIAS].clear()
+                json_res = self.client.get(RECIPES_URL)
+                res = self.client.get(RECIPES_URL, HTTP_ACCEPT=MSGPACK)
+
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertEqual(res["Content-Type"], MSGPACK)
+                data = unpack(res)
+                self.assertEqual(data["results"][0]["price"], Decimal("4.50"))
+                data["results"][0]["price"] = "4.50"
+                self.assertEqual(data, json_res.json())
+
+    def test_format_query_parameter(self):
+        res = self.client.get(
+            detail_url(self.recipe.id), {"format": "msgpack"}
+        )
+
+        self.assertEqual(res["Content-Type"], MSGPACK)
+        self.assertEqual(unpack(res)["title"], "Dal")
+
+    def test_cached_per_format(self):
+        json_res = self.client.get(detail_url(self.recipe.id))
+        res = self.client.get(detail_url(self.recipe.id), HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(unpack(res)["price"], Decimal("4.50"))
+        self.assertNotEqual(res["ETag"], json_res["ETag"])
+        self.assertIn("Accept", res["Vary"])
+
+    def test_create(self):
+        payload = {
+            "title": "Pho",
+            "time_minutes": 45,
+            "price": Decimal("12.25"),
+            "tags": [{"name": "Soup"}],
+        }
+        body = renderers.MessagePackRenderer().render(payload)
+
+        res = self.client.post(
+            RECIPES_URL, body, content_type=MSGPACK, HTTP_ACCEPT=MSGPACK
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=unpack(res)["id"])
+        self.assertEqual(recipe.price, Decimal("12.25"))
+        self.assertEqual(unpack(res)["price"], Decimal("12.25"))
+
+    def test_invalid_body(self):
+        res = self.client.post(RECIPES_URL, b"\xc1", content_type=MSGPACK)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tags(self):
+        res = self.client.get(TAGS_URL, HTTP_ACCEPT=MSGPACK)
+
+        self.assertEqual(res["Content-Type"], MSGPACK)
+        self.assertEqual(unpack(res)["results"][0]["name"], "Vegan")
@@ -0,0 +1,152 @@
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from recipe.views import IngredientViewSet, RecipeViewSet, TagViewSet
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+def view_queryset(viewset, user, params=None):
+    """Return the queryset a list request would run for ``user``."""
+    request = APIRequestFactory().get("/", params or {})
+    force_authenticate(request, user=user)
+    view = viewset()
+    view.action = "list"
+    view.request = Request(request)
+    return view.get_queryset()
+
+
+class ListQueryPlanTests(TestCase):
+    """List queries are answered from indexes, not full table scans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(
+                email=f"planuser{i}@example.com", password="planpass"
+            )
+            for i in range(20)
+        ]
+        for user in users:
+            Tag.objects.bulk_create(
+                [Tag(user=user, name=f"Tag {i}") for i in range(20)]
+            )
+            Ingredient.objects.bulk_create(
+                [Ingredient(user=user, name=f"Ing {i}") for i in range(20)]
+            )
+            Recipe.objects.bulk_create(
+                [
+                    Recipe(
+                        user=user,
+                        title=f"Recipe {i}",
+                        time_minutes=5,
+                        price="1.00",
+                    )
+                    for i in range(50)
+                ]
+            )
+        cls.user = users[0]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def index_on(self, table, columns):
+        """Return the name of the plain index on ``columns`` of ``table``."""
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, table
+            )
+        return next(
+            name
+            for name, info in constraints.items()
+            if info["index"] and info["columns"] == columns
+        )
+
+    def plan_names(self, table, name):
+        """Return the names index ``name`` can show up as in a plan."""
+        names = {name}
+        if connection.vendor != "sqlite":
+            return names
+        # SQLite backs unique constraints with automatic indexes.
+        with connection.cursor() as cursor:
+            columns = connection.introspection.get_constraints(cursor, table)[
+                name
+            ]["columns"]
+            cursor.execute(f"PRAGMA index_list({table})")
+            for _, index, _, origin, _ in cursor.fetchall():
+                cursor.execute(f"PRAGMA index_info({index})")
+                indexed = [row[2] for row in cursor.fetchall()]
+                if origin == "u" and indexed == columns:
+                    names.add(index)
+        return names
+
+    def assertUsesIndex(self, queryset, table, indexes, alias=None):
+        names = set()
+        for index in indexes:
+            names |= self.plan_names(table, index)
+        names = "|".join(sorted(names))
+        plan = queryset.explain()
+        if connection.vendor == "postgresql":
+            self.assertNotIn(f"Seq Scan on {table}", plan)
+            self.assertRegex(plan, rf"Scan (Backward )?(using|on) ({names})\b")
+        else:
+            self.assertRegex(
+                plan,
+                rf"(SEARCH|SCAN) {alias or table} "
+                rf"USING (COVERING )?INDEX ({names})\b",
+            )
+
+    def test_recipe_list_uses_index(self):
+        queryset = view_queryset(RecipeViewSet, self.user)
+        indexes = ["recipe_user_id_desc"]
+        if connection.vendor == "sqlite":
+            # Every SQLite index ends in the rowid, so the user_id index
+            # orders by -id just as well.
+            indexes.append(self.index_on("core_recipe", ["user_id"]))
+
+        self.assertUsesIndex(queryset, "core_recipe", indexes)
+
+    def test_match_all_filter_uses_link_index(self):
+        tags = list(Tag.objects.filter(user=self.user)[:2])
+        params = {
+            "tags": ",".join(str(tag.id) for tag in tags),
+            "match": "all",
+        }
+        queryset = view_queryset(RecipeViewSet, self.user, params)
+        link_indexes = [
+            self.index_on("core_recipe_tags", ["tag_id"]),
+            self.index_on("core_recipe_tags", ["recipe_id", "tag_id"]),
+        ]
+
+        self.assertNotIn("DISTINCT", str(queryset.query))
+        # SQLite reports the subquery's table under Django's alias.
+        self.assertUsesIndex(
+            queryset, "core_recipe_tags", link_indexes, alias="U0"
+        )
+
+    def test_assigned_only_uses_index(self):
+        queryset = view_queryset(TagViewSet, self.user, {"assigned_only": 1})
+
+        self.assertNotIn("JOIN", str(queryset.query))
+        self.assertUsesIndex(queryset, "core_tag", ["tag_user_assigned"])
+
+    def test_usage_ordering_uses_index(self):
+        queryset = view_queryset(
+            IngredientViewSet, self.user, {"ordering": "-usage"}
+        )
+
+        self.assertUsesIndex(
+            queryset, "core_ingredient", ["ingredient_user_usage_desc"]
+        )
+
+    def test_tag_list_uses_index(self):
+        queryset = view_queryset(TagViewSet, self.user)
+
+        self.assertUsesIndex(queryset, "core_tag", ["unique_tag_user_name"])
+
+    def test_ingredient_list_uses_index(self):
+        queryset = view_queryset(IngredientViewSet, self.user)
+
+        self.assertUsesIndex(
+            queryset, "core_ingredient", ["unique_ingredient_user_name"]
+        )
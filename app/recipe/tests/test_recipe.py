@@ -2,12 +2,16 @@ import os
 import tempfile
 from ctypes.wintypes import RGB
 from decimal import Decimal
+from unittest.mock import patch
 
 from core.models import Ingredient, Recipe, Tag
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from PIL import Image
+from recipe.pagination import RecipeCursorPagination
 from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
 from rest_framework import status
 from rest_framework.test import APIClient
@@ -69,7 +73,7 @@ class PrivateRecipeApiTests(TestCase):
 
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_recipe_list_limited_to_user(self):
 
@@ -85,7 +89,7 @@ class PrivateRecipeApiTests(TestCase):
 
         serializer = RecipeSerializer(recipes, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_get_recipe_details(self):
         recipe = create_recipe(user=self.user)
@@ -315,9 +319,9 @@ class PrivateRecipeApiTests(TestCase):
         s3 = RecipeSerializer(r3)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
 
     def test_filter_recipe_using_ingredients(self):
         r1 = create_recipe(user=self.user, title="Rajma chawal")
@@ -337,9 +341,63 @@ class PrivateRecipeApiTests(TestCase):
         s3 = RecipeSerializer(r3)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
+
+    def test_filter_match_any_returns_each_recipe_once(self):
+        r1 = create_recipe(user=self.user, title="Rajma chawal")
+        t1 = Tag.objects.create(user=self.user, name="Lunch")
+        t2 = Tag.objects.create(user=self.user, name="Dinner")
+        r1.tags.add(t1, t2)
+
+        params = {"tags": f"{t1.id},{t2.id}", "match": "any"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data["results"]], [r1.id])
+
+    def test_filter_match_all_tags(self):
+        t1 = Tag.objects.create(user=self.user, name="Lunch")
+        t2 = Tag.objects.create(user=self.user, name="Vegan")
+        r1 = create_recipe(user=self.user, title="Chana masala")
+        r1.tags.add(t1, t2)
+        r2 = create_recipe(user=self.user, title="Butter chicken")
+        r2.tags.add(t1)
+
+        params = {"tags": f"{t1.id},{t2.id}", "match": "all"}
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([r["id"] for r in res.data["results"]], [r1.id])
+
+    def test_filter_match_all_tags_and_ingredients(self):
+        tag = Tag.objects.create(user=self.user, name="Lunch")
+        i1 = Ingredient.objects.create(user=self.user, name="Rice")
+        i2 = Ingredient.objects.create(user=self.user, name="Lentils")
+        r1 = create_recipe(user=self.user, title="Khichdi")
+        r1.tags.add(tag)
+        r1.ingredients.add(i1, i2)
+        r2 = create_recipe(user=self.user, title="Jeera rice")
+        r2.tags.add(tag)
+        r2.ingredients.add(i1)
+        r3 = create_recipe(user=self.user, title="Dal")
+        r3.ingredients.add(i1, i2)
+
+        params = {
+            "tags": f"{tag.id}",
+            "ingredients": f"{i1.id},{i2.id},{i1.id}",
+            "match": "all",
+        }
+        res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual([r["id"] for r in res.data["results"]], [r1.id])
+
+    def test_filter_invalid_params_rejected(self):
+        for params in ({"match": "some"}, {"tags": "1,two"}):
+            res = self.client.get(RECIPES_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
 
 class ImageApiTestCases(TestCase):
@@ -374,3 +432,131 @@ class ImageApiTestCases(TestCase):
         payload = {"image": "badrequest"}
         res = self.client.post(url, payload, format="multipart")
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RecipeQueryBudgetTests(TestCase):
+    """Read endpoints must not issue queries per recipe."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="budgetuser@example.com", password="budgetpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def _create_recipes(self, count):
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        recipes = []
+        for i in range(count):
+            recipe = create_recipe(user=self.user, title=f"Recipe {i}")
+            recipe.tags.add(tag)
+            recipe.ingredients.add(ingredient)
+            recipes.append(recipe)
+        return recipes, tag, ingredient
+
+    def test_list_query_count_constant(self):
+        self._create_recipes(10)
+
+        # recipes, tags, ingredients
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_filter_query_count_constant(self):
+        _, tag, ingredient = self._create_recipes(10)
+        params = {"tags": f"{tag.id}", "ingredients": f"{ingredient.id}"}
+
+        with self.assertNumQueries(3):
+            res = self.client.get(RECIPES_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 10)
+
+    def test_retrieve_query_count(self):
+        recipes, _, _ = self._create_recipes(1)
+
+        # recipe, tags, ingredients, image renditions
+        with self.assertNumQueries(4):
+            res = self.client.get(detail_url(recipes[0].id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["tags"]), 1)
+
+    def _create_queries(self, count):
+        payload = {
+            "title": f"Recipe with {count}",
+            "time_minutes": 10,
+            "price": Decimal("2.50"),
+            "tags": [{"name": f"Tag {i}"} for i in range(count)],
+            "ingredients": [{"name": f"Ing {i}"} for i in range(count)],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return len(ctx.captured_queries)
+
+    def test_create_query_count_constant(self):
+        self.assertEqual(self._create_queries(2), self._create_queries(30))
+
+    def test_update_keeps_unchanged_links(self):
+        recipe = create_recipe(user=self.user)
+        keep = Tag.objects.create(user=self.user, name="Keep")
+        drop = Tag.objects.create(user=self.user, name="Drop")
+        recipe.tags.add(keep, drop)
+        through = Recipe.tags.through
+        keep_link = through.objects.get(recipe=recipe, tag=keep)
+
+        payload = {"tags": [{"name": "Keep"}, {"name": "New"}]}
+        res = self.client.patch(detail_url(recipe.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(recipe.tags.values_list("name", flat=True)),
+            ["Keep", "New"],
+        )
+        self.assertTrue(through.objects.filter(id=keep_link.id).exists())
+
+
+class RecipePaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email="pageuser@example.com", password="pagepass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_pages_follow_cursor(self):
+        recipes = [
+            create_recipe(user=self.user, title=f"Recipe {i}")
+            for i in range(5)
+        ]
+
+        res = self.client.get(RECIPES_URL, {"page_size": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r["id"] for r in res.data["results"]],
+            [recipes[4].id, recipes[3].id],
+        )
+        self.assertIsNone(res.data["previous"])
+
+        seen = [r["id"] for r in res.data["results"]]
+        next_url = res.data["next"]
+        while next_url:
+            res = self.client.get(next_url)
+            seen += [r["id"] for r in res.data["results"]]
+            next_url = res.data["next"]
+
+        self.assertEqual(seen, [r.id for r in reversed(recipes)])
+
+    @patch.object(RecipeCursorPagination, "max_page_size", 2)
+    def test_page_size_capped(self):
+        for i in range(3):
+            create_recipe(user=self.user, title=f"Recipe {i}")
+
+        res = self.client.get(RECIPES_URL, {"page_size": 10000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 2)
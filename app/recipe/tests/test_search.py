@@ -0,0 +1,174 @@
+from decimal import Decimal
+from unittest import skipUnless
+
+from core.models import Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from recipe.search import InvertedIndex, search_recipes, tokenize
+from rest_framework import status
+from rest_framework.test import APIClient
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 5,
+        "price": Decimal("5.50"),
+        "description": "",
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class InvertedIndexTests(TestCase):
+    def test_tokenize_drops_stop_words_and_plurals(self):
+        self.assertEqual(
+            tokenize("The Tomatoes and Berries of Rice"),
+            ["tomato", "berry", "rice"],
+        )
+
+    def test_every_term_must_match(self):
+        index = InvertedIndex()
+        index.add(1, "Chicken curry", "")
+        index.add(2, "Chicken soup", "")
+
+        self.assertEqual(set(index.search("chicken curry")), {1})
+        self.assertEqual(set(index.search("chicken")), {1, 2})
+        self.assertEqual(index.search("the"), {})
+
+    def test_title_weighted_above_description(self):
+        index = InvertedIndex()
+        index.add(1, "Soup", "with lemon")
+        index.add(2, "Lemon rice", "")
+
+        scores = index.search("lemon")
+
+        self.assertGreater(scores[2], scores[1])
+
+
+class RecipeSearchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email="searcher@example.com", password="searchpass"
+        )
+        self.client.force_authenticate(self.user)
+
+    def search(self, text, **params):
+        res = self.client.get(RECIPES_URL, {"search": text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def titles(self, res):
+        return [r["title"] for r in res.data["results"]]
+
+    def test_results_ranked_by_relevance(self):
+        create_recipe(self.user, title="Plain rice", description="Lemon")
+        create_recipe(self.user, title="Lemon rice")
+        create_recipe(self.user, title="Dal", description="No citrus")
+
+        res = self.search("lemon")
+
+        self.assertEqual(self.titles(res), ["Lemon rice", "Plain rice"])
+
+    def test_matches_plural_forms(self):
+        create_recipe(self.user, title="Tomato soup")
+
+        res = self.search("tomatoes")
+
+        self.assertEqual(self.titles(res), ["Tomato soup"])
+
+    def test_only_own_recipes_searched(self):
+        other = get_user_model().objects.create_user(
+            email="other@example.com", password="otherpass"
+        )
+        create_recipe(other, title="Lemon cake")
+        create_recipe(self.user, title="Lemon tart")
+
+        res = self.search("lemon")
+
+        self.assertEqual(self.titles(res), ["Lemon tart"])
+
+    def test_search_combined_with_tag_filter(self):
+        tag = Tag.objects.create(user=self.user, name="Dessert")
+        tart = create_recipe(self.user, title="Lemon tart")
+        tart.tags.add(tag)
+        create_recipe(self.user, title="Lemon rice")
+
+        res = self.search("lemon", tags=str(tag.id))
+
+        self.assertEqual(self.titles(res), ["Lemon tart"])
+
+    def test_results_follow_updates(self):
+        recipe = create_recipe(self.user, title="Lemon tart")
+        self.assertEqual(self.titles(self.search("lemon")), ["Lemon tart"])
+
+        url = reverse("recipe:recipe-detail", args=[recipe.id])
+        self.client.patch(url, {"title": "Orange tart"})
+
+        self.assertEqual(self.titles(self.search("lemon")), [])
+        self.assertEqual(self.titles(self.search("orange")), ["Orange tart"])
+
+    def test_detail_ignores_search(self):
+        recipe = create_recipe(self.user, title="Lemon tart")
+        url = reverse("recipe:recipe-detail", args=[recipe.id])
+
+        res = self.client.get(url, {"search": "orange"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.patch(f"{url}?search=orange", {"title": "Tart"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Tart")
+
+    def test_ranked_results_paginate(self):
+        for i in range(3):
+            create_recipe(self.user, title=f"Lemon dish {i}")
+        for i in range(3):
+            create_recipe(self.user, title=f"Dish {i}", description="lemon")
+
+        res = self.search("lemon", page_size=2)
+        titles = self.titles(res)
+        while res.data["next"]:
+            res = self.client.get(res.data["next"])
+            titles += self.titles(res)
+
+        self.assertEqual(
+            titles,
+            [
+                "Lemon dish 2",
+                "Lemon dish 1",
+                "Lemon dish 0",
+                "Dish 2",
+                "Dish 1",
+                "Dish 0",
+            ],
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "PostgreSQL only")
+class PostgresSearchVectorTests(TestCase):
+    def test_bulk_inserted_recipes_are_searchable(self):
+        user = get_user_model().objects.create_user(
+            email="bulk@example.com", password="bulkpass"
+        )
+        Recipe.objects.bulk_create(
+            [
+                Recipe(
+                    user=user,
+                    title="Lemon rice",
+                    time_minutes=5,
+                    price=Decimal("1.00"),
+                )
+            ]
+        )
+
+        results = search_recipes(
+            Recipe.objects.filter(user=user), user, "lemons"
+        )
+
+        self.assertEqual([r.title for r in results], ["Lemon rice"])
@@ -43,7 +43,7 @@ class PrivateTagAPiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_user_filtered_tags(self):
         other_user = create_user(
@@ -55,9 +55,9 @@ class PrivateTagAPiTests(TestCase):
         res = self.client.get(TAG_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], tag.name)
-        self.assertEqual(res.data[0]["id"], tag.id)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], tag.name)
+        self.assertEqual(res.data["results"][0]["id"], tag.id)
 
     def test_update_tag(self):
         """Test updating a tag."""
@@ -89,6 +89,7 @@ class PrivateTagAPiTests(TestCase):
             user=self.user, title="Carrot Halwa", price="15", time_minutes=5
         )
         recipe.tags.add(tag1)
+        tag1.refresh_from_db()
 
         params = {"assigned_only": 1}
 
@@ -96,8 +97,8 @@ class PrivateTagAPiTests(TestCase):
 
         s1 = TagSerializer(tag1)
         s2 = TagSerializer(tag2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertNotIn(s2.data, res.data["results"])
 
     def test_filtered_ingredients_unique(self):
         tag = Tag.objects.create(user=self.user, name="Sweet")
@@ -112,4 +113,52 @@ class PrivateTagAPiTests(TestCase):
         r2.tags.add(tag)
         params = {"assigned_only": 1}
         res = self.client.get(TAG_URL, params)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_tags_ordered_by_usage(self):
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ["Quick", "Vegan", "Spicy"]
+        ]
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f"Dish {i}", price="5", time_minutes=5
+            )
+            recipe.tags.add(*tags[: i + 1])
+
+        res = self.client.get(TAG_URL, {"ordering": "-usage"})
+
+        self.assertEqual(
+            [(t["name"], t["usage_count"]) for t in res.data["results"]],
+            [("Quick", 3), ("Vegan", 2), ("Spicy", 1)],
+        )
+
+    def test_invalid_ordering_rejected(self):
+        res = self.client.get(TAG_URL, {"ordering": "usage"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_tags_paginated_by_name(self):
+        for name in ["Apple", "Banana", "Cherry"]:
+            Tag.objects.create(user=self.user, name=name)
+
+        res = self.client.get(TAG_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        names = [t["name"] for t in res.data["results"]]
+        self.assertEqual(names, ["Cherry", "Banana"])
+
+        res = self.client.get(res.data["next"])
+        names = [t["name"] for t in res.data["results"]]
+        self.assertEqual(names, ["Apple"])
+        self.assertIsNone(res.data["next"])
+
+    def test_rename_to_existing_tag_rejected(self):
+        Tag.objects.create(user=self.user, name="Dessert")
+        tag = Tag.objects.create(user=self.user, name="Sweet")
+
+        res = self.client.patch(detail_url(tag.id), {"name": "Dessert"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, "Sweet")
@@ -0,0 +1,129 @@
+from decimal import Decimal
+from io import StringIO
+
+from core.models import Ingredient, Recipe, Tag
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from recipe.bulk import bulk_create_recipes
+from rest_framework import status
+from rest_framework.test import APIClient
+
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def create_recipe(user, **params):
+    defaults = {
+        "title": "Sample recipe",
+        "time_minutes": 5,
+        "price": Decimal("5.50"),
+    }
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+class UsageCountTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="usage@example.com", password="usagepass"
+        )
+        self.tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.ingredient = Ingredient.objects.create(
+            user=self.user, name="Rice"
+        )
+
+    def assertUsage(self, obj, count):
+        obj.refresh_from_db()
+        self.assertEqual(obj.usage_count, count)
+
+    def test_add_and_remove(self):
+        r1 = create_recipe(self.user)
+        r2 = create_recipe(self.user)
+        r1.tags.add(self.tag)
+        r2.tags.add(self.tag)
+        r1.ingredients.add(self.ingredient)
+        self.assertUsage(self.tag, 2)
+        self.assertUsage(self.ingredient, 1)
+
+        r1.tags.remove(self.tag)
+
+        self.assertUsage(self.tag, 1)
+
+    def test_clear_and_set(self):
+        other = Tag.objects.create(user=self.user, name="Lunch")
+        recipe = create_recipe(self.user)
+        recipe.tags.add(self.tag, other)
+
+        recipe.tags.set([other])
+        self.assertUsage(self.tag, 0)
+        self.assertUsage(other, 1)
+
+        recipe.tags.clear()
+        self.assertUsage(other, 0)
+
+    def test_reverse_changes(self):
+        recipe = create_recipe(self.user)
+
+        self.tag.recipe_set.add(recipe)
+        self.assertUsage(self.tag, 1)
+
+        self.tag.recipe_set.clear()
+        self.assertUsage(self.tag, 0)
+
+    def test_recipe_delete(self):
+        recipe = create_recipe(self.user)
+        recipe.tags.add(self.tag)
+        recipe.ingredients.add(self.ingredient)
+
+        Recipe.objects.filter(pk=recipe.pk).delete()
+
+        self.assertUsage(self.tag, 0)
+        self.assertUsage(self.ingredient, 0)
+
+    def test_bulk_create(self):
+        bulk_create_recipes(
+            self.user,
+            [
+                {
+                    "title": f"Recipe {i}",
+                    "time_minutes": 5,
+                    "price": Decimal("1.00"),
+                    "tags": [{"name": "Dinner"}],
+                    "ingredients": [{"name": "Salt"}],
+                }
+                for i in range(3)
+            ],
+        )
+
+        self.assertUsage(self.tag, 3)
+        self.assertEqual(
+            Ingredient.objects.get(user=self.user, name="Salt").usage_count, 3
+        )
+
+    def test_reconcile_command(self):
+        recipe = create_recipe(self.user)
+        recipe.tags.add(self.tag)
+        Tag.objects.filter(pk=self.tag.pk).update(usage_count=7)
+        Ingredient.objects.filter(pk=self.ingredient.pk).update(usage_count=2)
+
+        out = StringIO()
+        call_command("reconcile_usage_counts", "--batch-size=1", stdout=out)
+
+        self.assertUsage(self.tag, 1)
+        self.assertUsage(self.ingredient, 0)
+        self.assertIn("tags: 1 corrected", out.getvalue())
+        self.assertIn("ingredients: 1 corrected", out.getvalue())
+
+    def test_reconcile_command_invalidates_cache(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        Tag.objects.filter(pk=self.tag.pk).update(usage_count=7)
+        res = client.get(TAGS_URL)
+        self.assertEqual(res.data["results"][0]["usage_count"], 7)
+
+        call_command("reconcile_usage_counts", stdout=StringIO())
+
+        res = client.get(TAGS_URL, HTTP_IF_NONE_MATCH=res["ETag"])
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["usage_count"], 0)
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from recipe import views
+from recipe import async_views, views
 
 router = DefaultRouter()
 router.register("recipes", views.RecipeViewSet)
@@ -9,4 +9,27 @@ router.register("tags", views.TagViewSet)
 router.register("ingredients", views.IngredientViewSet)
 app_name = "recipe"
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path(
+        "async/recipes/",
+        async_views.recipe_list,
+        name="async-recipe-list",
+    ),
+    path(
+        "async/recipes/<int:pk>/",
+        async_views.recipe_detail,
+        name="async-recipe-detail",
+    ),
+    path("async/tags/", async_views.tag_list, name="async-tag-list"),
+    path(
+        "async/ingredients/",
+        async_views.ingredient_list,
+        name="async-ingredient-list",
+    ),
+    path(
+        "media/<path:path>",
+        views.RecipeMediaView.as_view(),
+        name="recipe-media",
+    ),
+    path("", include(router.urls)),
+]
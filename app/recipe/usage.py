@@ -0,0 +1,84 @@
+"""Keep ``usage_count`` on tags and ingredients in step with recipes.
+
+Counts are recomputed from the many-to-many through tables rather than
+incremented, so running a refresh twice, or concurrently with another
+write, still leaves the right number behind. The signal handlers in
+``recipe.signals`` refresh the rows touched by each change; write paths
+that bypass signals (bulk inserts) call ``refresh_usage_counts``
+themselves, and ``reconcile_usage_counts`` repairs anything that drifts.
+Deleting many recipes would refresh the counts once per recipe, so bulk
+deletes run under ``defer_usage_counts()`` and refresh them once at the
+end.
+"""
+
+import contextlib
+import contextvars
+
+from core.models import Ingredient, Recipe, Tag
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+FIELDS = {Tag: "tags", Ingredient: "ingredients"}
+
+_deferred = contextvars.ContextVar("usage_deferred", default=False)
+
+
+def _links(model):
+    """Return the through model and its recipe and ``model`` columns."""
+    field = getattr(Recipe, FIELDS[model]).field
+    return (
+        field.remote_field.through,
+        field.m2m_column_name(),
+        field.m2m_reverse_name(),
+    )
+
+
+def usage_counts(model):
+    """Return a subquery counting the recipes linked to each ``model`` row."""
+    through, _, column = _links(model)
+    return Coalesce(
+        Subquery(
+            through.objects.filter(**{column: OuterRef("pk")})
+            .values(column)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def refresh_usage_counts(model, ids):
+    """Recompute ``usage_count`` of the ``model`` rows with ``ids``."""
+    ids = set(ids)
+    if not ids:
+        return 0
+    return model.objects.filter(pk__in=ids).update(
+        usage_count=usage_counts(model)
+    )
+
+
+def linked_ids(recipe_ids):
+    """Return ``{model: ids}`` of the tags and ingredients of the recipes."""
+    ids = {}
+    for model in FIELDS:
+        through, source, column = _links(model)
+        ids[model] = set(
+            through.objects.filter(
+                **{f"{source}__in": recipe_ids}
+            ).values_list(column, flat=True)
+        )
+    return ids
+
+
+@contextlib.contextmanager
+def defer_usage_counts():
+    """Leave recipe deletes to the caller, who refreshes the counts."""
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def usage_deferred():
+    return _deferred.get()
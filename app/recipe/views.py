@@ -1,4 +1,11 @@
-from core.models import Ingredient, Recipe, Tag
+from core.db import ReplicaReadMixin
+from core.media import file_response
+from core.models import Ingredient, Recipe, RecipeImageRendition, Tag
+from core.renderers import MessagePackParser, MessagePackRenderer, msgpack
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
+from django.http import Http404, StreamingHttpResponse
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import (
     OpenApiParameter,
@@ -6,11 +13,25 @@ from drf_spectacular.utils import (
     extend_schema_view,
 )
 from rest_framework import status, viewsets
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
+from recipe import export, fieldsets, images, importers
+from recipe.bulk import delete_recipes
+from recipe.cache import CachedResponseMixin
+from recipe.fastpath import FastReadMixin
+from recipe.filters import MATCH_MODES, filter_by_related
+from recipe.pagination import (
+    RecipeAttrCursorPagination,
+    RecipeCursorPagination,
+)
+from recipe.search import search_recipes
 from recipe.serializers import (
     IngredientSerializer,
     RecipeDetailSerializer,
@@ -18,9 +39,56 @@ from recipe.serializers import (
     RecipeSerializer,
     TagSerializer,
 )
+from user.authentication import (
+    AccessTokenAuthentication,
+    CachingTokenAuthentication,
+)
 
 # Create your views here.
 
+# The recipe endpoints also speak MessagePack, chosen by Accept and
+# Content-Type, when the msgpack package is installed.
+RENDERER_CLASSES = list(api_settings.DEFAULT_RENDERER_CLASSES)
+PARSER_CLASSES = list(api_settings.DEFAULT_PARSER_CLASSES)
+if msgpack is not None:
+    RENDERER_CLASSES.append(MessagePackRenderer)
+    PARSER_CLASSES.append(MessagePackParser)
+
+
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Pick the first renderer whatever the client accepts.
+
+    Media responses and exports are streamed as they are, not rendered;
+    only error bodies go through a renderer, and an ``Accept: image/*``
+    header must not turn them into 406s. Serializers see the JSON renderer
+    too, so exported prices stay strings even if MessagePack was asked for.
+    """
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return (renderers[0], renderers[0].media_type)
+
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        OpenApiTypes.STR,
+        description=(
+            "Comma separated list of fields to return, e.g. id,title"
+        ),
+    ),
+    OpenApiParameter(
+        "expand",
+        OpenApiTypes.STR,
+        description=(
+            "Comma separated list of nested relations (tags, ingredients, "
+            "renditions) to return"
+        ),
+    ),
+]
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -35,37 +103,165 @@ from recipe.serializers import (
                 OpenApiTypes.STR,
                 description="Comma separated list of ingredient IDs to filter",
             ),
+            OpenApiParameter(
+                "match",
+                OpenApiTypes.STR,
+                enum=["any", "all"],
+                description=(
+                    "Return recipes with any (default) or all of the given "
+                    "tags and ingredients"
+                ),
+            ),
+            OpenApiParameter(
+                "search",
+                OpenApiTypes.STR,
+                description=(
+                    "Full-text search over title and description; results "
+                    "are ordered by relevance"
+                ),
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
         ]
-    )
+    ),
+    retrieve=extend_schema(parameters=SPARSE_FIELDS_PARAMETERS),
+    export=extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "export_format",
+                OpenApiTypes.STR,
+                enum=["json", "ndjson"],
+                description="Stream a JSON array (default) or NDJSON",
+            ),
+            OpenApiParameter(
+                "tags",
+                OpenApiTypes.STR,
+                description="Comma separated list of tag IDs to filter",
+            ),
+            OpenApiParameter(
+                "ingredients",
+                OpenApiTypes.STR,
+                description="Comma separated list of ingredient IDs to filter",
+            ),
+            OpenApiParameter(
+                "match",
+                OpenApiTypes.STR,
+                enum=["any", "all"],
+                description=(
+                    "Return recipes with any (default) or all of the given "
+                    "tags and ingredients"
+                ),
+            ),
+            OpenApiParameter(
+                "search",
+                OpenApiTypes.STR,
+                description=(
+                    "Full-text search over title and description; results "
+                    "are ordered by relevance"
+                ),
+            ),
+            *SPARSE_FIELDS_PARAMETERS,
+        ],
+        responses={200: RecipeDetailSerializer(many=True)},
+    ),
+    import_recipes=extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {
+                    "file": {"type": "string", "format": "binary"},
+                    "format": {"type": "string", "enum": ["ndjson", "csv"]},
+                    "offset": {"type": "integer"},
+                },
+                "required": ["file"],
+            }
+        },
+        responses=OpenApiTypes.OBJECT,
+    ),
+    bulk=extend_schema(
+        description=(
+            "POST a list of recipes (or {items, mode}) to create them in "
+            "bulk; DELETE {ids} to delete several recipes."
+        ),
+        request=RecipeSerializer(many=True),
+        responses=OpenApiTypes.OBJECT,
+    ),
 )
-class RecipeViewSet(viewsets.ModelViewSet):
-
+class RecipeViewSet(
+    ReplicaReadMixin,
+    CachedResponseMixin,
+    FastReadMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = RecipeDetailSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [
+        AccessTokenAuthentication,
+        CachingTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
 
     def _params_to_ints(self, qs):
-        return [int(str) for str in qs.split(",")]
+        try:
+            return [int(str) for str in qs.split(",") if str]
+        except ValueError:
+            raise ValidationError("Expected a comma separated list of IDs.")
 
     def get_queryset(self):
         tags = self.request.query_params.get("tags")
         ingredients = self.request.query_params.get("ingredients")
+        match = self.request.query_params.get("match", "any")
+        terms = self.request.query_params.get("search", "").strip()
+        fields = self.get_sparse_fields()
         queryset = self.queryset
+        if fields is not None:
+            queryset = fieldsets.project(queryset, fields)
+        if self.action not in ("upload_image", "export"):
+            relations = ("tags", "ingredients")
+            if self.action == "retrieve":
+                relations += ("renditions",)
+            queryset = queryset.prefetch_related(
+                *fieldsets.prefetches(fields, relations)
+            )
+
+        if match not in MATCH_MODES:
+            raise ValidationError({"match": "Expected 'any' or 'all'."})
+
         if tags:
             tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
+            queryset = filter_by_related(queryset, "tags", tag_ids, match)
 
         if ingredients:
             ingredient_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredient_ids)
+            queryset = filter_by_related(
+                queryset, "ingredients", ingredient_ids, match
+            )
 
-        return (
-            queryset.filter(user=self.request.user).order_by("-id").distinct()
-        )
+        queryset = queryset.filter(user=self.request.user).order_by("-id")
+        # Searching narrows collections; it must not hide a single recipe.
+        if terms and self.action in ("list", "export"):
+            queryset = search_recipes(queryset, self.request.user, terms)
+        return queryset
+
+    def get_sparse_fields(self):
+        """Return the fields asked for with fields=/expand=, if any."""
+        if self.action == "export":
+            available = RecipeDetailSerializer.Meta.fields
+        elif self.action in ("list", "retrieve"):
+            available = self.get_serializer_class().Meta.fields
+        else:
+            return None
+        return fieldsets.requested_fields(self.request.query_params, available)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
 
     def get_serializer_class(self):
-        if self.action == "list":
+        if self.action in ("list", "bulk"):
             return RecipeSerializer
         elif self.action == "upload_image":
             return RecipeImageSerializer
@@ -75,6 +271,164 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def _bulk_create(self, items, atomic):
+        serializer = self.get_serializer(data=items, many=True)
+        if serializer.is_valid():
+            valid = list(range(len(items)))
+            errors = {}
+        elif atomic:
+            results = [
+                {"index": i, "status": 400, "errors": err}
+                for i, err in enumerate(serializer.errors)
+                if err
+            ]
+            return Response(
+                {"results": results}, status=status.HTTP_400_BAD_REQUEST
+            )
+        else:
+            errors = dict(enumerate(serializer.errors))
+            valid = [i for i in range(len(items)) if not errors[i]]
+            serializer = self.get_serializer(
+                data=[items[i] for i in valid], many=True
+            )
+            serializer.is_valid(raise_exception=True)
+
+        recipes = serializer.save(user=self.request.user)
+        prefetch_related_objects(recipes, "tags", "ingredients")
+
+        created = dict(zip(valid, serializer.data))
+        results = []
+        for i in range(len(items)):
+            if i in created:
+                results.append({"index": i, "status": 201, "data": created[i]})
+            else:
+                results.append(
+                    {"index": i, "status": 400, "errors": errors[i]}
+                )
+
+        return Response(
+            {"results": results},
+            status=(
+                status.HTTP_207_MULTI_STATUS
+                if errors
+                else status.HTTP_201_CREATED
+            ),
+        )
+
+    def _bulk_delete(self, ids):
+        deleted = delete_recipes(
+            Recipe.objects.filter(user=self.request.user, id__in=ids)
+        )
+        results = [
+            {"id": i, "status": 204 if i in deleted else 404} for i in ids
+        ]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+    @action(methods=["POST", "DELETE"], detail=False, url_path="bulk")
+    def bulk(self, request):
+        """Create or delete many recipes in a single request."""
+        data = request.data
+        max_items = settings.RECIPE_BULK_MAX_ITEMS
+
+        if request.method == "DELETE":
+            ids = data.get("ids") if isinstance(data, dict) else data
+            if not isinstance(ids, list) or any(
+                isinstance(i, bool) or not isinstance(i, (int, str))
+                for i in ids
+            ):
+                raise ValidationError(
+                    {"ids": "Expected a list of recipe IDs."}
+                )
+            try:
+                ids = [int(i) for i in ids]
+            except ValueError:
+                raise ValidationError(
+                    {"ids": "Expected a list of recipe IDs."}
+                )
+            if len(ids) > max_items:
+                raise ValidationError(
+                    {"ids": f"At most {max_items} recipes per request."}
+                )
+            return self._bulk_delete(ids)
+
+        if isinstance(data, list):
+            data = {"items": data}
+        if not isinstance(data, dict):
+            raise ValidationError({"items": "Expected a list of recipes."})
+        items = data.get("items")
+        mode = data.get("mode", "atomic")
+        if not isinstance(items, list):
+            raise ValidationError({"items": "Expected a list of recipes."})
+        if len(items) > max_items:
+            raise ValidationError(
+                {"items": f"At most {max_items} recipes per request."}
+            )
+        if mode not in ("atomic", "partial"):
+            raise ValidationError({"mode": "Expected 'atomic' or 'partial'."})
+
+        return self._bulk_create(items, atomic=mode == "atomic")
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        url_path="export",
+        content_negotiation_class=IgnoreClientContentNegotiation,
+    )
+    def export(self, request):
+        """Stream every matching recipe as a JSON array or NDJSON."""
+        export_format = request.query_params.get("export_format", "json")
+        if export_format not in export.STREAMERS:
+            raise ValidationError(
+                {"export_format": "Expected 'json' or 'ndjson'."}
+            )
+
+        context = self.get_serializer_context()
+        rows = export.iter_rows(
+            self.get_queryset(),
+            RecipeDetailSerializer,
+            context,
+            settings.RECIPE_EXPORT_CHUNK_SIZE,
+            fieldsets.prefetches(context["fields"]),
+        )
+        response = StreamingHttpResponse(
+            export.STREAMERS[export_format](rows),
+            content_type=export.CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes.{export_format}"'
+        )
+        return response
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_recipes(self, request):
+        """Import recipes from an uploaded NDJSON or CSV file."""
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "No file was uploaded."})
+        try:
+            fmt = request.data.get("format") or importers.guess_format(
+                upload.name
+            )
+            offset = int(request.data.get("offset", 0))
+        except importers.ImportFormatError as exc:
+            raise ValidationError({"format": str(exc)})
+        except ValueError:
+            raise ValidationError({"offset": "Expected an integer."})
+        if fmt not in importers.READERS:
+            raise ValidationError({"format": "Expected 'ndjson' or 'csv'."})
+
+        importer = importers.RecipeImporter(
+            request.user, batch_size=settings.RECIPE_IMPORT_BATCH_SIZE
+        )
+        result = importer.run(importers.READERS[fmt](upload), offset)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
     @action(methods=["POST"], detail=True, url_path="upload-image")
     def upload_image(self, request, pk=None):
 
@@ -82,7 +436,8 @@ class RecipeViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(recipe, data=request.data)
 
         if serializer.is_valid():
-            serializer.save()
+            recipe = serializer.save(image_status=Recipe.IMAGE_PENDING)
+            images.enqueue_renditions(recipe)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -96,27 +451,56 @@ class RecipeViewSet(viewsets.ModelViewSet):
                 OpenApiTypes.INT,
                 enum=[0, 1],
                 description="Integer value 0 or 1",
-            )
+            ),
+            OpenApiParameter(
+                "ordering",
+                OpenApiTypes.STR,
+                enum=["-name", "-usage"],
+                description="Sort by name (default) or by recipe count",
+            ),
         ]
     )
 )
-class BaseRecipeAttrViewSet(viewsets.ModelViewSet):
-    authentication_classes = [TokenAuthentication]
+class BaseRecipeAttrViewSet(
+    ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet
+):
+    authentication_classes = [
+        AccessTokenAuthentication,
+        CachingTokenAuthentication,
+    ]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
+    renderer_classes = RENDERER_CLASSES
+    parser_classes = PARSER_CLASSES
+
+    orderings = {
+        "-name": ("-name", "id"),
+        "-usage": ("-usage_count", "id"),
+    }
 
     def get_queryset(self):
         assigned_only = bool(
             int(self.request.query_params.get("assigned_only", 0))
         )
+        ordering = self.request.query_params.get("ordering", "-name")
+        if ordering not in self.orderings:
+            raise ValidationError(
+                {"ordering": "Expected '-name' or '-usage'."}
+            )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return (
-            queryset.filter(user=self.request.user)
-            .order_by("-name")
-            .distinct()
+            queryset = queryset.filter(usage_count__gt=0)
+        return queryset.filter(user=self.request.user).order_by(
+            *self.orderings[ordering]
         )
 
+    def perform_update(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise ValidationError({"name": "This name is already in use."})
+
 
 class TagViewSet(BaseRecipeAttrViewSet):
     serializer_class = TagSerializer
@@ -126,3 +510,32 @@ class TagViewSet(BaseRecipeAttrViewSet):
 class IngredientViewSet(BaseRecipeAttrViewSet):
     serializer_class = IngredientSerializer
     queryset = Ingredient.objects.all()
+
+
+@extend_schema(responses={(200, "*/*"): OpenApiTypes.BINARY})
+class RecipeMediaView(ReplicaReadMixin, APIView):
+    """Serve a recipe image or rendition to the owner of the recipe."""
+
+    authentication_classes = [
+        AccessTokenAuthentication,
+        CachingTokenAuthentication,
+    ]
+    permission_classes = [IsAuthenticated]
+    content_negotiation_class = IgnoreClientContentNegotiation
+
+    def get(self, request, path):
+        # Content-addressed files may be shared between users, so access
+        # goes by the recipes pointing at the file, not by the file.
+        owned = (
+            Recipe.objects.filter(user=request.user, image=path)
+            # Uploads still carry their metadata until they are processed.
+            .exclude(
+                image_status__in=[Recipe.IMAGE_PENDING, Recipe.IMAGE_FAILED]
+            ).exists()
+            or RecipeImageRendition.objects.filter(
+                file=path, recipe__user=request.user
+            ).exists()
+        )
+        if not owned:
+            raise Http404("No such file.")
+        return file_response(request, path)
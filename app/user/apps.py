@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class UserConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "user"
+
+    def ready(self):
+        from user import schema, signals  # noqa: F401
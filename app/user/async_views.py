@@ -0,0 +1,139 @@
+"""Async login and sign-up views that await the hashing pool."""
+
+import json
+
+from asgiref.sync import sync_to_async
+from core import hashing
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+
+from user.limiter import client_ip, email_limiter, ip_limiter
+from user.serializers import UserSerializer
+
+
+def _busy():
+    response = JsonResponse(
+        {"detail": "Service temporarily unavailable."}, status=503
+    )
+    response["Retry-After"] = "1"
+    return response
+
+
+def _get_active_user(email):
+    model = get_user_model()
+    try:
+        user = model._default_manager.get_by_natural_key(email)
+    except model.DoesNotExist:
+        return None
+    return user if user.is_active else None
+
+
+def _rehash(user, password):
+    user.set_password(password)
+    user.save(update_fields=["password"])
+
+
+async def create_token(request):
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+
+    try:
+        data = json.loads(request.body or b"{}")
+        email = data["email"]
+        password = data["password"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse(
+            {"detail": "email and password are required."}, status=400
+        )
+    if not isinstance(email, str) or not isinstance(password, str):
+        return JsonResponse(
+            {"detail": "email and password are required."}, status=400
+        )
+
+    email_key = email.lower()
+    ip_key = client_ip(request)
+    wait = max(
+        email_limiter.retry_after(email_key), ip_limiter.retry_after(ip_key)
+    )
+    if wait:
+        response = JsonResponse({"detail": "Too many attempts."}, status=429)
+        response["Retry-After"] = str(int(wait) + 1)
+        return response
+
+    try:
+        user = await sync_to_async(_get_active_user)(email)
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords.
+            await hashing.arun(make_password, password)
+            is_correct = must_update = False
+        else:
+            is_correct, must_update = await hashing.acheck_password(
+                password, user.password
+            )
+    except hashing.HashingPoolBusy:
+        return _busy()
+
+    if not is_correct:
+        email_limiter.failure(email_key)
+        ip_limiter.failure(ip_key)
+        return JsonResponse({"detail": "Incorrect credentials"}, status=400)
+
+    email_limiter.reset(email_key)
+    if must_update:
+        await sync_to_async(_rehash)(user, password)
+    token, _ = await sync_to_async(Token.objects.get_or_create)(user=user)
+    return JsonResponse({"token": token.key})
+
+
+def _validate(data):
+    serializer = UserSerializer(data=data)
+    serializer.is_valid()
+    return serializer
+
+
+def _save_user(serializer, encoded):
+    # Like UserManager.create_user, with the password already hashed.
+    data = dict(serializer.validated_data)
+    del data["password"]
+    model = get_user_model()
+    user = model(
+        email=model.objects.normalize_email(data.pop("email")), **data
+    )
+    user.password = encoded
+    user.save()
+    serializer.instance = user
+    return serializer.data
+
+
+async def create_user(request):
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed."}, status=405)
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"detail": "Invalid JSON."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "Expected an object."}, status=400)
+
+    serializer = await sync_to_async(_validate)(data)
+    if serializer.errors:
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        encoded = await hashing.arun(
+            make_password, serializer.validated_data["password"]
+        )
+    except hashing.HashingPoolBusy:
+        return _busy()
+
+    user_data = await sync_to_async(_save_user)(serializer, encoded)
+    return JsonResponse(user_data, status=201)
+
+
+# Django's csrf_exempt wraps views in a sync function, so mark them
+# directly.
+create_token.csrf_exempt = True
+create_user.csrf_exempt = True
@@ -0,0 +1,139 @@
+import copy
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+from user.cache import TTLCache
+from user.tokens import InvalidToken, verify_access_token
+
+_token_cache = None
+_user_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        options = settings.TOKEN_AUTH_CACHE
+        _token_cache = TTLCache(options["MAX_SIZE"], options["TTL"])
+    return _token_cache
+
+
+def get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        options = settings.TOKEN_AUTH_CACHE
+        _user_cache = TTLCache(options["MAX_SIZE"], options["TTL"])
+    return _user_cache
+
+
+def _shared_cache():
+    alias = settings.TOKEN_AUTH_CACHE.get("CACHE_ALIAS")
+    return caches[alias] if alias else None
+
+
+def _shared_key(key):
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def forget_tokens(*keys):
+    """Evict token keys from the local and shared authentication caches."""
+    cache = get_token_cache()
+    shared = _shared_cache()
+    for key in keys:
+        cache.pop(key)
+    if shared is not None and keys:
+        shared.delete_many([_shared_key(key) for key in keys])
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` that remembers token -> user lookups.
+
+    Entries live in a bounded in-process LRU with a short TTL, optionally
+    backed by a shared Django cache. Deleting a token or saving its user
+    evicts the entry (see ``user.signals``); other processes drop their
+    local copy once the TTL runs out.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        entry = cache.get(key)
+        if entry is None:
+            shared = _shared_cache()
+            if shared is not None:
+                entry = shared.get(_shared_key(key))
+            if entry is None:
+                entry = self._load(key)
+                if shared is not None:
+                    shared.set(
+                        _shared_key(key),
+                        entry,
+                        settings.TOKEN_AUTH_CACHE["TTL"],
+                    )
+            cache.set(key, entry)
+
+        user, token = entry
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+
+        # Hand out copies so request code can't mutate the cached objects.
+        return (copy.copy(user), copy.copy(token))
+
+    def _load(self, key):
+        model = self.get_model()
+        try:
+            token = model.objects.select_related("user").get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        return (token.user, token)
+
+
+class AccessTokenAuthentication(BaseAuthentication):
+    """Authenticate ``Authorization: Bearer <access token>`` headers.
+
+    The token is verified from its signature alone; the user it names is
+    served from the same in-process cache as token lookups.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+
+        try:
+            claims = verify_access_token(auth[1].decode())
+        except (InvalidToken, UnicodeError):
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+
+        user = self._get_user(claims["uid"])
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _("User inactive or deleted.")
+            )
+        return (copy.copy(user), claims)
+
+    def _get_user(self, user_id):
+        cache = get_user_cache()
+        user = cache.get(user_id)
+        if user is None:
+            user = get_user_model().objects.filter(pk=user_id).first()
+            if user is not None:
+                cache.set(user_id, user)
+        return user
+
+    def authenticate_header(self, request):
+        return self.keyword
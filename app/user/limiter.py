@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+
+class AttemptLimiter:
+    """Count recent failures per key in a sliding window.
+
+    Once a key reaches ``max_failures`` within ``window`` seconds it stays
+    blocked until its oldest failure leaves the window. At most
+    ``max_keys`` keys are tracked; the least recently failed are dropped
+    first, which keeps memory bounded under address spraying.
+    """
+
+    def __init__(self, max_failures, window, max_keys=100000, timer=None):
+        self.max_failures = max_failures
+        self.window = window
+        self.max_keys = max_keys
+        self.timer = timer or time.monotonic
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        attempts = self._failures.get(key)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self._failures[key]
+            return None
+        return attempts
+
+    def retry_after(self, key):
+        """Seconds until ``key`` may try again, or 0 if it isn't blocked."""
+        with self._lock:
+            now = self.timer()
+            attempts = self._recent(key, now)
+            if attempts is None or len(attempts) < self.max_failures:
+                return 0
+            return attempts[-self.max_failures] + self.window - now
+
+    def failure(self, key):
+        with self._lock:
+            now = self.timer()
+            attempts = self._recent(key, now)
+            if attempts is None:
+                attempts = self._failures[key] = deque(
+                    maxlen=self.max_failures
+                )
+            attempts.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._failures.clear()
+
+
+email_limiter = AttemptLimiter(*settings.LOGIN_ATTEMPT_LIMITS["EMAIL"])
+ip_limiter = AttemptLimiter(*settings.LOGIN_ATTEMPT_LIMITS["IP"])
+
+
+def client_ip(request):
+    """Return the address of the client that sent ``request``.
+
+    Behind reverse proxies, ``CLIENT_IP["HEADER"]`` names the header they
+    record addresses in. The client is the entry ``CLIENT_IP["PROXIES"]``
+    places from the right, the last one a trusted proxy added; entries
+    left of it are whatever the client sent.
+    """
+    if request is None:
+        return ""
+    options = settings.CLIENT_IP
+    if options["HEADER"]:
+        addresses = [
+            address.strip()
+            for address in request.META.get(options["HEADER"], "").split(",")
+            if address.strip()
+        ]
+        if addresses:
+            return addresses[-min(options["PROXIES"], len(addresses))]
+    return request.META.get("REMOTE_ADDR", "")
@@ -0,0 +1,52 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core import hashing
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password checks per second, inline on request threads "
+        "versus on the bounded hashing pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=200)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=32,
+            help="Concurrent request threads to simulate.",
+        )
+
+    def handle(self, *args, **options):
+        logins = options["logins"]
+        threads = options["threads"]
+        cores = os.cpu_count() or 1
+        encoded = make_password("benchmark-password")
+
+        def inline(_):
+            return check_password("benchmark-password", encoded)
+
+        def pooled(_):
+            try:
+                return hashing.check_password("benchmark-password", encoded)[0]
+            except hashing.HashingPoolBusy:
+                return None
+
+        for label, fn in (("inline", inline), ("pool", pooled)):
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                start = time.perf_counter()
+                results = list(executor.map(fn, range(logins)))
+                elapsed = time.perf_counter() - start
+            done = sum(1 for result in results if result)
+            rate = done / elapsed
+            self.stdout.write(
+                f"{label:>6}: {rate:8.1f} logins/s, "
+                f"{rate / cores:7.1f} logins/s/core, "
+                f"{logins - done} refused "
+                f"({threads} threads, {cores} cores)"
+            )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from user.tokens import purge_refresh_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete refresh tokens that have expired or been revoked."
+
+    def handle(self, *args, **options):
+        deleted = purge_refresh_tokens()
+        self.stdout.write(f"{deleted} refresh tokens deleted")
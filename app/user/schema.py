@@ -0,0 +1,14 @@
+"""drf-spectacular description of the custom authentication classes."""
+
+from drf_spectacular.extensions import OpenApiAuthenticationExtension
+from drf_spectacular.plumbing import build_bearer_security_scheme_object
+
+
+class AccessTokenScheme(OpenApiAuthenticationExtension):
+    target_class = "user.authentication.AccessTokenAuthentication"
+    name = "accessTokenAuth"
+
+    def get_security_definition(self, auto_schema):
+        return build_bearer_security_scheme_object(
+            header_name="Authorization", token_prefix="Bearer"
+        )
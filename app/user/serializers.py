@@ -1,5 +1,15 @@
+from core.hashing import HashingPoolBusy
 from django.contrib.auth import authenticate, get_user_model
-from rest_framework import serializers
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, serializers
+
+from user.limiter import client_ip, email_limiter, ip_limiter
+
+
+class ServiceUnavailable(exceptions.APIException):
+    status_code = 503
+    default_detail = _("Service temporarily unavailable, try again later.")
+    default_code = "service_unavailable"
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -9,14 +19,20 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {"password": {"write_only": True, "min_length": 5}}
 
     def create(self, validated_data):
-        return get_user_model().objects.create_user(**validated_data)
+        try:
+            return get_user_model().objects.create_user(**validated_data)
+        except HashingPoolBusy:
+            raise ServiceUnavailable()
 
     def update(self, instance, validated_data):
         password = validated_data.pop("password", None)
         user = super().update(instance, validated_data)
 
         if password:
-            user.set_password(password)
+            try:
+                user.set_password(password)
+            except HashingPoolBusy:
+                raise ServiceUnavailable()
             user.save()
         return user
 
@@ -30,13 +46,39 @@ class AuthTokenSerializer(serializers.Serializer):
     def validate(self, attrs):
         email = attrs["email"]
         password = attrs["password"]
-        user = authenticate(
-            self.context.get("request"), email=email, password=password
+        request = self.context.get("request")
+        email_key = email.lower()
+        ip_key = client_ip(request)
+
+        # Refuse throttled callers before spending any time on hashing.
+        wait = max(
+            email_limiter.retry_after(email_key),
+            ip_limiter.retry_after(ip_key),
         )
+        if wait:
+            raise exceptions.Throttled(wait=wait)
+
+        try:
+            user = authenticate(request, email=email, password=password)
+        except HashingPoolBusy:
+            raise ServiceUnavailable()
         if not user:
+            email_limiter.failure(email_key)
+            ip_limiter.failure(ip_key)
             raise serializers.ValidationError(
                 "Incorrect credentials", code="authorization"
             )
 
+        email_limiter.reset(email_key)
         attrs["user"] = user
         return attrs
+
+
+class TokenPairSerializer(serializers.Serializer):
+    access = serializers.CharField(read_only=True)
+    refresh = serializers.CharField(read_only=True)
+    expires_in = serializers.IntegerField(read_only=True)
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    refresh = serializers.CharField(trim_whitespace=False)
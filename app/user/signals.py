@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import forget_tokens, get_user_cache
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    forget_tokens(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_changed_user_tokens(sender, instance, created, **kwargs):
+    get_user_cache().pop(instance.pk)
+    if not created:
+        keys = Token.objects.filter(user=instance).values_list(
+            "key", flat=True
+        )
+        forget_tokens(*keys)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def forget_deleted_user(sender, instance, **kwargs):
+    get_user_cache().pop(instance.pk)
@@ -0,0 +1,239 @@
+import threading
+import time
+from unittest.mock import patch
+
+from core.hashing import HashingPoolBusy
+from django.contrib.auth import get_user_model
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.limiter import (
+    AttemptLimiter,
+    client_ip,
+    email_limiter,
+    ip_limiter,
+)
+
+TOKEN_URL = reverse("user:token")
+ASYNC_TOKEN_URL = reverse("user:token-async")
+ASYNC_CREATE_USER_URL = reverse("user:create-async")
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class AttemptLimiterTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0
+        self.limiter = AttemptLimiter(3, 60, timer=lambda: self.now)
+
+    def test_blocks_after_max_failures(self):
+        for _ in range(3):
+            self.assertEqual(self.limiter.retry_after("k"), 0)
+            self.limiter.failure("k")
+
+        self.assertEqual(self.limiter.retry_after("k"), 60)
+        self.now = 60
+        self.assertEqual(self.limiter.retry_after("k"), 0)
+
+    def test_reset(self):
+        for _ in range(3):
+            self.limiter.failure("k")
+        self.limiter.reset("k")
+
+        self.assertEqual(self.limiter.retry_after("k"), 0)
+
+    def test_key_count_bounded(self):
+        limiter = AttemptLimiter(1, 60, max_keys=2, timer=lambda: self.now)
+        for key in ("a", "b", "c"):
+            limiter.failure(key)
+
+        self.assertEqual(limiter.retry_after("a"), 0)
+        self.assertEqual(limiter.retry_after("c"), 60)
+
+
+class ClientIpTests(SimpleTestCase):
+    def request(self, forwarded=None):
+        headers = {"REMOTE_ADDR": "10.0.0.1"}
+        if forwarded is not None:
+            headers["HTTP_X_FORWARDED_FOR"] = forwarded
+        return RequestFactory().get("/", **headers)
+
+    def test_remote_addr_by_default(self):
+        request = self.request("203.0.113.9")
+
+        self.assertEqual(client_ip(request), "10.0.0.1")
+        self.assertEqual(client_ip(None), "")
+
+    def test_forwarded_header(self):
+        header = "HTTP_X_FORWARDED_FOR"
+        cases = [
+            (1, "198.51.100.7, 203.0.113.9", "203.0.113.9"),
+            (2, "198.51.100.7, 203.0.113.9, 10.0.0.2", "203.0.113.9"),
+            (2, "203.0.113.9", "203.0.113.9"),
+            (1, None, "10.0.0.1"),
+        ]
+        for proxies, forwarded, expected in cases:
+            with self.subTest(proxies=proxies, forwarded=forwarded):
+                with override_settings(
+                    CLIENT_IP={"HEADER": header, "PROXIES": proxies}
+                ):
+                    self.assertEqual(
+                        client_ip(self.request(forwarded)), expected
+                    )
+
+
+class LoginLimitTests(TestCase):
+    def setUp(self):
+        email_limiter.clear()
+        ip_limiter.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email="limited@example.com", password="limitedpass"
+        )
+
+    def test_throttled_before_hashing(self):
+        payload = {"email": "limited@example.com", "password": "wrong"}
+        for _ in range(5):
+            res = self.client.post(TOKEN_URL, payload)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with patch("user.serializers.authenticate") as mock_authenticate:
+            payload["password"] = "limitedpass"
+            res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        mock_authenticate.assert_not_called()
+
+    def test_success_resets_email_failures(self):
+        wrong = {"email": "limited@example.com", "password": "wrong"}
+        right = {"email": "limited@example.com", "password": "limitedpass"}
+        for _ in range(4):
+            self.client.post(TOKEN_URL, wrong)
+        self.client.post(TOKEN_URL, right)
+        for _ in range(4):
+            self.client.post(TOKEN_URL, wrong)
+
+        res = self.client.post(TOKEN_URL, right)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @patch("core.hashing.submit", side_effect=HashingPoolBusy)
+    def test_saturated_pool_returns_503(self, mock_submit):
+        payload = {"email": "limited@example.com", "password": "limitedpass"}
+
+        res = self.client.post(TOKEN_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class AsyncLoginTests(TestCase):
+    def setUp(self):
+        email_limiter.clear()
+        ip_limiter.clear()
+        self.client = APIClient()
+        self.user = create_user(
+            email="async@example.com", password="asyncpass"
+        )
+
+    def test_async_login(self):
+        payload = {"email": "async@example.com", "password": "asyncpass"}
+
+        res = self.client.post(ASYNC_TOKEN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        token = Token.objects.get(user=self.user)
+        self.assertEqual(res.json()["token"], token.key)
+
+    def test_async_login_wrong_password(self):
+        payload = {"email": "async@example.com", "password": "wrong"}
+
+        res = self.client.post(ASYNC_TOKEN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Token.objects.exists())
+
+    def test_async_login_unknown_user(self):
+        payload = {"email": "nobody@example.com", "password": "asyncpass"}
+
+        res = self.client.post(ASYNC_TOKEN_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(
+        PASSWORD_HASHING={"WORKERS": 1, "QUEUE_PER_WORKER": 1, "WAIT": 5}
+    )
+    def test_async_login_fails_fast_when_saturated(self):
+        payload = {"email": "async@example.com", "password": "asyncpass"}
+        full = threading.Semaphore(0)
+
+        with patch("core.hashing._get_pool", return_value=(None, full)):
+            start = time.monotonic()
+            res = self.client.post(ASYNC_TOKEN_URL, payload, format="json")
+
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res["Retry-After"], "1")
+
+
+class AsyncCreateUserTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_async_create_user(self):
+        payload = {
+            "email": "New@Example.com",
+            "password": "newuserpass",
+            "name": "New",
+        }
+
+        res = self.client.post(ASYNC_CREATE_USER_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.json(), {"email": "New@example.com", "name": "New"}
+        )
+        user = get_user_model().objects.get(email="New@example.com")
+        self.assertTrue(user.check_password("newuserpass"))
+
+    def test_async_create_user_invalid(self):
+        create_user(email="taken@example.com", password="takenpass")
+        for payload in [
+            {"email": "taken@example.com", "password": "pass1", "name": "T"},
+            {"email": "short@example.com", "password": "pw", "name": "S"},
+            ["not", "an", "object"],
+        ]:
+            with self.subTest(payload=payload):
+                res = self.client.post(
+                    ASYNC_CREATE_USER_URL, payload, format="json"
+                )
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_async_create_user_fails_fast_when_saturated(self):
+        payload = {
+            "email": "busy@example.com",
+            "password": "busypass",
+            "name": "Busy",
+        }
+
+        with patch(
+            "core.hashing._get_pool",
+            return_value=(None, threading.Semaphore(0)),
+        ):
+            res = self.client.post(
+                ASYNC_CREATE_USER_URL, payload, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(get_user_model().objects.exists())
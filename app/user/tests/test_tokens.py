@@ -0,0 +1,208 @@
+import time
+from datetime import timedelta
+from io import StringIO
+
+from core.models import RefreshToken
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user import tokens
+from user.authentication import get_user_cache
+
+ACCESS_URL = reverse("user:token-access")
+REFRESH_URL = reverse("user:token-refresh")
+REVOKE_URL = reverse("user:token-revoke")
+ME_URL = reverse("user:me")
+
+
+def create_user(**params):
+    return get_user_model().objects.create_user(**params)
+
+
+class AccessTokenTests(TestCase):
+    def setUp(self):
+        caches[settings.ACCESS_TOKEN_REVOCATION_CACHE_ALIAS].clear()
+        self.user = create_user(
+            email="signed@example.com", password="signedpass"
+        )
+
+    def test_round_trip(self):
+        token, lifetime = tokens.issue_access_token(self.user)
+
+        claims = tokens.verify_access_token(token)
+
+        self.assertEqual(claims["uid"], self.user.pk)
+        self.assertGreater(claims["exp"], time.time())
+
+    def test_tampered_token_rejected(self):
+        token, _ = tokens.issue_access_token(self.user)
+        kid, payload, signature = token.split(".")
+        forged = tokens._b64encode(b'{"uid":1,"exp":9999999999,"jti":"x"}')
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify_access_token(f"{kid}.{forged}.{signature}")
+
+    def test_non_ascii_token_rejected(self):
+        for token in ["default.e30.é", "default.é.abc", "dé.e30.abc"]:
+            with self.subTest(token=token):
+                with self.assertRaises(tokens.InvalidToken):
+                    tokens.verify_access_token(token)
+
+    def test_expired_token_rejected(self):
+        token, lifetime = tokens.issue_access_token(self.user, now=1000)
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify_access_token(token, now=1000 + lifetime)
+
+    def test_key_rotation(self):
+        keys = {"k1": "first-secret", "k2": "second-secret"}
+        with override_settings(
+            ACCESS_TOKEN_SIGNING_KEYS=keys, ACCESS_TOKEN_ACTIVE_KEY="k1"
+        ):
+            old, _ = tokens.issue_access_token(self.user)
+        with override_settings(
+            ACCESS_TOKEN_SIGNING_KEYS=keys, ACCESS_TOKEN_ACTIVE_KEY="k2"
+        ):
+            self.assertEqual(tokens.verify_access_token(old)["uid"], 1)
+        with override_settings(ACCESS_TOKEN_SIGNING_KEYS={"k2": "x"}):
+            with self.assertRaises(tokens.InvalidToken):
+                tokens.verify_access_token(old)
+
+    def test_revocation_list_drops_expired_entries(self):
+        now = [100]
+        revoked = tokens.RevocationList(timer=lambda: now[0])
+        revoked.add("a", 150)
+        revoked.add("b", 300)
+        self.assertIn("a", revoked)
+
+        now[0] = 200
+        revoked.add("c", 250)
+
+        self.assertNotIn("a", revoked)
+        self.assertEqual(len(revoked), 2)
+
+    def test_revocation_shared_between_processes(self):
+        token, _ = tokens.issue_access_token(self.user)
+        claims = tokens.verify_access_token(token)
+
+        other = tokens.RevocationList()
+        other.add(claims["jti"], claims["exp"])
+
+        with self.assertRaises(tokens.InvalidToken):
+            tokens.verify_access_token(token)
+        self.assertIn(claims["jti"], tokens.revoked_access_tokens)
+
+
+class TokenApiTests(TestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        caches[settings.ACCESS_TOKEN_REVOCATION_CACHE_ALIAS].clear()
+        self.user = create_user(
+            email="pair@example.com", password="pairpass", name="Pair"
+        )
+        self.client = APIClient()
+
+    def _obtain(self):
+        res = self.client.post(
+            ACCESS_URL, {"email": "pair@example.com", "password": "pairpass"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_refresh_token_stored_hashed(self):
+        pair = self._obtain()
+
+        self.assertFalse(
+            RefreshToken.objects.filter(token_hash=pair["refresh"]).exists()
+        )
+        self.assertEqual(
+            RefreshToken.objects.filter(user=self.user).count(), 1
+        )
+
+    def test_bearer_token_skips_database(self):
+        pair = self._obtain()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {pair['access']}")
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["email"], self.user.email)
+
+    def test_invalid_bearer_token_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer default.abc.def")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_refresh_rotates(self):
+        pair = self._obtain()
+
+        res = self.client.post(REFRESH_URL, {"refresh": pair["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res.data["refresh"], pair["refresh"])
+
+        res = self.client.post(REFRESH_URL, {"refresh": pair["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_ascii_bearer_token_rejected(self):
+        # WSGI hands headers over as latin-1; this is "é" sent as UTF-8.
+        self.client.credentials(
+            HTTP_AUTHORIZATION="Bearer default.e30.\u00c3\u00a9"
+        )
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revoke(self):
+        pair = self._obtain()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {pair['access']}")
+
+        res = self.client.post(REVOKE_URL, {"refresh": pair["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        res = self.client.post(REFRESH_URL, {"refresh": pair["refresh"]})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deactivated_user_rejected(self):
+        pair = self._obtain()
+        self.user.is_active = False
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {pair['access']}")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_refresh_tokens(self):
+        live = self._obtain()["refresh"]
+        rotated = self._obtain()["refresh"]
+        self.client.post(REFRESH_URL, {"refresh": rotated})
+        expired = tokens.issue_refresh_token(self.user)
+        RefreshToken.objects.filter(token_hash=tokens._hash(expired)).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        out = StringIO()
+
+        call_command("purge_refresh_tokens", stdout=out)
+
+        self.assertIn("2 refresh tokens deleted", out.getvalue())
+        remaining = set(
+            RefreshToken.objects.values_list("token_hash", flat=True)
+        )
+        self.assertIn(tokens._hash(live), remaining)
+        self.assertEqual(len(remaining), 2)
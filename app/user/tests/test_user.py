@@ -4,6 +4,8 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from user.limiter import email_limiter, ip_limiter
+
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_URL = reverse("user:me")
@@ -16,6 +18,8 @@ def create_user(**params):
 class PublicUserApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
+        email_limiter.clear()
+        ip_limiter.clear()
 
     def test_create_user(self):
         payload = {
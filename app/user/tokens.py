@@ -0,0 +1,217 @@
+"""Signed access tokens and hashed refresh tokens.
+
+Access tokens look like ``<kid>.<payload>.<signature>``. The payload holds
+the user id, expiry and a token id (``jti``), and the signature is an
+HMAC-SHA256 made with the key named by ``kid``, so verifying one needs no
+database access. Refresh tokens are random strings; only their SHA-256
+hash is stored, in ``core.models.RefreshToken``, until
+``purge_refresh_tokens`` deletes it once expired or revoked.
+"""
+
+import base64
+import hashlib
+import hmac
+import heapq
+import json
+import math
+import secrets
+import threading
+import time
+from datetime import timedelta
+
+from core.models import RefreshToken
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data):
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signing_keys():
+    return settings.ACCESS_TOKEN_SIGNING_KEYS or {
+        "default": settings.SECRET_KEY
+    }
+
+
+def _sign(key, message):
+    digest = hmac.new(key.encode(), message.encode(), hashlib.sha256)
+    return _b64encode(digest.digest())
+
+
+class RevocationList:
+    """Revoked access token ids, kept only until the tokens expire anyway.
+
+    Revocations are written to the shared cache named by
+    ``ACCESS_TOKEN_REVOCATION_CACHE_ALIAS``, keyed by token id and timed out
+    when the token expires, so every process rejects a revoked token. The
+    ids seen so far are also kept in memory, in front of the shared cache,
+    and dropped from a heap ordered by expiry once their tokens expire.
+    """
+
+    def __init__(self, timer=time.time):
+        self.timer = timer
+        self._expiry = {}
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def _cache(self):
+        return caches[settings.ACCESS_TOKEN_REVOCATION_CACHE_ALIAS]
+
+    def _key(self, jti):
+        return f"token:revoked:{jti}"
+
+    def _remember(self, jti, expires, now):
+        # Called with the lock held.
+        while self._heap and self._heap[0][0] <= now:
+            exp, key = heapq.heappop(self._heap)
+            if self._expiry.get(key) == exp:
+                del self._expiry[key]
+        if expires > now and jti not in self._expiry:
+            self._expiry[jti] = expires
+            heapq.heappush(self._heap, (expires, jti))
+
+    def __contains__(self, jti):
+        now = self.timer()
+        with self._lock:
+            if self._expiry.get(jti, 0) > now:
+                return True
+        expires = self._cache().get(self._key(jti))
+        if expires is None or expires <= now:
+            return False
+        with self._lock:
+            self._remember(jti, expires, now)
+        return True
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def add(self, jti, expires):
+        now = self.timer()
+        if expires > now:
+            self._cache().set(
+                self._key(jti), expires, math.ceil(expires - now)
+            )
+        with self._lock:
+            self._remember(jti, expires, now)
+
+
+revoked_access_tokens = RevocationList()
+
+
+def issue_access_token(user, now=None):
+    """Return a signed access token for ``user`` and its lifetime."""
+    now = time.time() if now is None else now
+    lifetime = settings.ACCESS_TOKEN_LIFETIME
+    kid = settings.ACCESS_TOKEN_ACTIVE_KEY
+    claims = {
+        "uid": user.pk,
+        "exp": int(now + lifetime),
+        "jti": secrets.token_hex(8),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    message = f"{kid}.{payload}"
+    return f"{message}.{_sign(_signing_keys()[kid], message)}", lifetime
+
+
+def verify_access_token(token, now=None):
+    """Return the claims of a valid access token or raise InvalidToken."""
+    try:
+        kid, payload, signature = token.split(".")
+    except ValueError:
+        raise InvalidToken("Malformed token.")
+
+    key = _signing_keys().get(kid)
+    if key is None:
+        raise InvalidToken("Unknown signing key.")
+    # compare_digest only takes ASCII strings, so compare the bytes.
+    expected = _sign(key, f"{kid}.{payload}").encode()
+    if not hmac.compare_digest(expected, signature.encode()):
+        raise InvalidToken("Bad signature.")
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise InvalidToken("Malformed token.")
+
+    now = time.time() if now is None else now
+    if claims["exp"] <= now:
+        raise InvalidToken("Token expired.")
+    if claims["jti"] in revoked_access_tokens:
+        raise InvalidToken("Token revoked.")
+    return claims
+
+
+def revoke_access_token(claims):
+    revoked_access_tokens.add(claims["jti"], claims["exp"])
+
+
+def _hash(raw):
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def issue_refresh_token(user):
+    raw = secrets.token_urlsafe(32)
+    RefreshToken.objects.create(
+        user=user,
+        token_hash=_hash(raw),
+        expires_at=timezone.now()
+        + timedelta(seconds=settings.REFRESH_TOKEN_LIFETIME),
+    )
+    return raw
+
+
+def issue_token_pair(user):
+    access, lifetime = issue_access_token(user)
+    return {
+        "access": access,
+        "refresh": issue_refresh_token(user),
+        "expires_in": lifetime,
+    }
+
+
+@transaction.atomic
+def rotate_refresh_token(raw):
+    """Swap a live refresh token for a new token pair."""
+    try:
+        token = (
+            RefreshToken.objects.select_for_update()
+            .select_related("user")
+            .get(token_hash=_hash(raw))
+        )
+    except RefreshToken.DoesNotExist:
+        raise InvalidToken("Unknown refresh token.")
+
+    if token.revoked_at is not None or token.expires_at <= timezone.now():
+        raise InvalidToken("Refresh token expired or revoked.")
+    if not token.user.is_active:
+        raise InvalidToken("User inactive or deleted.")
+
+    token.revoked_at = timezone.now()
+    token.save(update_fields=["revoked_at"])
+    return issue_token_pair(token.user)
+
+
+def purge_refresh_tokens():
+    """Delete refresh tokens that have expired or been revoked."""
+    deleted, _ = RefreshToken.objects.filter(
+        Q(expires_at__lte=timezone.now()) | Q(revoked_at__isnull=False)
+    ).delete()
+    return deleted
+
+
+def revoke_refresh_token(raw):
+    RefreshToken.objects.filter(
+        token_hash=_hash(raw), revoked_at__isnull=True
+    ).update(revoked_at=timezone.now())
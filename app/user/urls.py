@@ -1,11 +1,28 @@
 from django.urls import path
 
-from user import views
+from user import async_views, views
 
 app_name = "user"
 
 urlpatterns = [
     path("create/", views.CreateUserView.as_view(), name="create"),
+    path("create/async/", async_views.create_user, name="create-async"),
     path("token/", views.CreateTokenView.as_view(), name="token"),
+    path("token/async/", async_views.create_token, name="token-async"),
+    path(
+        "token/access/",
+        views.CreateAccessTokenView.as_view(),
+        name="token-access",
+    ),
+    path(
+        "token/refresh/",
+        views.RefreshAccessTokenView.as_view(),
+        name="token-refresh",
+    ),
+    path(
+        "token/revoke/",
+        views.RevokeTokenView.as_view(),
+        name="token-revoke",
+    ),
     path("me/", views.ManageUserView.as_view(), name="me"),
 ]
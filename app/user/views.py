@@ -1,11 +1,25 @@
+from core.db import ReplicaReadMixin
 from django.shortcuts import render
 
 # Create your views here.
-from rest_framework import authentication, generics, permissions
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-from user.serializers import AuthTokenSerializer, UserSerializer
+from user import tokens
+from user.authentication import (
+    AccessTokenAuthentication,
+    CachingTokenAuthentication,
+)
+from user.serializers import (
+    AuthTokenSerializer,
+    RefreshTokenSerializer,
+    TokenPairSerializer,
+    UserSerializer,
+)
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -17,9 +31,61 @@ class CreateTokenView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class CreateAccessTokenView(generics.GenericAPIView):
+    """Exchange credentials for a signed access token and refresh token."""
+
+    serializer_class = AuthTokenSerializer
+    authentication_classes = []
+
+    @extend_schema(responses=TokenPairSerializer)
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        pair = tokens.issue_token_pair(serializer.validated_data["user"])
+        return Response(pair, status=status.HTTP_200_OK)
+
+
+class RefreshAccessTokenView(generics.GenericAPIView):
+    """Trade a refresh token for a new token pair, revoking the old one."""
+
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = []
+
+    @extend_schema(responses=TokenPairSerializer)
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            pair = tokens.rotate_refresh_token(
+                serializer.validated_data["refresh"]
+            )
+        except tokens.InvalidToken as exc:
+            raise ValidationError({"refresh": str(exc)})
+        return Response(pair, status=status.HTTP_200_OK)
+
+
+class RevokeTokenView(generics.GenericAPIView):
+    """Revoke a refresh token and the access token used for the call."""
+
+    serializer_class = RefreshTokenSerializer
+    authentication_classes = [AccessTokenAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(responses={204: None})
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tokens.revoke_refresh_token(serializer.validated_data["refresh"])
+        tokens.revoke_access_token(request.auth)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ManageUserView(ReplicaReadMixin, generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        AccessTokenAuthentication,
+        CachingTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):